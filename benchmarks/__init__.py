@@ -0,0 +1 @@
+"""Startup benchmarks for the Gentoo Build Publisher CLI"""
@@ -0,0 +1,97 @@
+"""Run the startup benchmarks for gbpcli
+
+Each benchmark's result is compared with the saved baseline. A benchmark fails when it
+is slower than the baseline by more than the threshold (in percent). Use --save to save
+the results as the new baseline. Baselines are specific to the machine they were
+measured on.
+"""
+
+import argparse
+import os
+import unittest
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from benchmarks.lib import Result
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main() -> None:
+    """Program entry point"""
+    args = parse_args()
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+
+    # These values are required in order to import the publisher module
+    os.environ.setdefault("BUILD_PUBLISHER_JENKINS_BASE_URL", "http://jenkins.invalid/")
+    os.environ.setdefault("BUILD_PUBLISHER_STORAGE_PATH", "__testing__")
+
+    # The benchmarks need the (above) environment in order to be imported
+    from benchmarks import lib  # pylint: disable=import-outside-toplevel
+
+    lib.OPTIONS = lib.Options(
+        runs=args.runs, threshold=args.threshold, baseline=args.baseline, save=args.save
+    )
+    loader = unittest.TestLoader()
+    loader.testNamePatterns = [f"*{pattern}*" for pattern in args.benchmarks] or None
+    tests = loader.discover("benchmarks", pattern="bench*.py", top_level_dir=".")
+    runner = unittest.TextTestRunner(verbosity=2 if args.verbose else 1)
+    test_result = runner.run(tests)
+
+    print_results(lib.RESULTS)
+    print_timings(lib.TIMINGS)
+
+    if args.save and test_result.wasSuccessful():
+        lib.save_baseline(args.baseline, lib.RESULTS)
+        print(f"Baseline saved to {args.baseline}")
+
+    raise SystemExit(int(not test_result.wasSuccessful()))
+
+
+def print_results(results: dict[str, "Result"]) -> None:
+    """Print the results as a table"""
+    print(f"\n{'':12} {'cold':>10} {'warm':>10} {'imports':>10}")
+
+    for name, result in results.items():
+        print(
+            f"{name:12} {result.cold:>8.1f}ms {result.warm:>8.1f}ms"
+            f" {result.imports:>8.1f}ms"
+        )
+
+
+def print_timings(timings: dict[str, float]) -> None:
+    """Print the in-process benchmarks' timings"""
+    if timings:
+        print()
+
+    for name, value in timings.items():
+        print(f"{name:34} {value:>8.1f}ms")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments"""
+    default_settings = os.environ.get("DJANGO_SETTINGS_MODULE", "gbp_testkit.settings")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--settings", default=default_settings)
+    parser.add_argument(
+        "--runs", type=int, default=5, help="number of runs per measurement"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=20.0,
+        help="allowed slowdown compared to the baseline, in percent",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", default=False, help="save the baseline"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", default=False)
+    parser.add_argument("benchmarks", nargs="*", default=[])
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
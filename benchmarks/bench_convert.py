@@ -0,0 +1,69 @@
+"""Benchmarks of converting API responses"""
+
+# pylint: disable=missing-docstring
+from typing import Any
+from unittest import TestCase
+
+from unittest_fixtures import Fixtures, fixture, given
+
+from gbpcli.types import BuildCollection, fromisoformat
+
+from . import lib
+
+
+@fixture()
+def responses(_fixtures: Fixtures, count: int = 100_000) -> list[dict[str, Any]]:
+    """API responses of count builds, each with a few packages"""
+    return [
+        {
+            "id": f"babette.{number}",
+            "keep": False,
+            "published": False,
+            "tags": [],
+            "notes": None,
+            "submitted": "2025-04-08T06:00:00.123456+00:00",
+            "completed": "2025-04-08T06:40:00.654321+00:00",
+            "built": "2025-04-08T06:30:00+00:00",
+            "packagesBuilt": [
+                {"cpv": "app-arch/libarchive-3.7.9", "buildTime": 1744092600},
+                {"cpv": "sys-apps/acl-2.3.2-r2", "buildTime": 1744093200},
+            ],
+        }
+        for number in range(count)
+    ]
+
+
+@given(responses)
+class ConvertBenchmarks(TestCase):
+    def test_builds(self, fixtures: Fixtures) -> None:
+        """Timestamps are stored unparsed, and only parsed when read
+
+        gbp list, inspect and diff convert a machine's builds with
+        BuildCollection.from_api_response(). Compare that to parsing the timestamps
+        as the builds are converted, and to reading one timestamp per build as gbp list
+        does.
+        """
+
+        def convert() -> BuildCollection:
+            return BuildCollection.from_api_response(fixtures.responses)
+
+        def convert_eager() -> None:
+            builds = BuildCollection()
+
+            for item in fixtures.responses:
+                builds.append_api_response(item)
+                for name in ["submitted", "completed", "built"]:
+                    fromisoformat(item[name])
+
+        def convert_list() -> None:
+            for build in convert():
+                assert build.info
+                _ = build.info.built or build.info.submitted
+
+        runs = lib.OPTIONS.runs
+        timings = {
+            "convert 100k builds": lib.time_call(convert, runs),
+            "convert, parsing timestamps": lib.time_call(convert_eager, runs),
+            "convert, read as gbp list does": lib.time_call(convert_list, runs),
+        }
+        lib.TIMINGS.update(timings)
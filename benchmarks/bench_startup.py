@@ -0,0 +1,55 @@
+"""Startup benchmarks"""
+
+# pylint: disable=missing-docstring
+from unittest import TestCase
+
+from unittest_fixtures import Fixtures, given
+
+from . import lib
+
+
+@given(lib.builds, lib.gbp_environ)
+class StartupBenchmarks(TestCase):
+    def benchmark(
+        self, fixtures: Fixtures, name: str, argv: list[str], **environ: str
+    ) -> None:
+        """Measure gbp with the given arguments and compare it with the baseline"""
+        result = lib.measure(
+            argv, {**fixtures.gbp_environ, **environ}, lib.OPTIONS.runs
+        )
+        lib.RESULTS[name] = result
+
+        if lib.OPTIONS.save:
+            return
+
+        baseline = lib.load_baseline(lib.OPTIONS.baseline).get(name)
+
+        if messages := lib.regressions(result, baseline, lib.OPTIONS.threshold):
+            self.fail(f"{name} is slower than the baseline:\n" + "\n".join(messages))
+
+    def test_help(self, fixtures: Fixtures) -> None:
+        self.benchmark(fixtures, "help", ["--help"])
+
+    def test_version(self, fixtures: Fixtures) -> None:
+        self.benchmark(fixtures, "version", ["--version"])
+
+    def test_latest(self, fixtures: Fixtures) -> None:
+        self.benchmark(fixtures, "latest", ["latest", "babette"])
+
+    def test_list(self, fixtures: Fixtures) -> None:
+        self.benchmark(fixtures, "list", ["list", "babette"])
+
+    def test_completion(self, fixtures: Fixtures) -> None:
+        comp_line = "gbp latest "
+        output = fixtures.tmpdir / "completion"
+
+        self.benchmark(
+            fixtures,
+            "completion",
+            [],
+            _ARGCOMPLETE="1",
+            COMP_LINE=comp_line,
+            COMP_POINT=str(len(comp_line)),
+            _ARGCOMPLETE_STDOUT_FILENAME=str(output),
+        )
+        self.assertIn("babette", output.read_text(encoding="UTF-8"))
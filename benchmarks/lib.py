@@ -0,0 +1,249 @@
+"""Benchmark tools
+
+Commands are run as separate gbp processes, the way users run them, against an HTTP
+server which passes the GraphQL requests to the in-process Gentoo Build Publisher used
+by the tests.
+"""
+
+# pylint: disable=missing-docstring
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+import gbp_testkit.fixtures as testkit
+from gbp_testkit.helpers import mock_gbp_session_post
+from unittest_fixtures import FixtureContext, Fixtures, fixture
+
+from tests.lib import create_machine_builds
+
+
+@dataclass(kw_only=True)
+class Options:
+    """Benchmark options (set from the command line)"""
+
+    runs: int = 5
+    # Allowed slowdown, in percent, compared to the baseline
+    threshold: float = 20.0
+    baseline: Path = Path(__file__).parent / "baseline.json"
+    save: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class Result:
+    """Benchmark result for a command. Times are in milliseconds"""
+
+    # Median wall time without the user's cache directory (e.g. the subcommand
+    # manifest)
+    cold: float
+    # Median wall time with the cache directory populated
+    warm: float
+    # Cumulative time of the top-level imports (python -X importtime)
+    imports: float
+
+
+OPTIONS = Options()
+RESULTS: dict[str, Result] = {}
+# Median times (in milliseconds) of the in-process benchmarks
+TIMINGS: dict[str, float] = {}
+
+
+def gbp_command() -> list[str]:
+    """Return the command to run gbp using the current interpreter"""
+    script = Path(sys.executable).parent / "gbp"
+
+    return (
+        [sys.executable, str(script)]
+        if script.exists()
+        else [sys.executable, "-m", "gbpcli"]
+    )
+
+
+def run(
+    argv: list[str], environ: dict[str, str], *, importtime: bool = False
+) -> tuple[float, str]:
+    """Run gbp with the given arguments
+
+    Return the wall time (in seconds) and stderr.
+    """
+    command = gbp_command()
+
+    if importtime:
+        command[1:1] = ["-X", "importtime"]
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [*command, *argv],
+        env=environ,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    elapsed = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        raise AssertionError(f"gbp {' '.join(argv)} failed:\n{proc.stderr}")
+
+    return elapsed, proc.stderr
+
+
+def import_time(stderr: str) -> float:
+    """Return the total time (in ms) of the top-level imports in -X importtime output"""
+    total = 0
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented further and are already counted in their
+        # parent's cumulative time
+        if len(name) - len(name.lstrip()) == 1 and cumulative.strip().isdigit():
+            total += int(cumulative)
+
+    return total / 1000
+
+
+def measure(argv: list[str], environ: dict[str, str], runs: int) -> Result:
+    """Measure the startup of gbp with the given arguments"""
+    cold: list[float] = []
+    warm: list[float] = []
+
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cache_home:
+            cold.append(run(argv, {**environ, "XDG_CACHE_HOME": cache_home})[0])
+
+    run(argv, environ)  # Populate the cache directory
+
+    for _ in range(runs):
+        warm.append(run(argv, environ)[0])
+
+    _, stderr = run(argv, environ, importtime=True)
+
+    return Result(
+        cold=statistics.median(cold) * 1000,
+        warm=statistics.median(warm) * 1000,
+        imports=import_time(stderr),
+    )
+
+
+def time_call(func: Callable[[], Any], runs: int) -> float:
+    """Return the median time (in milliseconds) of calling func"""
+    times: list[float] = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times) * 1000
+
+
+def regressions(result: Result, baseline: Result | None, threshold: float) -> list[str]:
+    """Return descriptions of the metrics where result is slower than the baseline"""
+    if baseline is None:
+        return []
+
+    messages = []
+
+    for name, value in asdict(result).items():
+        allowed = getattr(baseline, name) * (1 + threshold / 100)
+
+        if value > allowed:
+            messages.append(
+                f"{name}: {value:.1f}ms > {allowed:.1f}ms"
+                f" (baseline {getattr(baseline, name):.1f}ms + {threshold}%)"
+            )
+
+    return messages
+
+
+def load_baseline(path: Path) -> dict[str, Result]:
+    """Return the baseline results saved at path
+
+    If there are no saved results, return an empty dict.
+    """
+    try:
+        data: dict[str, dict[str, float]] = json.loads(path.read_text(encoding="UTF-8"))
+    except FileNotFoundError:
+        return {}
+
+    return {name: Result(**values) for name, values in data.items()}
+
+
+def save_baseline(path: Path, results: dict[str, Result]) -> None:
+    """Save the results as the baseline at path
+
+    Results of benchmarks that were not run are kept.
+    """
+    data = {name: asdict(result) for name, result in load_baseline(path).items()}
+    data.update({name: asdict(result) for name, result in results.items()})
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="UTF-8")
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    """Pass GraphQL requests to the in-process Gentoo Build Publisher"""
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        response = mock_gbp_session_post(self.path, json=payload)
+        content = response.raw.read()
+
+        self.send_response(response.status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # pylint: disable=redefined-builtin
+        pass
+
+
+@fixture(testkit.publisher)
+def server(_fixtures: Fixtures) -> FixtureContext[str]:
+    """Run the GraphQL server in a thread. Return its url"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), GraphQLHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{httpd.server_port}/"
+
+    httpd.shutdown()
+    thread.join()
+    httpd.server_close()
+
+
+@fixture(testkit.publisher)
+def builds(_fixtures: Fixtures, machine: str = "babette", count: int = 10) -> None:
+    """Create builds for the machine on the publisher"""
+    create_machine_builds(machine, count, count)
+
+
+@fixture(testkit.tmpdir, server)
+def gbp_environ(fixtures: Fixtures) -> dict[str, str]:
+    """The environment for the gbp processes
+
+    The user's home, configuration and cache directories are in fixtures.tmpdir.
+    """
+    home = fixtures.tmpdir / "home"
+    home.mkdir()
+
+    return {
+        "PATH": os.environ.get("PATH", ""),
+        "HOME": str(home),
+        "XDG_CACHE_HOME": str(home / ".cache"),
+        "XDG_CONFIG_HOME": str(home / ".config"),
+        "BUILD_PUBLISHER_URL": fixtures.server,
+        "TERM": "dumb",
+    }
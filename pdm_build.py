@@ -0,0 +1,18 @@
+"""pdm build hook. Bundles the version and queries into the wheel
+
+See gbpcli.bundle. gbpcli (and its dependencies) are not installed in the build
+environment so the module is loaded from the source tree.
+"""
+
+import importlib.util
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    "gbpcli_bundle", Path(__file__).parent / "src" / "gbpcli" / "bundle.py"
+)
+assert _spec and _spec.loader
+_bundle = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_bundle)
+
+pdm_build_hook_enabled = _bundle.pdm_build_hook_enabled
+pdm_build_initialize = _bundle.pdm_build_initialize
@@ -2,96 +2,370 @@
 
 # PYTHON_ARGCOMPLETE_OK
 
-import argparse
+# Modules that take long to import (requests, rich, ...) are imported only when they are
+# needed so that, for example, shell completion does not pay for them.
+# pylint: disable=import-outside-toplevel
+
 import os
+
+# Checked here (against importprofile.FALSE_VALUES) so the importprofile module isn't
+# imported unless profiling
+IMPORT_PROFILE = os.environ.get("GBPCLI_IMPORT_PROFILE", "")
+
+if IMPORT_PROFILE.lower() not in ("", "0", "false", "no", "off"):
+    from gbpcli import importprofile
+
+    importprofile.start()
+
+# pylint: disable=wrong-import-position,ungrouped-imports
 import os.path
 import sys
-from importlib.metadata import entry_points, version
-from typing import cast
+from typing import IO, TYPE_CHECKING, Any, Callable, NoReturn, TextIO, cast
 
-import argcomplete
-import platformdirs
-import requests
-import rich.console
-from rich.theme import Theme
+if TYPE_CHECKING:
+    import argparse
 
-from gbpcli import config, graphql, utils
-from gbpcli.gbp import GBP
-from gbpcli.theme import get_theme_from_string
-from gbpcli.types import Console
+    from rich.theme import Theme
+
+    from gbpcli import config, graphql, trace
+    from gbpcli.actions import LazySubParsersAction
+    from gbpcli.cache import Cache
+    from gbpcli.gbp import GBP
+    from gbpcli.settings import Settings
+    from gbpcli.types import Console
 
 COLOR_CHOICES = {"always": True, "never": False, "auto": None}
+FORMAT_CHOICES = ("auto", "rich", "plain")
 DEFAULT_URL = os.getenv("BUILD_PUBLISHER_URL", "http://localhost/")
+# Exit status when the --deadline is exceeded. Same as timeout(1)
+DEADLINE_EXIT_STATUS = 124
+
+
+def __getattr__(name: str) -> Any:
+    """Lazily import GBP and Console, for subcommands, and the argparse actions"""
+    match name:
+        case "GBP":
+            from gbpcli.gbp import GBP
+
+            return GBP
+        case "Console":
+            from gbpcli.types import Console
+
+            return Console
+        case "LazySubParsersAction" | "VersionAction":
+            from gbpcli import actions
+
+            return getattr(actions, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main(argv: list[str] | None = None) -> int:
     """Main entry point"""
-    utils.set_env()
-    utils.load_env()
-    user_config = get_user_config(os.environ.get("GBPCLI_CONFIG"))
+    if "_ARGCOMPLETE" in os.environ:
+        complete()
+
+    from gbpcli import quick
+
+    argv = argv if argv is not None else sys.argv[1:]
+
+    if (response := quick.get(argv)) is not None:
+        sys.stdout.write(response)
+        return 0
+
+    from gbpcli import agent, snapshot, trace, utils
+    from gbpcli.settings import Settings
+
+    # Startup is traced before we know whether --trace was given
+    with trace.Tracer() as tracer:
+        with trace.span("startup", "environment"):
+            utils.set_env()
+            utils.load_env()
+            settings = Settings.from_environ()
+
+        if settings.DEBUG:
+            import logging
+
+            logging.basicConfig(format="%(name)s: %(message)s", level=logging.DEBUG)
+
+        if settings.AGENT:
+            if (status := agent.forward(agent.socket_path(settings), argv)) is not None:
+                return status
+
+        with snapshot.enabled(settings.SNAPSHOT):
+            return run(argv, settings, tracer)
+
+
+def run(argv: list[str], settings: "Settings", tracer: "trace.Tracer") -> int:
+    """Run the command given by the command-line arguments. Return its exit status"""
+    from gbpcli import quick, render, trace
+
+    with trace.span("startup", "config"):
+        user_config = get_user_config(os.environ.get("GBPCLI_CONFIG"))
+
+    if quick.response_path(argv) is not None:
+        return respond(user_config, argv)
+
     args = get_arguments(user_config, argv)
-    theme = get_theme_from_string(os.getenv("GBPCLI_COLORS", ""))
-    console = get_console(COLOR_CHOICES[args.color], theme)
+    tracer.enabled = args.trace
+
+    if plain := is_plain(args, sys.stdout.isatty()):
+        console = get_plain_console()
+    else:
+        from gbpcli.theme import get_theme_from_string
+
+        theme = get_theme_from_string(os.getenv("GBPCLI_COLORS", ""))
+        console = get_console(COLOR_CHOICES[args.color], theme)
+
+    if args.trace:
+        trace.instrument_console(console)
+
+    gbp = get_gbp(args.url, user_config, settings)
+
+    with render.markup(not plain):
+        status = run_subcommand(args, gbp, console)
+
+    if args.trace:
+        tracer.report(console.err)
+
+    return status
+
+
+def respond(user_config: "config.Config", argv: list[str]) -> int:
+    """Respond to command-line arguments which don't run a subcommand (e.g. --help)
+
+    The response is saved so that it can be given quickly next time (see gbpcli.quick).
+    """
+    import io
+    from contextlib import redirect_stdout
+
+    from gbpcli import quick
+
+    parser = build_parser(user_config)
+    stdout = io.StringIO()
+
+    with redirect_stdout(stdout):
+        try:
+            parser.parse_args(argv)
+        except SystemExit as error:
+            if error.code:
+                raise
+
+    quick.save(argv, response := stdout.getvalue())
+    sys.stdout.write(response)
+
+    return 0
+
+
+def run_subcommand(args: "argparse.Namespace", gbp: "GBP", console: "Console") -> int:
+    """Run the subcommand handler given by args and return its exit status
+
+    Errors communicating with the GBP server are printed and exit with status 1. If
+    the --deadline is exceeded exit with DEADLINE_EXIT_STATUS.
+    """
+    from contextlib import nullcontext
+
+    import requests
+
+    from gbpcli import graphql, trace
+
+    deadline = graphql.Deadline(args.deadline) if args.deadline else nullcontext()
+
+    command = args.func.__module__.rpartition(".")[2]
 
     try:
-        return cast(int, args.func(args, GBP(args.url, auth=user_config.auth), console))
-    except (graphql.APIError, requests.HTTPError, requests.ConnectionError) as error:
+        with deadline, trace.span("command", command):
+            return cast(int, args.func(args, gbp, console))
+    except graphql.DeadlineExceeded as error:
+        console.err.print(str(error))
+        return DEADLINE_EXIT_STATUS
+    except (
+        graphql.APIError,
+        requests.HTTPError,
+        requests.ConnectionError,
+        requests.Timeout,
+    ) as error:
         console.err.print(str(error))
         return 1
 
 
-def get_user_config(filename: str | None = None) -> config.Config:
+def get_user_config(filename: str | None = None) -> "config.Config":
     """Return Config from the user's"""
+    from functools import partial
+
+    import platformdirs
+
+    from gbpcli import config, snapshot
+
     config_dir = platformdirs.user_config_dir()
     user_config_file = filename or os.path.join(config_dir, "gbpcli.toml")
 
     try:
-        with open(user_config_file, "rb") as fp:
-            return config.Config.from_file(fp)
+        data = snapshot.cached(
+            "config",
+            partial(config.read, user_config_file),
+            key=user_config_file,
+            files=lambda _: [user_config_file],
+        )
     except FileNotFoundError:
         if filename:
             raise
         return config.Config()
 
+    user_config = config.Config(**data)
+
+    if user_config.auth:
+        config.maybe_warn_on_perms(user_config_file)
+
+    return user_config
+
+
+def get_gbp(
+    url: str, user_config: "config.Config", settings: "Settings | None" = None
+) -> "GBP":
+    """Return the GBP interface to the server at url as configured by the user
+
+    If settings are not given, they are taken from the environment.
+    """
+    from gbpcli.gbp import GBP
+    from gbpcli.settings import Settings
+
+    settings = settings or Settings.from_environ()
+
+    return GBP(
+        url,
+        auth=user_config.auth,
+        cache=get_cache(user_config),
+        timeout=get_timeout(user_config, settings),
+    )
+
+
+def get_cache(user_config: "config.Config") -> "Cache | None":
+    """Return the user's cache of API responses
+
+    If the configured cache size is 0, return None.
+    """
+    import platformdirs
+
+    from gbpcli.cache import DEFAULT_MAX_SIZE, DIRNAME, Cache
+
+    if user_config.cache_size == 0:
+        return None
+
+    return Cache(
+        os.path.join(platformdirs.user_cache_dir("gbpcli"), DIRNAME),
+        max_size=user_config.cache_size or DEFAULT_MAX_SIZE,
+    )
+
+
+def get_timeout(
+    user_config: "config.Config", settings: "Settings"
+) -> "graphql.Timeout":
+    """Return the (connect, read) timeout for requests
+
+    Values in the user's config take precedence over the settings.
+    """
+    connect = user_config.connect_timeout
+    read = user_config.read_timeout
+
+    return (
+        settings.CONNECT_TIMEOUT if connect is None else connect,
+        settings.READ_TIMEOUT if read is None else read,
+    )
+
 
 def get_arguments(
-    user_config: config.Config, argv: list[str] | None = None
-) -> argparse.Namespace:
+    user_config: "config.Config", argv: list[str] | None = None
+) -> "argparse.Namespace":
     """Return command line arguments given the argv
 
     This method ensures that args.func is defined as it's mandatory for calling
     subcommands. If there are none the help message is printed to stderr and SystemExit
     is raised.
     """
+    from gbpcli import trace
+
     argv = argv if argv is not None else sys.argv[1:]
     parser = build_parser(user_config)
-    supress_completer = argcomplete.completers.SuppressCompleter()
-    argcomplete.autocomplete(parser, default_completer=supress_completer)
-    args = parser.parse_args(argv)
+
+    with trace.span("startup", "arguments"):
+        args = parser.parse_args(argv)
     ensure_args_has_func(args, parser)
 
     return args
 
 
-def get_console(force_terminal: bool | None, theme: Theme) -> Console:
+def get_console(
+    force_terminal: bool | None,
+    theme: "Theme",
+    *,
+    out: IO[str] | None = None,
+    err: IO[str] | None = None,
+    width: int | None = None,
+) -> "Console":
     """Return a rich.Console instance
 
     If force_terminal is true, force a tty on the console.
     If the ColorMap is given this is used as the Console theme
+    out and err are the files to write to. They default to stdout and stderr.
+    """
+    import rich.console
+
+    from gbpcli.types import Console
+
+    out_console = rich.console.Console(
+        file=out,
+        force_terminal=force_terminal,
+        color_system="auto",
+        highlight=False,
+        theme=theme,
+        width=width,
+    )
+    err_console = rich.console.Console(file=err or sys.stderr, width=width)
+
+    return Console(out=out_console, err=err_console)
+
+
+def get_plain_console(
+    *, out: IO[str] | None = None, err: IO[str] | None = None, width: int | None = None
+) -> "Console":
+    """Return a Console which writes plain text (see gbpcli.plain)
+
+    out and err are the files to write to. They default to stdout and stderr.
     """
-    out = rich.console.Console(
-        force_terminal=force_terminal, color_system="auto", highlight=False, theme=theme
+    from gbpcli.plain import PlainConsole
+    from gbpcli.types import Console
+
+    return Console(
+        out=PlainConsole(out, width=width),
+        err=PlainConsole(err, stderr=True, width=width),
     )
-    return Console(out=out, err=rich.console.Console(file=sys.stderr))
 
 
-def build_parser(user_config: config.Config) -> argparse.ArgumentParser:
+def is_plain(args: "argparse.Namespace", tty: bool) -> bool:
+    """Return True if the output should be plain text
+
+    By default ("auto") output is plain unless it goes to a terminal or color was asked
+    for.
+    """
+    if args.format == "auto":
+        return not tty and COLOR_CHOICES[args.color] is not True
+
+    return args.format == "plain"
+
+
+def build_parser(user_config: "config.Config") -> "argparse.ArgumentParser":
     """Set command-line arguments"""
+    import argparse
+
+    import platformdirs
+
+    from gbpcli import manifest, trace
+    from gbpcli.actions import LazySubParsersAction, VersionAction
+
     usage = "Command-line interface to Gentoo Build Publisher\n\nCommands:\n\n"
     parser = argparse.ArgumentParser(prog="gbp")
-    parser.add_argument(
-        "--version", action="version", version=f"gbpcli {version('gbpcli')}"
-    )
+    parser.add_argument("--version", action=VersionAction)
     parser.add_argument(
         "--url", type=str, help="GBP url", default=user_config.url or DEFAULT_URL
     )
@@ -102,6 +376,31 @@ def build_parser(user_config: config.Config) -> argparse.ArgumentParser:
         default="auto",
         help=f"colorize output {tuple(COLOR_CHOICES)}",
     )
+    parser.add_argument(
+        "--format",
+        choices=FORMAT_CHOICES,
+        default="auto",
+        help=(
+            "output format. plain output has no colors or styles and is the default "
+            "(auto) when not writing to a terminal"
+        ),
+    )
+    parser.add_argument(
+        "--deadline",
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help=(
+            "give up when the command has not finished after the given number of "
+            f"seconds. Exits with status {DEADLINE_EXIT_STATUS}"
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        default=False,
+        help="after the command has finished, show where the time was spent",
+    )
     parser.add_argument(
         "--my-machines",
         default=" ".join(user_config.my_machines or [])
@@ -113,28 +412,107 @@ def build_parser(user_config: config.Config) -> argparse.ArgumentParser:
             f"setting in {platformdirs.user_config_dir()}/gbpcli.toml"
         ),
     )
-    subparsers = parser.add_subparsers()
+    subparsers = cast(
+        LazySubParsersAction, parser.add_subparsers(action=LazySubParsersAction)
+    )
 
-    eps = entry_points().select(group="gbpcli.subcommands")
+    with trace.span("startup", "entry points") as entry_points_span:
+        from gbpcli.utils import python_path
 
-    for entry_point in eps:
-        module = entry_point.load()
-        subparser = subparsers.add_parser(
-            entry_point.name,
-            description=getattr(module, "HELP", None),
-            formatter_class=argparse.RawTextHelpFormatter,
-        )
-        usage = f"{usage}  * {entry_point.name} - {module.handler.__doc__}\n"
-        module.parse_args(subparser)
-        subparser.set_defaults(func=module.handler)
+        subcommands = manifest.get(search_path=python_path())
+        entry_points_span.details["count"] = len(subcommands)
+
+        for subcommand in subcommands:
+            subparsers.add_subcommand(subcommand)
+            usage = f"{usage}  * {subcommand.name} - {subcommand.doc}\n"
 
     parser.usage = usage
 
     return parser
 
 
+def complete(
+    output_stream: TextIO | None = None,
+    exit_method: Callable[[int], Any] = os._exit,  # pylint: disable=protected-access
+) -> NoReturn:
+    """Complete the command line for the shell (using argcomplete) and exit
+
+    This is a fast path taken on each TAB press. Of the subcommands only the one being
+    completed is loaded.
+    """
+    import argcomplete
+
+    from gbpcli import utils
+
+    # Plugin subcommands may need the server's environment in order to be loaded
+    utils.set_env()
+    utils.load_env()
+    parser = build_parser(get_user_config(os.environ.get("GBPCLI_CONFIG")))
+    subparsers = get_subparsers(parser)
+    comp_line = os.environ.get("COMP_LINE", "")
+    comp_point = int(os.environ.get("COMP_POINT", len(comp_line)))
+
+    if name := find_subcommand(parser, completion_words(comp_line[:comp_point])):
+        # argcomplete needs the subcommand's arguments before it parses the line
+        subparsers.load(name)
+
+    argcomplete.autocomplete(
+        parser,
+        output_stream=output_stream,
+        exit_method=exit_method,
+        default_completer=argcomplete.completers.SuppressCompleter(),
+    )
+    raise SystemExit(0)  # Only reached when the shell did not ask for completion
+
+
+def completion_words(line: str) -> list[str]:
+    """Split the (partial) command line into words, ignoring the program name"""
+    import shlex
+
+    try:
+        words = shlex.split(line)
+    except ValueError:  # Unterminated quote
+        words = line.split()
+
+    return words[1:]
+
+
+def find_subcommand(parser: "argparse.ArgumentParser", words: list[str]) -> str | None:
+    """Return the name of the subcommand given in words (command-line arguments)
+
+    Return None if there is none.
+    """
+    takes_value = {
+        option
+        for action in parser._actions  # pylint: disable=protected-access
+        if action.nargs != 0
+        for option in action.option_strings
+    }
+    subcommands = get_subparsers(parser).choices
+    words_iter = iter(words)
+
+    for word in words_iter:
+        if word in takes_value:
+            next(words_iter, None)
+        elif not word.startswith("-"):
+            return word if word in subcommands else None
+
+    return None
+
+
+def get_subparsers(parser: "argparse.ArgumentParser") -> "LazySubParsersAction":
+    """Return the parser's subcommands action"""
+    from gbpcli.actions import LazySubParsersAction
+
+    return next(
+        action
+        for action in parser._actions  # pylint: disable=protected-access
+        if isinstance(action, LazySubParsersAction)
+    )
+
+
 def ensure_args_has_func(
-    args: argparse.Namespace, parser: argparse.ArgumentParser
+    args: "argparse.Namespace", parser: "argparse.ArgumentParser"
 ) -> None:
     """Raise SystemExit if args has no "func" attribute
 
@@ -0,0 +1,83 @@
+"""argparse actions for the gbp command line"""
+
+import argparse
+import sys
+from typing import Any, NoReturn
+
+from gbpcli import bundle, manifest, trace
+
+
+class LazySubParsersAction(
+    argparse._SubParsersAction  # pylint: disable=protected-access
+):
+    """Subparsers whose subcommand modules are only loaded when the subcommand is used
+
+    The subcommand's arguments are added to its parser when it is loaded.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.unloaded: dict[str, manifest.Subcommand] = {}
+
+    def add_subcommand(self, subcommand: manifest.Subcommand) -> None:
+        """Add a parser for the (not yet loaded) subcommand"""
+        self.add_parser(
+            subcommand.name,
+            description=subcommand.help,
+            formatter_class=argparse.RawTextHelpFormatter,
+        )
+        self.unloaded[subcommand.name] = subcommand
+
+    def load(self, name: str) -> None:
+        """Load the given subcommand, if not already loaded"""
+        if (subcommand := self.unloaded.pop(name, None)) is None:
+            return
+
+        with trace.span("startup", f"load {name}"):
+            if not subcommand.builtin:
+                # Plugins may need modules on the server's PYTHONPATH
+                from gbpcli.utils import (  # pylint: disable=import-outside-toplevel
+                    re_path,
+                )
+
+                re_path()
+
+            module = subcommand.load()
+            subparser = self.choices[name]
+            module.parse_args(subparser)
+            subparser.set_defaults(func=module.handler)
+
+    def load_all(self) -> None:
+        """Load all the subcommands"""
+        for name in list(self.unloaded):
+            self.load(name)
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: Any,
+        option_string: str | None = None,
+    ) -> None:
+        self.load(values[0])
+        super().__call__(parser, namespace, values, option_string)
+
+
+class VersionAction(argparse.Action):
+    """Like argparse's "version" action but the version is only looked up when used"""
+
+    def __init__(self, option_strings: list[str], dest: str, **kwargs: Any) -> None:
+        kwargs.setdefault("help", "show program's version number and exit")
+        super().__init__(
+            option_strings, dest, nargs=0, default=argparse.SUPPRESS, **kwargs
+        )
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: Any,
+        option_string: str | None = None,
+    ) -> NoReturn:
+        sys.stdout.write(f"gbpcli {bundle.version('gbpcli')}\n")
+        parser.exit()
@@ -0,0 +1,228 @@
+"""Long-lived local agent for gbp
+
+Starting gbp, building its argument parser and connecting to the GBP server often takes
+longer than the command itself. The agent (`gbp agent`) does this once and then runs
+commands sent to it over a Unix socket, streaming their output back to the client.
+
+The protocol is line-oriented JSON. The client sends a single request:
+
+    {"argv": [...], "tty": true, "width": 120}
+
+The agent responds with any number of {"out": text} and {"err": text} messages followed
+by either {"exit": status} or, if the command must be run by the client itself,
+{"local": true}.
+"""
+
+import io
+import json
+import logging
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import IO, Any, Callable, cast
+
+import platformdirs
+
+from gbpcli.settings import Settings
+
+SOCKET_NAME = "agent.sock"
+
+logger = logging.getLogger(__name__)
+
+type Request = dict[str, Any]
+type Runner = Callable[[Request, IO[str], IO[str]], int | None]
+
+
+def socket_path(settings: Settings) -> Path:
+    """Return the path of the agent's socket"""
+    if settings.AGENT_SOCKET:
+        return Path(settings.AGENT_SOCKET)
+
+    return Path(platformdirs.user_runtime_dir("gbpcli")) / SOCKET_NAME
+
+
+def forward(path: Path, argv: list[str]) -> int | None:
+    """Run the command given by argv on the agent listening on path
+
+    The command's output is written to stdout/stderr and its exit status is returned.
+    Return None if the command was not run. Either because there is no agent or because
+    the command must be run locally.
+    """
+    if "_ARGCOMPLETE" in os.environ:
+        # Shell completion is always done locally
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(str(path))
+    except OSError as error:
+        sock.close()
+        logger.debug("Not using the agent: %s", error)
+        return None
+
+    tty = sys.stdout.isatty()
+    request = {
+        "argv": argv,
+        "tty": tty,
+        "width": shutil.get_terminal_size().columns if tty else None,
+    }
+
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode("UTF-8") + b"\n")
+        stream.flush()
+
+        for line in stream:
+            match json.loads(line):
+                case {"out": str() as text}:
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+                case {"err": str() as text}:
+                    sys.stderr.write(text)
+                    sys.stderr.flush()
+                case {"exit": int() as status}:
+                    return status
+                case {"local": True}:
+                    return None
+
+    sys.stderr.write("Lost connection to the agent\n")
+    return 1
+
+
+def is_listening(path: Path) -> bool:
+    """Return True if an agent is listening on the given path"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+
+    return True
+
+
+def serve(path: Path, run: Runner) -> None:
+    """Listen on the given path and run the commands sent to it. Runs forever
+
+    run is called, in its own thread, for each request with the request and the files
+    to write the command's output to. It returns the exit status, or None if the command
+    must be run by the client.
+
+    SIGTERM raises KeyboardInterrupt so that the socket is removed on termination.
+    """
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)  # Stale socket from an agent that was killed
+
+    with AgentServer(path, run) as server:
+        try:
+            server.serve_forever()
+        finally:
+            path.unlink(missing_ok=True)
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Server handling agent requests, each in its own thread"""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, run: Runner) -> None:
+        self.run = run
+        super().__init__(str(path), AgentRequestHandler)
+
+    def server_bind(self) -> None:
+        # Only the user can connect to the socket
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+
+class AgentRequestHandler(socketserver.StreamRequestHandler):
+    """Handle a single agent request"""
+
+    server: AgentServer
+
+    def handle(self) -> None:
+        if (uid := peer_uid(self.request)) != os.getuid():
+            logger.warning("Refusing request from uid %s", uid)
+            return
+
+        lock = threading.Lock()
+
+        def send(message: dict[str, Any]) -> None:
+            with lock:
+                self.wfile.write(json.dumps(message).encode("UTF-8") + b"\n")
+
+        if not (line := self.rfile.readline()):
+            return  # Connected without a request. See is_listening()
+
+        try:
+            request = json.loads(line)
+            out = cast(IO[str], MessageWriter("out", send))
+            err = cast(IO[str], MessageWriter("err", send))
+
+            try:
+                status = self.server.run(request, out, err)
+            except SystemExit as error:
+                status = exit_status(error, err)
+            except BaseException as error:  # pylint: disable=broad-exception-caught
+                logger.exception("Error running %s", request.get("argv"))
+                err.write(f"{error}\n")
+                status = 1
+
+            send({"local": True} if status is None else {"exit": status})
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Client went away")
+
+
+class MessageWriter(io.TextIOBase):
+    """Text file sending what is written to the client as messages"""
+
+    def __init__(self, name: str, send: Callable[[dict[str, Any]], None]) -> None:
+        super().__init__()
+        self.name = name
+        self.send = send
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str, /) -> int:
+        """Send the text to the client"""
+        if s:
+            self.send({self.name: s})
+
+        return len(s)
+
+
+def exit_status(error: SystemExit, err: IO[str]) -> int:
+    """Return the exit status for the SystemExit
+
+    As the interpreter does, a code that isn't an int is the error message, written to
+    err, and the status is 1.
+    """
+    match error.code:
+        case None:
+            return 0
+        case int() as code:
+            return code
+
+    err.write(f"{error.code}\n")
+
+    return 1
+
+
+def peer_uid(sock: socket.socket) -> int:
+    """Return the uid of the process on the other end of the (Unix) socket"""
+    creds = sock.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", creds)
+
+    return uid
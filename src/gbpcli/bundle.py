@@ -0,0 +1,103 @@
+"""Build-time bundle of a package's version and GraphQL queries
+
+Looking up the installed version scans the distributions' metadata and each query is
+read from the package's resources. Both are known when the wheel is built, so the pdm
+build hook generates a module, <package>/_bundle.py, holding them. At runtime
+version() and queries() use the bundle when it exists and fall back to the metadata
+and resources when it doesn't (for example in an editable install).
+
+This module is also the build hook. It only uses the standard library so that it can
+be loaded in the build environment. Plugin distributions with their own queries can
+use it by adding gbpcli to their build requirements and, in their pdm_build.py:
+
+    from gbpcli.bundle import pdm_build_hook_enabled, pdm_build_initialize
+"""
+
+import functools
+import importlib
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+MODULE = "_bundle"
+
+TEMPLATE = '''"""Generated by the gbpcli.bundle build hook. Do not edit"""
+
+VERSION = {version!r}
+
+QUERIES = {queries!r}
+'''
+
+
+@functools.cache
+def load(package: str) -> ModuleType | None:
+    """Return the package's bundle module or None if it doesn't have one"""
+    try:
+        return importlib.import_module(f"{package}.{MODULE}")
+    except ModuleNotFoundError:
+        return None
+
+
+@functools.cache
+def version(package: str) -> str:
+    """Return the version of the (distribution of the) given package"""
+    if (module := load(package)) is not None:
+        return str(module.VERSION)
+
+    # pylint: disable=import-outside-toplevel
+    from importlib.metadata import version as metadata_version
+
+    return metadata_version(package)
+
+
+def queries(package: str) -> dict[str, str] | None:
+    """Return the package's bundled queries (by name)
+
+    Return None if the package has no bundle.
+    """
+    if (module := load(package)) is None:
+        return None
+
+    bundled: dict[str, str] = module.QUERIES
+
+    return bundled
+
+
+def render(version_str: str, package_queries: dict[str, str]) -> str:
+    """Return the source of the bundle module"""
+    return TEMPLATE.format(version=version_str, queries=package_queries)
+
+
+def read_queries(package_path: Path) -> dict[str, str]:
+    """Return the queries in the queries/ directory of the package at the given path"""
+    return {
+        path.stem: path.read_text(encoding="UTF-8")
+        for path in sorted((package_path / "queries").glob("*.graphql"))
+    }
+
+
+def pdm_build_hook_enabled(context: Any) -> bool:
+    """pdm build hook: only bundle into wheels
+
+    sdists build the bundle when their wheel is built and editable installs read the
+    (possibly changing) source files.
+    """
+    return bool(context.target == "wheel")
+
+
+def pdm_build_initialize(context: Any) -> None:
+    """pdm build hook: write the bundle of each package having queries"""
+    package_dir = Path(context.root, context.config.build_config.package_dir or ".")
+    version_str = str(context.config.metadata["version"])
+
+    for package_path in sorted(package_dir.iterdir()):
+        if not (package_path / "__init__.py").is_file():
+            continue
+        if not (package_path / "queries").is_dir():
+            continue
+
+        target = Path(context.build_dir, package_path.name, f"{MODULE}.py")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(
+            render(version_str, read_queries(package_path)), encoding="UTF-8"
+        )
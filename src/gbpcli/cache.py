@@ -0,0 +1,178 @@
+"""Persistent on-disk cache for API responses
+
+Some data returned by the API never changes, for example the logs and packages of a
+completed build. These responses can be stored in the Cache so that they need only be
+downloaded once.
+
+Entries are stored as JSON files in their own directory (DIRNAME) under the user's cache
+directory, so other files cached there are never counted, cleared or evicted as entries.
+When the total size of the entries exceeds the maximum size, the least-recently used
+entries are removed.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+DIRNAME = "responses-cache"
+SUFFIX = ".json"
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class CacheStats:
+    """Statistics about a Cache"""
+
+    path: Path
+    entries: int
+    size: int
+    max_size: int
+
+
+class Cache:
+    """Size-limited, least-recently used, on-disk cache
+
+    The cache directory is not created until the first entry is stored. It is private to
+    the user as entries can hold data only they are allowed to see. A cache that can't
+    be read or written is treated as empty.
+    """
+
+    def __init__(self, path: str | Path, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        # Size of the entries when last scanned plus the size of those stored since
+        # (an overestimate when entries are replaced). None if not yet scanned
+        self._size: int | None = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.path)!r}, max_size={self.max_size})"
+
+    @staticmethod
+    def key(url: str, query: str, variables: dict[str, Any]) -> str:
+        """Return the cache key for the given query sent to the given url"""
+        query_hash = hashlib.sha256(query.encode("UTF-8")).hexdigest()
+        variables_str = json.dumps(variables, sort_keys=True)
+        key_str = f"{url}\n{query_hash}\n{variables_str}"
+
+        return hashlib.sha256(key_str.encode("UTF-8")).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Return the value stored for the given key
+
+        If there is no such entry, return None.
+        """
+        filename = self.path / f"{key}{SUFFIX}"
+
+        try:
+            with open(filename, "rb") as fp:
+                value = json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+        # Reading does not reliably update atime, so "touch" the entry for LRU. It may
+        # have been evicted since
+        with contextlib.suppress(OSError):
+            os.utime(filename)
+
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store the value for the given key
+
+        The value must be JSON-serializable. Least-recently used entries are removed
+        if storing the value takes the cache over its maximum size. Failing to store the
+        value is not an error.
+        """
+        try:
+            size = self._write(key, value)
+        except OSError:
+            return
+
+        if self._size is not None:
+            self._size += size
+
+        if self._size is None or self._size > self.max_size:
+            self.evict()
+
+    def evict(self) -> int:
+        """Remove least-recently used entries until the cache fits its maximum size
+
+        Return the number of entries removed.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        size = sum(entry[1].st_size for entry in entries)
+        removed = 0
+
+        for path, stat in entries:
+            if size <= self.max_size:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                continue
+            size -= stat.st_size
+            removed += 1
+
+        self._size = size
+
+        return removed
+
+    def stats(self) -> CacheStats:
+        """Return statistics about the cache"""
+        entries = [stat for _, stat in self._entries()]
+
+        return CacheStats(
+            path=self.path,
+            entries=len(entries),
+            size=sum(stat.st_size for stat in entries),
+            max_size=self.max_size,
+        )
+
+    def clear(self) -> int:
+        """Remove all entries from the cache
+
+        Return the number of entries removed.
+        """
+        removed = 0
+
+        for path, _ in self._entries():
+            path.unlink(missing_ok=True)
+            removed += 1
+
+        self._size = None
+
+        return removed
+
+    def _write(self, key: str, value: Any) -> int:
+        """Write the entry (atomically) and return its size"""
+        self.path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        filename = self.path / f"{key}{SUFFIX}"
+
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path, suffix=".tmp", delete=False, encoding="UTF-8"
+        ) as fp:
+            json.dump(value, fp, separators=(",", ":"))
+
+        try:
+            os.replace(fp.name, filename)
+        except OSError:
+            Path(fp.name).unlink(missing_ok=True)
+            raise
+
+        return filename.stat().st_size
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+
+        for path in self.path.glob(f"*{SUFFIX}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                pass
+
+        return entries
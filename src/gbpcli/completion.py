@@ -0,0 +1,151 @@
+"""Cache of the values used for shell completion
+
+Completing machine names and build numbers requires querying the server, and that
+happens on each TAB press. So the values are cached per server in the user's cache
+directory. Values older than the TTL (Settings.COMPLETION_TTL) are still used, but they
+are refreshed by a background process for the next TAB press. Values older than
+Settings.COMPLETION_MAX_AGE (for example, because the refresh keeps failing) are not
+used at all.
+
+The background process is this module run as a script:
+
+    python -m gbpcli.completion URL KEY
+
+It is given the sys.path of the current process so that it can import gbpcli however
+gbp was installed (for example, as a zipapp).
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import platformdirs
+
+from gbpcli.settings import Settings
+
+DIRNAME = "completion"
+MACHINES = "machines"
+BUILDS = "builds/"
+
+
+def machines(url: str) -> list[str]:
+    """Return the names of the machines on the server at url"""
+    return get(url, MACHINES)
+
+
+def build_numbers(url: str, machine: str) -> list[str]:
+    """Return the numbers of the machine's builds on the server at url"""
+    return get(url, f"{BUILDS}{machine}")
+
+
+def get(url: str, key: str) -> list[str]:
+    """Return the cached completion values for the given key
+
+    If the values are not cached, or are older than the max age, they are fetched from
+    the server. If they are older than the TTL they are refreshed in the background.
+    """
+    settings = Settings.from_environ()
+    ttl = settings.COMPLETION_TTL
+
+    if not ttl:
+        return fetch(url, key)
+
+    path = cache_path(url)
+    entry = read(path).get(key)
+    max_age = max(ttl, settings.COMPLETION_MAX_AGE)
+
+    if entry is None or (age := time.time() - entry["time"]) > max_age:
+        values = fetch(url, key)
+        write(path, key, values)
+        return values
+
+    if age > ttl:
+        refresh_in_background(url, key)
+
+    return list(entry["values"])
+
+
+def fetch(url: str, key: str) -> list[str]:
+    """Fetch the completion values for the given key from the server"""
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from gbpcli import get_gbp, get_user_config
+
+    gbp = get_gbp(url, get_user_config(os.environ.get("GBPCLI_CONFIG")))
+
+    if key == MACHINES:
+        return gbp.machine_names()
+
+    if key.startswith(BUILDS):
+        numbers = gbp.build_numbers(key[len(BUILDS) :])
+        return [str(number) for number in reversed(numbers)]
+
+    raise ValueError(f"Invalid completion key: {key!r}")
+
+
+def refresh(url: str, key: str) -> None:
+    """Fetch the values for the given key from the server and cache them"""
+    write(cache_path(url), key, fetch(url, key))
+
+
+def refresh_in_background(url: str, key: str) -> None:
+    """Refresh the values for the given key in a separate process
+
+    The process is detached so that the shell does not wait for it.
+    """
+    python_path = os.pathsep.join(path for path in sys.path if path)
+
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", __name__, url, key],
+        env={**os.environ, "PYTHONPATH": python_path},
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def cache_path(url: str) -> Path:
+    """Return the path of the completion cache file for the server at url"""
+    name = hashlib.sha256(url.encode("UTF-8")).hexdigest()[:16]
+
+    return Path(platformdirs.user_cache_dir("gbpcli"), DIRNAME, f"{name}.json")
+
+
+def read(path: Path) -> dict[str, Any]:
+    """Return the cache entries in the file at path
+
+    If the file does not exist or is not valid, return an empty dict.
+    """
+    try:
+        with open(path, "rb") as fp:
+            entries = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+    return entries if isinstance(entries, dict) else {}
+
+
+def write(path: Path, key: str, values: list[str]) -> None:
+    """Store the values for key in the cache file at path
+
+    Failing to write the cache is not an error.
+    """
+    entries = read(path)
+    entries[key] = {"time": time.time(), "values": values}
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(entries), encoding="UTF-8")
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    refresh(*sys.argv[1:3])
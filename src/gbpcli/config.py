@@ -8,7 +8,6 @@ import os
 import platform
 import stat
 import sys
-import tomllib
 import typing as t
 from dataclasses import dataclass
 
@@ -32,14 +31,14 @@ class Config:
     url: str | None = None
     my_machines: list[str] | None = None
     auth: AuthDict | None = None
+    cache_size: int | None = None
+    connect_timeout: float | None = None
+    read_timeout: float | None = None
 
     @classmethod
     def from_file(cls: type[_T], fp: t.IO[bytes]) -> _T:
         """Return a Config instance given the config file"""
-        toml_data = tomllib.load(fp)
-        gbpcli_data = get_section(toml_data, SECTION)
-
-        config = cls(**gbpcli_data)
+        config = cls(**read_section(fp))
 
         if config.auth:
             maybe_warn_on_perms(fp.fileno())
@@ -47,6 +46,19 @@ class Config:
         return config
 
 
+def read(path: str) -> dict[str, t.Any]:
+    """Return the gbpcli section of the config file at path"""
+    with open(path, "rb") as fp:
+        return read_section(fp)
+
+
+def read_section(fp: t.IO[bytes]) -> dict[str, t.Any]:
+    """Return the gbpcli section of the config file"""
+    import tomllib  # pylint: disable=import-outside-toplevel
+
+    return get_section(tomllib.load(fp), SECTION)
+
+
 def get_section(toml_data: dict[str, t.Any], section: str) -> dict[str, t.Any]:
     """Return the given section from the toml_data dict
 
@@ -0,0 +1,198 @@
+"""Gentoo package CPVs (category/package-version strings)
+
+Parsed CPVs are shared: parse() is cached and the category and package names are
+interned, so the many packages of a server's builds don't each carry their own copies.
+Versions are ordered the way Portage orders them (PMS section 3.3).
+"""
+
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache, total_ordering
+
+CACHE_SIZE = 16384
+SUFFIXES = {"alpha": 0, "beta": 1, "pre": 2, "rc": 3, "p": 5}
+# The rank of no (more) suffixes, between _rc and _p
+NO_SUFFIX = 4
+
+VERSION = r"(\d+(?:\.\d+)*)([a-z]?)((?:_(?:alpha|beta|pre|rc|p)\d*)*)"
+CPV_RE = re.compile(
+    rf"(?P<category>[\w+][\w+.-]*)/(?P<package>[\w+][\w+-]*?)"
+    rf"-(?P<version>{VERSION})(?:-r(?P<revision>\d+))?"
+)
+VERSION_RE = re.compile(VERSION)
+SUFFIX_RE = re.compile(r"_(alpha|beta|pre|rc|p)(\d*)")
+
+
+@total_ordering
+@dataclass(frozen=True, slots=True, eq=False)
+class Version:
+    """A package version, without the revision"""
+
+    numbers: tuple[str, ...]
+    letter: str
+    suffixes: tuple[tuple[int, int], ...]
+
+    def compare(self, other: "Version") -> int:
+        """Return <0, 0 or >0 if this version is less, equal or greater than other"""
+        if result := compare_numbers(self.numbers, other.numbers):
+            return result
+
+        if self.letter != other.letter:
+            return -1 if self.letter < other.letter else 1
+
+        return compare_suffixes(self.suffixes, other.suffixes)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.compare(other) == 0
+
+    def __lt__(self, other: "Version") -> bool:
+        return self.compare(other) < 0
+
+    def __hash__(self) -> int:
+        # Versions such as 1.0 and 1.00 are equal
+        numbers = (int(self.numbers[0]), *(n.rstrip("0") for n in self.numbers[1:]))
+        return hash((numbers, self.letter, self.suffixes))
+
+
+@total_ordering
+@dataclass(frozen=True, slots=True, eq=False)
+class Cpv:
+    """A package's category, name, version and revision
+
+    Cpvs are ordered by category and package name and then by version.
+    """
+
+    category: str
+    package: str
+    version: str
+    revision: int = 0
+
+    @classmethod
+    def parse(cls, cpv: str) -> "Cpv":
+        """Return the Cpv of the given string
+
+        Raise ValueError if it isn't a valid CPV.
+        """
+        return parse(cpv)
+
+    @property
+    def cp(self) -> str:  # pylint: disable=invalid-name
+        """The category/package part"""
+        return f"{self.category}/{self.package}"
+
+    @property
+    def pvr(self) -> str:
+        """The version and revision (if any)"""
+        return f"{self.version}-r{self.revision}" if self.revision else self.version
+
+    def compare(self, other: "Cpv") -> int:
+        """Return <0, 0 or >0 if this Cpv is less, equal or greater than other"""
+        names = (self.category, self.package)
+        other_names = (other.category, other.package)
+
+        if names != other_names:
+            return -1 if names < other_names else 1
+
+        version = parse_version(self.version)
+        if result := version.compare(parse_version(other.version)):
+            return result
+
+        return self.revision - other.revision
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Cpv):
+            return NotImplemented
+        return self.compare(other) == 0
+
+    def __lt__(self, other: "Cpv") -> bool:
+        return self.compare(other) < 0
+
+    def __hash__(self) -> int:
+        return hash(
+            (self.category, self.package, parse_version(self.version), self.revision)
+        )
+
+    def __str__(self) -> str:
+        return f"{self.cp}-{self.pvr}"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(cpv: str) -> Cpv:
+    """Return the Cpv of the given string
+
+    Raise ValueError if it isn't a valid CPV.
+    """
+    if not (match := CPV_RE.fullmatch(cpv)):
+        raise ValueError(cpv)
+
+    return Cpv(
+        category=sys.intern(match["category"]),
+        package=sys.intern(match["package"]),
+        version=match["version"],
+        revision=int(match["revision"] or 0),
+    )
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_version(version: str) -> Version:
+    """Return the Version of the given string
+
+    Raise ValueError if it isn't a valid version.
+    """
+    if not (match := VERSION_RE.fullmatch(version)):
+        raise ValueError(version)
+
+    numbers, letter, suffixes = match.groups()
+
+    return Version(
+        numbers=tuple(numbers.split(".")),
+        letter=letter,
+        suffixes=tuple(
+            (SUFFIXES[name], int(number or 0))
+            for name, number in SUFFIX_RE.findall(suffixes)
+        ),
+    )
+
+
+def compare_numbers(left: tuple[str, ...], right: tuple[str, ...]) -> int:
+    """Compare the numeric components of two versions
+
+    The first components are compared as integers. Later ones are too unless one of them
+    has a leading zero, in which case they are compared as strings without their
+    trailing zeros (so 1.01 < 1.1 and 1.010 == 1.01).
+    """
+    if (first := int(left[0]) - int(right[0])) != 0:
+        return first
+
+    for a, b in zip(left[1:], right[1:]):
+        if a.startswith("0") or b.startswith("0"):
+            a, b = a.rstrip("0"), b.rstrip("0")
+            if a != b:
+                return -1 if a < b else 1
+        elif (result := int(a) - int(b)) != 0:
+            return result
+
+    return len(left) - len(right)
+
+
+def compare_suffixes(
+    left: tuple[tuple[int, int], ...], right: tuple[tuple[int, int], ...]
+) -> int:
+    """Compare the (rank, number) suffixes of two versions
+
+    A version with more suffixes is greater if its next one is _p, otherwise it's less.
+    """
+    for a, b in zip(left, right):
+        if a != b:
+            return -1 if a < b else 1
+
+    if len(left) == len(right):
+        return 0
+
+    rank = (left if len(left) > len(right) else right)[min(len(left), len(right))][0]
+    longer_is_greater = rank > NO_SUFFIX
+
+    return 1 if longer_is_greater == (len(left) > len(right)) else -1
@@ -1,21 +1,82 @@
 """Abstraction of the Gentoo Build Publisher API"""
 
 # mypy: disable-error-code="attr-defined"
-from typing import Any, cast
+from typing import Any, AsyncIterator, Callable, Generator, Iterable, cast
 
 import yarl
 
-from gbpcli import config, graphql
-from gbpcli.types import Build, Change, ChangeState, SearchField
+from gbpcli import config, graphql, trace
+from gbpcli.cache import Cache
+from gbpcli.settings import Settings
+from gbpcli.types import Build, BuildCollection, Change, ChangeState, SearchField
 
 check = graphql.check
 
+DEFAULT_CONCURRENCY = 16
 
-class GBP:
+
+class GBP:  # pylint: disable=too-many-public-methods
     """Python wrapper for the Gentoo Build Publisher API"""
 
-    def __init__(self, url: str, *, auth: config.AuthDict | None = None) -> None:
-        self.query = graphql.Queries(yarl.URL(url) / "graphql", auth=auth)
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        url: str,
+        *,
+        auth: config.AuthDict | None = None,
+        pool_size: int | None = None,
+        cache: Cache | None = None,
+        settings: Settings | None = None,
+        timeout: graphql.Timeout | None = None,
+    ) -> None:
+        self.query = graphql.Queries(
+            yarl.URL(url) / "graphql",
+            auth=auth,
+            pool_size=pool_size,
+            settings=settings,
+            timeout=timeout,
+        )
+        self.cache = cache
+
+    def _cached(self, query: graphql.Query, **kwargs: Any) -> graphql.QueryResult:
+        """Call the given query, using the cache if possible
+
+        Only results of completed builds are stored in the cache as these never change.
+        """
+        if (result := self._cache_get(query, kwargs)) is not None:
+            return result
+
+        result = query(**kwargs)
+        self._cache_set(query, kwargs, result)
+
+        return result
+
+    def _cache_get(
+        self, query: graphql.Query, variables: dict[str, Any]
+    ) -> graphql.QueryResult | None:
+        """Return the cached result of the given query
+
+        Return None if there is no cache or the result is not cached.
+        """
+        if self.cache is None:
+            return None
+
+        data = self.cache.get(self.cache.key(query.url, query.query, variables))
+
+        return None if data is None else (data, {})
+
+    def _cache_set(
+        self,
+        query: graphql.Query,
+        variables: dict[str, Any],
+        query_result: graphql.QueryResult,
+    ) -> None:
+        """Store the result of the given query if it is for completed builds"""
+        data, errors = query_result
+
+        if self.cache is None or errors or not is_completed(data):
+            return
+
+        self.cache.set(self.cache.key(query.url, query.query, variables), data)
 
     def machines(
         self, *, names: list[str] | None = None
@@ -72,26 +133,54 @@ class GBP:
 
         return Build.from_id(build_id)
 
-    def builds(self, machine: str, *, with_packages: bool = False) -> list[Build]:
-        """Return a list of Builds for the given machine"""
-        builds = reversed(
-            self.query.gbpcli.builds(machine=machine, withPackages=with_packages)[0][
-                "builds"
-            ]
+    def builds(self, machine: str, *, with_packages: bool = False) -> BuildCollection:
+        """Return the Builds for the given machine, oldest first"""
+        items = self.query.gbpcli.builds.stream(
+            "builds", machine=machine, withPackages=with_packages
         )
+        with trace.accumulate("convert", "BuildCollection.from_api_response"):
+            builds = BuildCollection.from_api_response(items)
+        builds.reverse()
+
+        return builds
+
+    def iter_builds(
+        self, machine: str, *, with_packages: bool = False
+    ) -> Generator[Build, None, None]:
+        """Yield the Builds for the given machine as they are received
+
+        Unlike builds(), the most recent build comes first. The response is decoded
+        incrementally so only the Builds, not the entire response, are held in memory.
+        Closing the generator closes the response.
+        """
+        items = self.query.gbpcli.builds.stream(
+            "builds", machine=machine, withPackages=with_packages
+        )
+
+        for item in items:
+            yield to_build(item)
 
-        return [Build.from_api_response(i) for i in builds]
+    def build_numbers(self, machine: str) -> list[int]:
+        """Return the numbers of the given machine's builds
+
+        Like builds() but only the build numbers are retrieved. Most recent first.
+        """
+        builds = check(self.query.gbpcli.build_numbers(machine=machine))["builds"]
+
+        return [Build.from_id(build["id"]).number for build in builds]
 
     def diff(
         self, machine: str, left: int, right: int, with_packages: bool = False
     ) -> tuple[Build, Build, list[Change]]:
         """Return difference between two builds"""
         query = self.query.gbpcli.diff_stat if with_packages else self.query.gbpcli.diff
-        data = check(query(left=f"{machine}.{left}", right=f"{machine}.{right}"))
+        data = check(
+            self._cached(query, left=f"{machine}.{left}", right=f"{machine}.{right}")
+        )
 
         return (
-            Build.from_api_response(data["diff"]["left"]),
-            Build.from_api_response(data["diff"]["right"]),
+            to_build(data["diff"]["left"]),
+            to_build(data["diff"]["right"]),
             [
                 Change(
                     item=i["item"],
@@ -104,20 +193,58 @@ class GBP:
 
     def logs(self, build: Build) -> str | None:
         """Return logs for the given Build"""
-        data = check(self.query.gbpcli.logs(id=build.id))
+        return logs_from_result(self._cached(self.query.gbpcli.logs, id=build.id))
+
+    def logs_batch(self, builds: Iterable[Build]) -> list[str | None]:
+        """Return logs for each of the given Builds
+
+        Like logs() but the logs for all builds are retrieved in a single request.
+        """
+        query = self.query.gbpcli.logs
+        results: list[graphql.QueryResult | graphql.BatchItem] = []
 
-        return None if data["build"] is None else data["build"]["logs"]
+        with self.query.batch() as batch:
+            for build in builds:
+                variables = {"id": build.id}
+                result = self._cache_get(query, variables)
+                results.append(result or batch.add(query, **variables))
+
+        return [
+            logs_from_result(
+                self._batch_result(query, result)
+                if isinstance(result, graphql.BatchItem)
+                else result
+            )
+            for result in results
+        ]
+
+    def _batch_result(
+        self, query: graphql.Query, item: graphql.BatchItem
+    ) -> graphql.QueryResult:
+        """Return the result of the BatchItem of the given query
+
+        The result is stored in the cache if possible.
+        """
+        result = item.result()
+        self._cache_set(query, item.original_variables, result)
+
+        return result
 
     def get_build_info(self, build: Build) -> Build | None:
         """Return build with info gained from the GBP API"""
-        data, errors = self.query.gbpcli.build(id=build.id)
+        return build_from_result(self.query.gbpcli.build(id=build.id))
 
-        if (build := data["build"]) is None:
-            if errors:
-                raise graphql.APIError(errors, data)
-            return None
+    def get_build_info_batch(self, builds: Iterable[Build]) -> list[Build | None]:
+        """Return each of the builds with info gained from the GBP API
+
+        Like get_build_info() but all builds are retrieved in a single request.
+        """
+        with self.query.batch() as batch:
+            items = [
+                batch.add(self.query.gbpcli.build, id=build.id) for build in builds
+            ]
 
-        return Build.from_api_response(build)
+        return [build_from_result(item.result()) for item in items]
 
     def build(self, machine: str, *, is_repo=False, **params: Any) -> str:
         """Schedule a build"""
@@ -136,9 +263,9 @@ class GBP:
 
         If build_id is True, include the package's build id in the result.
         """
-        data = check(self.query.gbpcli.packages(id=build.id, buildId=build_ids))[
-            "build"
-        ]
+        data = check(
+            self._cached(self.query.gbpcli.packages, id=build.id, buildId=build_ids)
+        )["build"]
         return data and cast(list[str] | None, data.get("packages"))
 
     def keep(self, build: Build) -> dict[str, bool]:
@@ -175,7 +302,7 @@ class GBP:
         )
         builds = api_response["search"]
 
-        return [Build.from_api_response(i) for i in builds]
+        return [to_build(i) for i in builds]
 
     def tag(self, build: Build, tag: str) -> None:
         """Add the given tag to the build"""
@@ -184,3 +311,188 @@ class GBP:
     def untag(self, machine: str, tag: str) -> None:
         """Remove the tag from the given machine"""
         check(self.query.gbpcli.untag_build(machine=machine, tag=tag))
+
+
+def is_completed(data: Any) -> bool:
+    """Return True if all the builds in the given data are completed
+
+    Builds are objects having a "completed" field. If there are no builds in the data,
+    return False.
+    """
+    completed: list[Any] = []
+    objects = [data]
+
+    while objects:
+        match obj := objects.pop():
+            case dict():
+                if "completed" in obj:
+                    completed.append(obj["completed"])
+                objects.extend(obj.values())
+            case list():
+                objects.extend(obj)
+
+    return bool(completed) and all(value is not None for value in completed)
+
+
+def to_build(api_response: dict[str, Any]) -> Build:
+    """Return the Build given its representation in an API response"""
+    with trace.accumulate("convert", "Build.from_api_response"):
+        return Build.from_api_response(api_response)
+
+
+def logs_from_result(query_result: graphql.QueryResult) -> str | None:
+    """Return the logs from the logs query result"""
+    data = check(query_result)
+
+    return None if data["build"] is None else data["build"]["logs"]
+
+
+def build_from_result(query_result: graphql.QueryResult) -> Build | None:
+    """Return the Build from the build query result
+
+    If the build was not found, return None.
+    """
+    data, errors = query_result
+
+    if (build := data["build"]) is None:
+        if errors:
+            raise graphql.APIError(errors, data)
+        return None
+
+    return to_build(build)
+
+
+class AsyncGBP:  # pylint: disable=too-many-public-methods
+    """asyncio wrapper for the Gentoo Build Publisher API
+
+    This has the same methods as GBP however they are coroutines. Each call is run in a
+    worker thread using a connection from a shared pool, so many queries can be awaited
+    at once. For example::
+
+        >>> gbp = AsyncGBP("http://gbp/")
+        >>> async def latest_builds(machines):
+        ...     return await asyncio.gather(*(gbp.latest(m) for m in machines))
+
+    At most `max_concurrency` queries are in flight at any given time.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        auth: config.AuthDict | None = None,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        # asyncio is imported here, as it is slow to import and not needed by GBP
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        self.gbp = GBP(url, auth=auth, pool_size=max_concurrency)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run[T](self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run the (blocking) GBP func in a worker thread"""
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        async with self.semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def machines(
+        self, *, names: list[str] | None = None
+    ) -> list[tuple[str, int, dict[str, Any]]]:
+        """Async version of GBP.machines()"""
+        return await self._run(self.gbp.machines, names=names)
+
+    async def machine_names(self) -> list[str]:
+        """Async version of GBP.machine_names()"""
+        return await self._run(self.gbp.machine_names)
+
+    async def publish(self, build: Build) -> None:
+        """Async version of GBP.publish()"""
+        await self._run(self.gbp.publish, build)
+
+    async def pull(
+        self, build: Build, *, note: str | None = None, tags: list[str] | None = None
+    ) -> None:
+        """Async version of GBP.pull()"""
+        await self._run(self.gbp.pull, build, note=note, tags=tags)
+
+    async def latest(self, machine: str) -> Build | None:
+        """Async version of GBP.latest()"""
+        return await self._run(self.gbp.latest, machine)
+
+    async def resolve_tag(self, machine: str, tag: str) -> Build | None:
+        """Async version of GBP.resolve_tag()"""
+        return await self._run(self.gbp.resolve_tag, machine, tag)
+
+    async def builds(
+        self, machine: str, *, with_packages: bool = False
+    ) -> BuildCollection:
+        """Async version of GBP.builds()"""
+        return await self._run(self.gbp.builds, machine, with_packages=with_packages)
+
+    async def iter_builds(
+        self, machine: str, *, with_packages: bool = False
+    ) -> AsyncIterator[Build]:
+        """Async version of GBP.iter_builds()"""
+        builds = self.gbp.iter_builds(machine, with_packages=with_packages)
+
+        while (build := await self._run(next, builds, None)) is not None:
+            yield build
+
+    async def build_numbers(self, machine: str) -> list[int]:
+        """Async version of GBP.build_numbers()"""
+        return await self._run(self.gbp.build_numbers, machine)
+
+    async def diff(
+        self, machine: str, left: int, right: int, with_packages: bool = False
+    ) -> tuple[Build, Build, list[Change]]:
+        """Async version of GBP.diff()"""
+        return await self._run(self.gbp.diff, machine, left, right, with_packages)
+
+    async def logs(self, build: Build) -> str | None:
+        """Async version of GBP.logs()"""
+        return await self._run(self.gbp.logs, build)
+
+    async def logs_batch(self, builds: Iterable[Build]) -> list[str | None]:
+        """Async version of GBP.logs_batch()"""
+        return await self._run(self.gbp.logs_batch, builds)
+
+    async def get_build_info(self, build: Build) -> Build | None:
+        """Async version of GBP.get_build_info()"""
+        return await self._run(self.gbp.get_build_info, build)
+
+    async def get_build_info_batch(self, builds: Iterable[Build]) -> list[Build | None]:
+        """Async version of GBP.get_build_info_batch()"""
+        return await self._run(self.gbp.get_build_info_batch, builds)
+
+    async def build(self, machine: str, *, is_repo=False, **params: Any) -> str:
+        """Async version of GBP.build()"""
+        return await self._run(self.gbp.build, machine, is_repo=is_repo, **params)
+
+    async def packages(self, build: Build, build_ids: bool = False) -> list[str] | None:
+        """Async version of GBP.packages()"""
+        return await self._run(self.gbp.packages, build, build_ids)
+
+    async def keep(self, build: Build) -> dict[str, bool]:
+        """Async version of GBP.keep()"""
+        return await self._run(self.gbp.keep, build)
+
+    async def release(self, build: Build) -> dict[str, bool]:
+        """Async version of GBP.release()"""
+        return await self._run(self.gbp.release, build)
+
+    async def create_note(self, build: Build, note: str | None) -> dict[str, str]:
+        """Async version of GBP.create_note()"""
+        return await self._run(self.gbp.create_note, build, note)
+
+    async def search(self, machine: str, field: SearchField, key: str) -> list[Build]:
+        """Async version of GBP.search()"""
+        return await self._run(self.gbp.search, machine, field, key)
+
+    async def tag(self, build: Build, tag: str) -> None:
+        """Async version of GBP.tag()"""
+        await self._run(self.gbp.tag, build, tag)
+
+    async def untag(self, machine: str, tag: str) -> None:
+        """Async version of GBP.untag()"""
+        await self._run(self.gbp.untag, machine, tag)
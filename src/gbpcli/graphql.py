@@ -1,14 +1,50 @@
 """graphql library for gbpcli"""
 
+# pylint: disable=too-many-lines
+
 import base64
-from functools import cache
-from importlib import metadata, resources
-from typing import Any
+import codecs
+import copy
+import gzip
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from contextlib import closing, contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from functools import cache, cached_property, partial
+from importlib import resources
+from pathlib import Path
+from typing import Any, Generator, Iterator, Mapping, Self
 
 import requests
+import requests.adapters
+import urllib3.util.request
 import yarl
 
+from gbpcli import bundle, jsonstream, snapshot, trace
 from gbpcli.config import AuthDict
+from gbpcli.settings import Settings
+
+NAME = re.compile(r"[_A-Za-z][_0-9A-Za-z]*")
+VARIABLE = re.compile(r"\$([_A-Za-z][_0-9A-Za-z]*)")
+ALIAS_SEP = re.compile(r"\s*:")
+FIRST_FIELD = re.compile(r"{\s*([_A-Za-z][_0-9A-Za-z]*)")
+
+TRANSIENT_STATUSES = frozenset({502, 503, 504})
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+type QueryResult = tuple[dict[str, Any], dict[str, Any]]
+type Timeout = tuple[float | None, float | None]
+
+logger = logging.getLogger(__name__)
 
 
 class APIError(Exception):
@@ -19,7 +55,200 @@ class APIError(Exception):
         self.data = data
 
 
-class Query:
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request while the CircuitBreaker is open"""
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when the current Deadline has passed"""
+
+
+class Deadline:
+    """Limit on the total (wall-clock) time spent on queries
+
+    This is a context manager. Within the context, requests time out when the deadline
+    is reached and no requests are sent, or retried, after it has passed. Instead
+    DeadlineExceeded is raised.
+
+    The deadline applies to the current context (see contextvars), which includes the
+    worker threads of asyncio.to_thread().
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.expires = time.monotonic() + seconds
+        self._tokens: list[Token[Deadline | None]] = []
+
+    def __enter__(self) -> Self:
+        self._tokens.append(current_deadline.set(self))
+
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        current_deadline.reset(self._tokens.pop())
+
+    def remaining(self) -> float:
+        """Return the number of seconds until the deadline"""
+        return self.expires - time.monotonic()
+
+    def check(self, cause: Exception | None = None) -> None:
+        """Raise DeadlineExceeded if the deadline has passed
+
+        The given cause is chained to the DeadlineExceeded exception.
+        """
+        if self.remaining() <= 0:
+            raise DeadlineExceeded("Deadline exceeded") from cause
+
+    def cap(self, timeout: Timeout) -> Timeout:
+        """Return the given timeout limited by the time remaining
+
+        Raise DeadlineExceeded if the deadline has passed.
+        """
+        self.check()
+        remaining = self.remaining()
+        connect, read = timeout
+
+        return (
+            remaining if connect is None else min(connect, remaining),
+            remaining if read is None else min(read, remaining),
+        )
+
+
+current_deadline: ContextVar[Deadline | None] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+class TimeoutAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter with a default timeout
+
+    Timeouts are limited by the current Deadline, if any.
+    """
+
+    def __init__(self, timeout: Timeout, **kwargs: Any) -> None:
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: bool | str = True,
+        cert: Any = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        timeout = self.timeout if timeout is None else as_timeout(timeout)
+
+        if deadline := current_deadline.get():
+            timeout = deadline.cap(timeout)
+
+        return super().send(
+            request,
+            stream=stream,
+            timeout=timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+
+
+def as_timeout(value: float | Timeout | None) -> Timeout:
+    """Return the requests-style timeout value as a (connect, read) tuple"""
+    if isinstance(value, tuple):
+        return value
+
+    return (value, value)
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class RetryPolicy:
+    """How queries are retried on transient errors
+
+    Only queries are retried. Mutations are never retried.
+    """
+
+    retries: int = 0
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+
+    def delay(self, retry: int, retry_after: str | None = None) -> float:
+        """Return the time (in seconds) to wait before the given retry (0-based)
+
+        This is exponential backoff with (equal) jitter. If the server sent a
+        Retry-After value, wait at least that long but no more than max_backoff.
+        """
+        delay = min(self.max_backoff, self.backoff * 2**retry)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_backoff, float(retry_after)))
+
+        return delay
+
+
+class CircuitBreaker:
+    """Fail fast when the server appears to be down
+
+    After `threshold` consecutive failed requests the circuit "opens" and requests
+    raise CircuitOpenError without being sent. After `cooldown` seconds one request is
+    let through. If it succeeds the circuit closes again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    def check(self, url: str) -> None:
+        """Raise CircuitOpenError if requests should not be sent"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+
+            if (waited := time.monotonic() - self.opened_at) < self.cooldown:
+                raise CircuitOpenError(
+                    f"{url} is unavailable. Not retrying for another"
+                    f" {self.cooldown - waited:.0f}s"
+                )
+
+            # Let this request through but keep failing fast until we know the result
+            self.opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        """Record a successful request. This closes the circuit"""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Record a failed request. This may open the circuit"""
+        with self._lock:
+            self.failures += 1
+
+            if self.failures >= self.threshold and self.opened_at is None:
+                logger.debug("%s consecutive failures. Opening circuit", self.failures)
+                self.opened_at = time.monotonic()
+
+
+class PersistedQueries:  # pylint: disable=too-few-public-methods
+    """Automatic persisted query (APQ) state for a server
+
+    When enabled, queries are first sent as only a hash of the query text. If the
+    server does not know the hash, the query is sent again along with the text.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def disable(self) -> None:
+        """Stop using persisted queries. For servers that don't support them"""
+        logger.debug("Server does not support persisted queries. Disabling")
+        self.enabled = False
+
+
+class Query:  # pylint: disable=too-many-instance-attributes
     """Interface to a graphql query.
 
     It can be called as a normal Python function.
@@ -30,43 +259,475 @@ class Query:
         >>> query = Query(qs, "https://gbp/graphql", requests.Session())
         >>> query(machine="lighthouse")  # doctest: +ELLIPSIS
         ({'latest': {'id': 'lighthouse...'}}, {})
+
+    If a RetryPolicy is given then the query is retried on transient errors, unless it
+    is a mutation. If a CircuitBreaker is given it is consulted before each request.
+    If PersistedQueries are given (and enabled) the query is sent as a persisted query.
     """
 
-    def __init__(
-        self, query: str, url: yarl.URL | str, session: requests.Session
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        query: str,
+        url: yarl.URL | str,
+        session: requests.Session,
+        *,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        persisted: PersistedQueries | None = None,
+        compress_min_size: int = 0,
+        timeout: Timeout | None = None,
+        name: str | None = None,
     ) -> None:
         self.query = query
         self.session = session
         self.url = str(url)
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker
+        self.persisted = persisted
+        self.compress_min_size = compress_min_size
+        self.timeout = timeout
+        self._name = name
 
     def __str__(self) -> str:
         return self.query
 
-    def __call__(self, **kwargs: Any) -> tuple[dict[str, Any], dict[str, Any]]:
-        payload = {"query": self.query, "variables": kwargs}
+    def __call__(self, **kwargs: Any) -> QueryResult:
+        with trace.span("query", self.name, variables=kwargs):
+            if self.persisted and self.persisted.enabled:
+                query_result = self.call_persisted(kwargs)
+            else:
+                query_result = self.decode(
+                    self.post({"query": self.query, "variables": kwargs})
+                )
 
-        http_response = self.session.post(self.url, json=payload)
+        return query_result.get("data", {}), query_result.get("errors", {})
 
-        http_response.raise_for_status()
-        query_result = http_response.json()
+    def with_timeout(self, timeout: Timeout) -> "Query":
+        """Return a copy of the query which uses the given (connect, read) timeout
 
-        return query_result.get("data", {}), query_result.get("errors", {})
+        Otherwise the session's timeout is used.
+        """
+        query = copy.copy(self)
+        query.timeout = timeout
+
+        return query
+
+    @property
+    def name(self) -> str:
+        """Name of the query for logging and tracing
+
+        This is the name of the .graphql file the query came from or, if not given, the
+        first field selected.
+        """
+        if self._name:
+            return self._name
+
+        match = FIRST_FIELD.search(self.query)
+
+        return match.group(1) if match else "query"
+
+    def decode(self, http_response: requests.Response) -> Any:
+        """Return the JSON-decoded body of the response
+
+        The body is read subject to the current Deadline (see read_chunks()). Under debug
+        (or when tracing), log the size of the body on the wire and once decompressed as
+        well as the time taken to read and decode it.
+        """
+        if not (logger.isEnabledFor(logging.DEBUG) or trace.is_enabled()):
+            return json.loads(read_body(http_response))
+
+        encoding = http_response.headers.get("Content-Encoding", "identity")
+
+        with trace.span("read", "response", encoding=encoding) as read:
+            body = read_body(http_response)
+            size = len(body)
+            read.details["received"] = wire_size(http_response) or size
+            read.details["size"] = size
+
+        with trace.span("decode", "JSON") as decoded:
+            value = json.loads(body)
+
+        logger.debug(
+            "%s: received %s bytes (%s), %s bytes decompressed. "
+            "Read in %.1fms, JSON decoded in %.1fms",
+            self.name,
+            read.details["received"],
+            encoding,
+            size,
+            read.duration * 1000,
+            decoded.duration * 1000,
+        )
+
+        return value
+
+    def stream(self, field: str, /, **kwargs: Any) -> Iterator[Any]:
+        """Call the query and yield the items of the given (list) field of the data
+
+        The response is decoded as it is received, so items are yielded before the
+        entire response has arrived and the response is never held in memory as a whole.
+        If the response has errors, APIError is raised after the last item. If the
+        current Deadline passes while the response is read, DeadlineExceeded is raised.
+
+        As with calling the query, it is sent as a persisted query if PersistedQueries
+        are given (and enabled).
+        """
+        if self.persisted and self.persisted.enabled:
+            rest = yield from self.stream_persisted(field, kwargs)
+        else:
+            rest = yield from self.stream_response(
+                {"query": self.query, "variables": kwargs}, field
+            )
+
+        check((rest.get("data") or {}, rest.get("errors") or {}))
+
+    def stream_persisted(
+        self, field: str, variables: dict[str, Any]
+    ) -> Generator[Any, None, dict[str, Any]]:
+        """Stream the query as an automatic persisted query
+
+        Like call_persisted() but the items of the field are yielded (see stream()). The
+        rest of the response is returned.
+        """
+        assert self.persisted
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": self.sha256}}
+        payload = {"variables": variables, "extensions": extensions}
+
+        try:
+            # A response with a persisted query error has no data, so no items
+            rest = yield from self.stream_response(payload, field)
+        except requests.HTTPError as error:
+            # Some servers respond with an error status
+            error_json = error_response_json(error)
+            if error_json is None or persisted_query_error(error_json) is None:
+                raise
+            rest = error_json
+
+        error_code = persisted_query_error(rest)
+
+        if error_code is None:
+            return rest
+
+        if error_code == PERSISTED_QUERY_NOT_SUPPORTED:
+            self.persisted.disable()
+            return (
+                yield from self.stream_response(
+                    {"query": self.query, "variables": variables}, field
+                )
+            )
+
+        logger.debug("Registering persisted query %s", self.sha256)
+
+        return (
+            yield from self.stream_response({**payload, "query": self.query}, field)
+        )
+
+    def stream_response(
+        self, payload: dict[str, Any], field: str
+    ) -> Generator[Any, None, dict[str, Any]]:
+        """POST the payload and yield the items of the field of the response's data
+
+        The rest of the response is returned.
+        """
+        query_start = time.perf_counter()
+        http_response = self.post(payload)
+        chunks = codecs.iterdecode(
+            read_chunks(http_response, current_deadline.get()),
+            http_response.encoding or "UTF-8",
+        )
+        items = jsonstream.ArrayStream(chunks, ("data", field))
+        start = time.perf_counter()
+
+        with closing(http_response):
+            yield from items
+
+            encoding = http_response.headers.get("Content-Encoding", "identity")
+            logger.debug(
+                "%s: streamed %s bytes (%s) in %.1fms",
+                self.name,
+                wire_size(http_response),
+                encoding,
+                (time.perf_counter() - start) * 1000,
+            )
+            # The stream is consumed by the caller so it can't be timed using span()
+            trace.record(
+                "query",
+                self.name,
+                query_start,
+                variables=payload.get("variables"),
+                received=wire_size(http_response),
+                encoding=encoding,
+            )
+
+        return items.rest
+
+    @cached_property
+    def sha256(self) -> str:
+        """The sha256 hex digest of the query text"""
+        return hashlib.sha256(self.query.encode("UTF-8")).hexdigest()
+
+    def call_persisted(self, variables: dict[str, Any]) -> dict[str, Any]:
+        """Send the query as an automatic persisted query and return the response
+
+        The hash is sent first, and the query text is only sent when the server does not
+        recognize the hash.
+        """
+        assert self.persisted
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": self.sha256}}
+        payload = {"variables": variables, "extensions": extensions}
+
+        http_error: requests.HTTPError | None = None
+
+        try:
+            query_result = self.decode(self.post(payload))
+        except requests.HTTPError as error:
+            # Some servers respond with an error status
+            if (query_result := error_response_json(error)) is None:
+                raise
+            http_error = error
+
+        error_code = persisted_query_error(query_result)
+
+        if error_code is None:
+            # An error status that has nothing to do with the persisted query
+            if http_error is not None:
+                raise http_error
+            return query_result
+
+        if error_code == PERSISTED_QUERY_NOT_SUPPORTED:
+            self.persisted.disable()
+            return self.decode(self.post({"query": self.query, "variables": variables}))
+
+        logger.debug("Registering persisted query %s", self.sha256)
+
+        return self.decode(self.post({**payload, "query": self.query}))
+
+    @property
+    def is_mutation(self) -> bool:
+        """True if the query is a mutation"""
+        return self.query.lstrip().startswith("mutation")
+
+    def post(self, payload: dict[str, Any]) -> requests.Response:
+        """POST the payload to the server and return the (successful) response
+
+        Retry transient errors according to the retry policy.
+        """
+        retries = 0 if self.is_mutation else self.retry.retries
+        deadline = current_deadline.get() or Deadline(math.inf)
+        waited = 0.0
+        attempt = 0
+
+        while True:
+            deadline.check()
+            if self.breaker:
+                self.breaker.check(self.url)
+            try:
+                with trace.span("request", "POST") as request:
+                    http_response = self.send(payload)
+                    request.details["sent"] = request_size(http_response)
+                    request.details["status"] = http_response.status_code
+                http_response.raise_for_status()
+            except DeadlineExceeded:
+                raise
+            except requests.RequestException as error:
+                deadline.check(error)
+                if not is_transient(error):
+                    raise
+                if self.breaker:
+                    self.breaker.record_failure()
+                if attempt >= retries:
+                    if retries:
+                        logger.debug("Giving up after %s retries", retries)
+                    raise
+
+                delay = self.retry.delay(attempt, get_retry_after(error))
+                if delay >= deadline.remaining():
+                    raise DeadlineExceeded("Deadline exceeded") from error
+                attempt += 1
+                logger.debug("%s: retry %s/%s in %.2fs", error, attempt, retries, delay)
+                time.sleep(delay)
+                waited += delay
+                continue
+
+            if self.breaker:
+                self.breaker.record_success()
+            if attempt:
+                logger.debug(
+                    "Succeeded after %s retries (%.2fs waiting)", attempt, waited
+                )
+
+            return http_response
+
+    def send(self, payload: dict[str, Any]) -> requests.Response:
+        """POST the payload to the server
+
+        If the payload is at least compress_min_size bytes it is sent gzip-compressed.
+        """
+        options: dict[str, Any] = {}
+
+        if self.timeout is not None:
+            options["timeout"] = self.timeout
+
+        if not self.compress_min_size:
+            return self.session.post(self.url, json=payload, **options)
+
+        body = json.dumps(payload).encode("UTF-8")
+
+        if len(body) < self.compress_min_size:
+            return self.session.post(self.url, json=payload, **options)
+
+        compressed = gzip.compress(body)
+        logger.debug(
+            "%s: compressed request from %s to %s bytes",
+            self.name,
+            len(body),
+            len(compressed),
+        )
+
+        return self.session.post(
+            self.url,
+            data=compressed,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            **options,
+        )
+
+
+def read_body(http_response: requests.Response) -> bytes:
+    """Return the response's body, read subject to the current Deadline"""
+    return b"".join(read_chunks(http_response, current_deadline.get()))
+
+
+def read_chunks(
+    http_response: requests.Response, deadline: Deadline | None
+) -> Iterator[bytes]:
+    """Yield the chunks of the response's body, checking the deadline after each one
+
+    The read timeout applies to each read, not to the body as a whole. Errors reading
+    the body once the deadline has passed, such as the read timing out, raise
+    DeadlineExceeded.
+    """
+    deadline = deadline or Deadline(math.inf)
+
+    try:
+        for chunk in http_response.iter_content(STREAM_CHUNK_SIZE):
+            deadline.check()
+            yield chunk
+    except requests.RequestException as error:
+        deadline.check(error)
+        raise
+
+
+def accept_encoding() -> str:
+    """Return the value of the Accept-Encoding header
+
+    These are the encodings the installed urllib3 can decode: gzip and deflate, plus br
+    and zstd when their (optional) decoders are installed.
+    """
+    return urllib3.util.request.ACCEPT_ENCODING
+
+
+def request_size(http_response: requests.Response) -> int | None:
+    """Return the size of the body of the request sent for the given response
+
+    If this is unknown, return None.
+    """
+    request = getattr(http_response, "request", None)
+    body = getattr(request, "body", None)
+
+    return len(body) if isinstance(body, (bytes, str)) else None
+
+
+def wire_size(http_response: requests.Response) -> int | None:
+    """Return the number of bytes of the response body read from the connection
+
+    If this is unknown, return None.
+    """
+    tell = getattr(http_response.raw, "tell", None)
+
+    return tell() if tell else None
+
+
+def persisted_query_error(query_result: dict[str, Any]) -> str | None:
+    """Return the persisted query error in the query result, if any
+
+    This is either "PersistedQueryNotFound" or "PersistedQueryNotSupported".
+    """
+    codes = {
+        "PERSISTED_QUERY_NOT_FOUND": PERSISTED_QUERY_NOT_FOUND,
+        "PERSISTED_QUERY_NOT_SUPPORTED": PERSISTED_QUERY_NOT_SUPPORTED,
+    }
+    for error in query_result.get("errors") or []:
+        if error.get("message") in codes.values():
+            return str(error["message"])
+        if (code := (error.get("extensions") or {}).get("code")) in codes:
+            return codes[code]
+
+    return None
+
+
+def error_response_json(error: requests.HTTPError) -> dict[str, Any] | None:
+    """Return the JSON body of the error's response
+
+    If the response has no JSON object body, return None. The body is read subject to
+    the current Deadline.
+    """
+    try:
+        value = (
+            json.loads(read_body(error.response))
+            if error.response is not None
+            else None
+        )
+    except ValueError:
+        return None
+
+    return value if isinstance(value, dict) else None
+
+
+def is_transient(error: requests.RequestException) -> bool:
+    """Return True if the error may go away if the request is retried"""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and (
+            error.response.status_code in TRANSIENT_STATUSES
+        )
+
+    return isinstance(error, (requests.ConnectionError, requests.Timeout)) and not (
+        isinstance(error, (CircuitOpenError, DeadlineExceeded))
+    )
+
+
+def get_retry_after(error: requests.RequestException) -> str | None:
+    """Return the Retry-After header of the error's response, if any"""
+    if error.response is None:
+        return None
+
+    return error.response.headers.get("Retry-After")
 
 
 class DistributionQueries:
     """Queries for a given distribution"""
 
-    def __init__(self, url: str, distribution: str, session: requests.Session) -> None:
+    def __init__(
+        self, url: str, distribution: str, session: requests.Session, **options: Any
+    ) -> None:
+        """options are passed to each Query"""
+        # The queries bundled at build time or kept in the snapshot, if any. Otherwise
+        # they are read from the distribution's files
+        self._queries = bundle.queries(distribution)
+
         # We want to make sure we explicitly raise an exception if this distribition
         # does not exist
-        try:
-            self._files = resources.files(distribution)
-        except ModuleNotFoundError as error:
-            raise error from None
+        if self._queries is None:
+            try:
+                self._files = resources.files(distribution)
+            except ModuleNotFoundError as error:
+                raise error from None
+
+            if snapshot.is_enabled() and isinstance(self._files, Path):
+                self._queries = snapshot_queries(distribution, self._files)
 
         self._url = url
         self._distribution = distribution
         self._session = session
+        self._options = options
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self._url!r}, {self._distribution!r}, ...)"
@@ -74,17 +735,24 @@ class DistributionQueries:
     # The CLI is a short-lived process so we're not concerned about cache size
     @cache  # pylint: disable=method-cache-max-size-none
     def __getattr__(self, name: str) -> Query:
-        query_file = self._files / "queries" / f"{name}.graphql"
+        if self._queries is not None:
+            if (query_str := self._queries.get(name)) is None:
+                raise AttributeError(name)
+        else:
+            query_file = self._files / "queries" / f"{name}.graphql"
 
-        try:
-            query_str = query_file.read_text(encoding="UTF-8")
-        except FileNotFoundError:
-            raise AttributeError(name) from None
+            try:
+                query_str = query_file.read_text(encoding="UTF-8")
+            except FileNotFoundError:
+                raise AttributeError(name) from None
 
-        return Query(query_str, self._url, self._session)
+        return Query(query_str, self._url, self._session, name=name, **self._options)
 
     def to_dict(self) -> dict[str, str]:
         """Return the queries as a dict"""
+        if self._queries is not None:
+            return {name: getattr(self, name) for name in self._queries}
+
         files = (resources.files(self._distribution) / "queries").iterdir()
 
         return {
@@ -94,6 +762,21 @@ class DistributionQueries:
         }
 
 
+def snapshot_queries(distribution: str, path: Path) -> dict[str, str]:
+    """Return the distribution's queries, in the package at path, from the snapshot"""
+    queries_dir = path / "queries"
+
+    return snapshot.cached(
+        f"queries {distribution}",
+        partial(bundle.read_queries, path),
+        key=str(path),
+        files=lambda queries: [
+            str(queries_dir),
+            *(str(queries_dir / f"{name}.graphql") for name in queries),
+        ],
+    )
+
+
 class Queries:  # pylint: disable=too-few-public-methods
     r"""Python interface to raw queries/*.graphql files
 
@@ -109,18 +792,55 @@ class Queries:  # pylint: disable=too-few-public-methods
         'query ($machine: String!) {\n  latest(machine: $machine) {\n    id\n  }\n}\n'
     """
 
-    def __init__(self, url: yarl.URL, auth: AuthDict | None = None) -> None:
+    def __init__(
+        self,
+        url: yarl.URL,
+        auth: AuthDict | None = None,
+        *,
+        pool_size: int | None = None,
+        settings: Settings | None = None,
+        timeout: Timeout | None = None,
+    ) -> None:
         """A namespace for queries.
 
         url: the url to the graphql endpoint
+        pool_size: the maximum number of connections to keep open to the server. This
+            only needs to be given when queries are run from multiple threads.
+        settings: if not given, settings are taken from the environment
+        timeout: (connect, read) timeout for requests. Defaults to the timeouts in the
+            settings
         """
+        settings = settings or Settings.from_environ()
         self._url = str(url)
         self._session = requests.Session()
+        # Response bodies are read on demand so that they can be streamed
+        self._session.stream = True
+        self._options = {
+            "retry": RetryPolicy(
+                retries=settings.RETRIES,
+                backoff=settings.RETRY_BACKOFF,
+                max_backoff=settings.RETRY_MAX_BACKOFF,
+            ),
+            "breaker": CircuitBreaker(
+                settings.CIRCUIT_THRESHOLD, settings.CIRCUIT_COOLDOWN
+            ),
+            "persisted": PersistedQueries(settings.PERSISTED_QUERIES),
+            "compress_min_size": settings.COMPRESS_MIN_SIZE,
+        }
+
+        adapter = TimeoutAdapter(
+            timeout or (settings.CONNECT_TIMEOUT, settings.READ_TIMEOUT),
+            pool_connections=1,
+            pool_maxsize=pool_size or requests.adapters.DEFAULT_POOLSIZE,
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
         self._session.headers.update(
             {
                 "Accept": "application/json",
-                "Accept-Encoding": "gzip, deflate",
-                "User-Agent": f"gbpcli/{metadata.version('gbpcli')}",
+                "Accept-Encoding": accept_encoding(),
+                "User-Agent": f"gbpcli/{bundle.version('gbpcli')}",
             }
         )
 
@@ -132,12 +852,226 @@ class Queries:  # pylint: disable=too-few-public-methods
     @cache  # pylint: disable=method-cache-max-size-none
     def __getattr__(self, name: str) -> DistributionQueries:
         try:
-            return DistributionQueries(self._url, name, self._session)
+            return DistributionQueries(self._url, name, self._session, **self._options)
         except ModuleNotFoundError:
             raise AttributeError(name) from None
 
+    @contextmanager
+    def batch(self) -> Iterator["Batch"]:
+        """Context manager to send queries to the server in a single request
+
+        Queries added to the batch are sent when the context exits::
+
+            >>> with queries.batch() as batch:
+            ...     logs = [batch.add(queries.gbpcli.logs, id=i) for i in build_ids]
+            >>> [i.result() for i in logs]  # doctest: +SKIP
+        """
+        batch = Batch(self._url, self._session, **self._options)
+        yield batch
+        batch.send()
+
+
+class BatchItem:
+    """A query in a Batch
+
+    Once the batch has been sent, result() returns the query's data and errors as if
+    the query had been called on its own.
+    """
+
+    def __init__(self, query: Query, variables: dict[str, Any], prefix: str) -> None:
+        self.prefix = prefix
+        self.original_variables = variables
+        self.operation, variable_defs, selections = split_operation(query.query)
+        self.variable_defs = prefix_variables(variable_defs, prefix)
+        self.selections, self.keys = alias_fields(
+            prefix_variables(selections, prefix), prefix
+        )
+        self._result: QueryResult | None = None
+
+    @property
+    def variables(self) -> dict[str, Any]:
+        """The query's variables with their prefixed names"""
+        return {
+            f"{self.prefix}{name}": value
+            for name, value in self.original_variables.items()
+        }
+
+    def result(self) -> QueryResult:
+        """Return the data and errors for this query"""
+        if self._result is None:
+            raise RuntimeError("Batch has not been sent")
+
+        return self._result
+
+    def set_result(self, data: dict[str, Any] | None, errors: Any) -> None:
+        """Set this item's result given the (aliased) response from the server"""
+        data = data or {}
+        my_data = {key: data.get(f"{self.prefix}{key}") for key in self.keys}
+        my_errors: Any = [
+            self._unalias_error(error) for error in errors if self._owns_error(error)
+        ]
+
+        self._result = (my_data, my_errors or {})
+
+    def _owns_error(self, error: dict[str, Any]) -> bool:
+        """Return True if the error belongs to this query
+
+        Errors without a path (e.g. syntax errors) belong to all queries.
+        """
+        if not (path := error.get("path")):
+            return True
+
+        return path[0] in (f"{self.prefix}{key}" for key in self.keys)
+
+    def _unalias_error(self, error: dict[str, Any]) -> dict[str, Any]:
+        if not (path := error.get("path")):
+            return error
+
+        return {**error, "path": [path[0].removeprefix(self.prefix), *path[1:]]}
+
+
+class Batch:
+    """Queries that are sent to the server in a single request
+
+    The queries are merged into one operation by giving each query's fields an alias
+    and each query's variables a prefix. Batches are never sent as persisted queries:
+    their text differs from batch to batch, so every batch would be sent twice.
+    """
+
+    def __init__(self, url: str, session: requests.Session, **options: Any) -> None:
+        """options are passed to the Query sent"""
+        self.url = url
+        self.session = session
+        self.options = options
+        self.items: list[BatchItem] = []
+        self.names: list[str] = []
+
+    def add(self, query: Query, **kwargs: Any) -> BatchItem:
+        """Add the query, with the given variables, to the batch"""
+        item = BatchItem(query, kwargs, f"q{len(self.items)}_")
+
+        if self.items and item.operation != self.items[0].operation:
+            raise ValueError("Cannot batch different operation types")
+
+        self.items.append(item)
+        self.names.append(query.name)
+
+        return item
+
+    def __str__(self) -> str:
+        variable_defs = ", ".join(
+            i.variable_defs for i in self.items if i.variable_defs
+        )
+        variable_defs = f" ({variable_defs})" if variable_defs else ""
+        selections = "\n".join(i.selections for i in self.items)
+
+        return f"{self.items[0].operation}{variable_defs} {{{selections}}}"
+
+    def send(self) -> None:
+        """Send the batched queries to the server
+
+        If the batch is empty, do nothing.
+        """
+        if not self.items:
+            return
+
+        variables = {k: v for item in self.items for k, v in item.variables.items()}
+        name = f"batch({','.join(self.names)})"
+        options = {**self.options, "persisted": None}
+        query = Query(str(self), self.url, self.session, name=name, **options)
+        data, errors = query(**variables)
+
+        for item in self.items:
+            item.set_result(data, errors or [])
+
+
+def split_operation(query: str) -> tuple[str, str, str]:
+    """Split the query into its operation type, variable definitions and selections
+
+    For example::
+
+        >>> split_operation("query ($id: ID!) { build(id: $id) { logs } }")
+        ('query', '$id: ID!', ' build(id: $id) { logs } ')
+    """
+    depth = 0
+
+    for start, char in enumerate(query):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "{" and not depth:
+            break
+    else:
+        raise ValueError("Query has no selection set")
+
+    header = query[:start].strip()
+    selections = query[start + 1 : query.rindex("}")]
+    operation = NAME.match(header)
+    operation_type = operation.group() if operation else "query"
+    _, paren, variable_defs = header.partition("(")
+    variable_defs = variable_defs.rpartition(")")[0] if paren else ""
+
+    return operation_type, variable_defs.strip(), selections
+
+
+def prefix_variables(text: str, prefix: str) -> str:
+    """Prefix the names of all the variables ($name) in the given text"""
+    return VARIABLE.sub(lambda match: f"${prefix}{match.group(1)}", text)
+
+
+def alias_fields(selections: str, prefix: str) -> tuple[str, list[str]]:
+    """Alias the top-level fields in selections with the given prefix
+
+    Return the new selections and the (unprefixed) response keys of the fields.
+
+        >>> alias_fields(" build(id: $id) { logs } ", "q0_")
+        (' q0_build: build(id: $id) { logs } ', ['build'])
+    """
+    text: list[str] = []
+    keys: list[str] = []
+    depth = 0
+    index = 0
+    aliased = False
+
+    while index < len(selections):
+        char = selections[index]
+
+        if char in "({[":
+            depth += 1
+        elif char in ")}]":
+            depth -= 1
+        elif char == "." and not depth:
+            raise ValueError("Fragments cannot be batched")
+        elif char in "@$" and not depth:
+            name = NAME.match(selections, index + 1)
+            assert name
+            text.append(selections[index : name.end()])
+            index = name.end()
+            continue
+        elif not depth and (name := NAME.match(selections, index)):
+            field = name.group()
+            index = name.end()
+
+            if aliased:  # the field following an alias
+                text.append(field)
+                aliased = False
+            elif ALIAS_SEP.match(selections, index):
+                text.append(f"{prefix}{field}")
+                keys.append(field)
+                aliased = True
+            else:
+                text.append(f"{prefix}{field}: {field}")
+                keys.append(field)
+            continue
+
+        text.append(char)
+        index += 1
+
+    return "".join(text), keys
+
 
-def check(query_result: tuple[dict[str, Any], dict[str, Any]]) -> dict[str, Any]:
+def check(query_result: QueryResult) -> dict[str, Any]:
     """Raise exception if there are errors in the query_result
 
     Otherwise return the data portion of the query_result.
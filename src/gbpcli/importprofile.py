@@ -0,0 +1,264 @@
+"""Import time profile for the GBPCLI_IMPORT_PROFILE environment variable
+
+Much of the start up time of gbp is spent importing modules: gbpcli's own, those of the
+subcommands (including plugins' subcommands) and libraries like requests and rich. When
+GBPCLI_IMPORT_PROFILE is set, the time spent importing each module is recorded and, when
+gbp exits, written:
+
+    GBPCLI_IMPORT_PROFILE=1             a report to stderr
+    GBPCLI_IMPORT_PROFILE=imports.json  a speedscope (https://speedscope.app) profile
+    GBPCLI_IMPORT_PROFILE=imports.txt   a report to the given file
+
+False values (0, false, no, off) leave profiling disabled.
+
+Imports are timed by a finder at the front of sys.meta_path, so every import is
+recorded, including those of importlib.import_module() and entry points. Modules that
+were imported before profiling started (such as gbpcli itself) and built-in modules are
+not.
+
+This module imports as little as possible (not even typing) so that the modules that
+it's meant to time are not imported before profiling starts.
+"""
+
+import atexit
+import os
+import sys
+import time
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from importlib.abc import Loader
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType
+    from typing import IO, Any, Callable, Sequence
+
+ENV_VAR = "GBPCLI_IMPORT_PROFILE"
+TRUE_VALUES = frozenset(["1", "true", "yes", "on"])
+FALSE_VALUES = frozenset(["", "0", "false", "no", "off"])
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class Import:
+    """A timed import. Times are perf_counter() values (seconds)"""
+
+    __slots__ = ("name", "start", "end", "depth", "children")
+
+    def __init__(self, name: str, started: float, depth: int = 0) -> None:
+        self.name = name
+        self.start = started
+        self.end = started
+        self.depth = depth
+        # Time spent importing other modules while this one was imported
+        self.children = 0.0
+
+    @property
+    def duration(self) -> float:
+        """The time taken to import the module, including the modules it imported"""
+        return self.end - self.start
+
+    @property
+    def self_time(self) -> float:
+        """The time taken to import the module, excluding the modules it imported"""
+        return self.duration - self.children
+
+    @property
+    def package(self) -> str:
+        """The module's top-level package"""
+        return self.name.partition(".")[0]
+
+
+class ImportProfiler:
+    """Records the time taken by each import while installed on sys.meta_path
+
+    This is a meta path finder (see importlib.abc.MetaPathFinder).
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.imports: list[Import] = []
+        # Modules found but not yet executed, and when they were looked for
+        self._found: dict[str, float] = {}
+        # Modules being executed
+        self._stack: list[Import] = []
+        self._wrapped: set[int] = set()
+
+    def install(self) -> None:
+        """Start recording imports"""
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        """Stop recording imports"""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: "Sequence[str] | None",
+        target: "ModuleType | None" = None,
+    ) -> "ModuleSpec | None":
+        """Find the module's spec using the other finders and time its loading"""
+        started = time.perf_counter()
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            if (spec := finder.find_spec(fullname, path, target)) is not None:
+                break
+        else:
+            return None
+
+        # Built-in and frozen modules are loaded by classes shared by every module they
+        # load (and take next to no time). Other loaders belong to the module(s) of
+        # their path so their exec_module can be wrapped
+        if spec.loader is not None and not isinstance(spec.loader, type):
+            self._found[fullname] = started
+            self.wrap(spec.loader)
+
+        return spec
+
+    def wrap(self, loader: "Loader") -> None:
+        """Time the loader's exec_module()
+
+        Loaders of, for example, zip files load many modules so may already be wrapped.
+        """
+        exec_module = getattr(loader, "exec_module", None)
+
+        if exec_module is not None and id(loader) not in self._wrapped:
+            self._wrapped.add(id(loader))
+            setattr(loader, "exec_module", self.timed(exec_module))
+
+    def timed(
+        self, exec_module: "Callable[[ModuleType], None]"
+    ) -> "Callable[[ModuleType], None]":
+        """Return exec_module timed"""
+
+        def wrapper(module: "ModuleType") -> None:
+            name = module.__spec__.name if module.__spec__ else module.__name__
+
+            if (started := self._found.pop(name, None)) is None:
+                exec_module(module)
+                return
+
+            item = Import(name, started, len(self._stack))
+            self._stack.append(item)
+
+            try:
+                exec_module(module)
+            finally:
+                item.end = time.perf_counter()
+                self._stack.pop()
+
+                if self._stack:
+                    self._stack[-1].children += item.duration
+
+                self.imports.append(item)
+
+        return wrapper
+
+    def finish(self, destination: str) -> None:
+        """Stop recording and write the profile to the given destination
+
+        See the module docstring.
+        """
+        self.uninstall()
+
+        if destination.lower() in TRUE_VALUES:
+            self.write_report(sys.stderr)
+            return
+
+        try:
+            with open(destination, "w", encoding="UTF-8") as fp:
+                if destination.endswith(".json"):
+                    import json  # pylint: disable=import-outside-toplevel
+
+                    json.dump(self.speedscope(), fp)
+                else:
+                    self.write_report(fp)
+        except OSError as error:
+            sys.stderr.write(f"gbp: cannot write the import profile: {error}\n")
+
+    def write_report(self, fp: "IO[str]") -> None:
+        """Write the imports' times, by package and by module, to the given file"""
+        total = sum(item.duration for item in self.imports if item.depth == 0)
+        fp.write(f"Import time: {total * 1000:.1f}ms\n\n")
+
+        packages: dict[str, float] = {}
+        for item in self.imports:
+            packages[item.package] = packages.get(item.package, 0.0) + item.self_time
+
+        fp.write(f"{'self':>9}  package\n")
+        for package, self_time in sorted(packages.items(), key=by_time):
+            fp.write(f"{self_time * 1000:7.1f}ms  {package}\n")
+
+        fp.write(f"\n{'self':>9}  {'total':>9}  module\n")
+        for item in sorted(self.imports, key=lambda item: -item.self_time):
+            fp.write(
+                f"{item.self_time * 1000:7.1f}ms  {item.duration * 1000:7.1f}ms"
+                f"  {item.name}\n"
+            )
+
+    def speedscope(self) -> "dict[str, Any]":
+        """Return the imports as a speedscope evented profile"""
+        frames: dict[str, int] = {}
+        events: "list[dict[str, Any]]" = []
+        stack: list[Import] = []
+
+        def at(value: float) -> float:
+            return round((value - self.start) * 1000, 3)
+
+        def close(item: Import) -> None:
+            events.append({"type": "C", "frame": frames[item.name], "at": at(item.end)})
+
+        for item in sorted(self.imports, key=lambda item: (item.start, item.depth)):
+            while stack and stack[-1].end <= item.start:
+                close(stack.pop())
+
+            frame = frames.setdefault(item.name, len(frames))
+            events.append({"type": "O", "frame": frame, "at": at(item.start)})
+            stack.append(item)
+
+        while stack:
+            close(stack.pop())
+
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "exporter": "gbpcli",
+            "name": "gbp imports",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [
+                {
+                    "type": "evented",
+                    "name": " ".join(["gbp", *sys.argv[1:]]),
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": max((event["at"] for event in events), default=0),
+                    "events": events,
+                }
+            ],
+        }
+
+
+def by_time(item: tuple[str, float]) -> float:
+    """Sort key for (name, time) pairs, slowest first"""
+    return -item[1]
+
+
+def start(destination: str | None = None) -> ImportProfiler | None:
+    """Start profiling imports if GBPCLI_IMPORT_PROFILE is set
+
+    The profile is written to the destination (by default the value of
+    GBPCLI_IMPORT_PROFILE) when the interpreter exits. Return the profiler, or None if
+    the destination is unset or a false value.
+    """
+    destination = destination or os.environ.get(ENV_VAR, "")
+
+    if destination.lower() in FALSE_VALUES:
+        return None
+
+    profiler = ImportProfiler()
+    profiler.install()
+    atexit.register(profiler.finish, destination)
+
+    return profiler
@@ -0,0 +1,160 @@
+"""Incremental decoding of JSON documents
+
+Large JSON documents need not be read into memory in their entirety in order to be
+processed. ArrayStream yields the items of an array nested in a JSON document as they
+are decoded from a stream of text chunks.
+"""
+
+import json
+import re
+from typing import Any, Iterable, Iterator, Sequence
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+decoder = json.JSONDecoder()
+
+
+class ArrayStream:  # pylint: disable=too-few-public-methods
+    """Iterate over the items of an array in a JSON document read in chunks
+
+    path is the (non-empty) sequence of object keys leading to the array. For example
+    given the path ("data", "builds") and the document
+
+        {"data": {"builds": [1, 2, 3]}, "errors": []}
+
+    the items 1, 2 and 3 are yielded. Only the item being decoded is held in memory.
+
+    The other members of the enclosing objects are stored in .rest, which is complete
+    once the iterator is exhausted. For the above example that would be
+
+        {"data": {}, "errors": []}
+
+    If the value at the path is not an array (e.g. null) no items are yielded and the
+    value is stored in .rest.
+    """
+
+    def __init__(self, chunks: Iterable[str], path: Sequence[str]) -> None:
+        self.chunks = iter(chunks)
+        self.path = tuple(path)
+        self.rest: dict[str, Any] = {}
+        self.buffer = ""
+        self.pos = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self._object(self.path, self.rest)
+
+        if self._peek():
+            raise self._error("Extra data")
+
+    def _object(self, path: tuple[str, ...], rest: dict[str, Any]) -> Iterator[Any]:
+        self._expect("{")
+
+        if self._consume("}"):
+            return
+
+        while True:
+            key = self._decode()
+            self._expect(":")
+
+            match self._peek():
+                case "{" if key == path[0] and len(path) > 1:
+                    rest[key] = {}
+                    yield from self._object(path[1:], rest[key])
+                case "[" if key == path[0] and len(path) == 1:
+                    yield from self._array()
+                case _:
+                    rest[key] = self._decode()
+
+            if self._consume("}"):
+                return
+            self._expect(",")
+
+    def _array(self) -> Iterator[Any]:
+        self._expect("[")
+
+        if self._consume("]"):
+            return
+
+        while True:
+            yield self._decode()
+
+            if self._consume("]"):
+                return
+            self._expect(",")
+
+    def _decode(self) -> Any:
+        """Decode the value at the current position
+
+        A value that doesn't fit in the buffer is decoded again from its start once more
+        has been read. So that large values aren't decoded once per chunk, the buffer
+        is at least doubled before each retry.
+        """
+        self._peek()
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._read(len(self.buffer) - self.pos):
+                    raise
+                continue
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end < len(self.buffer) or not self._read():
+                self.pos = end
+                return value
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character
+
+        Return the empty string at the end of the document.
+        """
+        while True:
+            match = WHITESPACE.match(self.buffer, self.pos)
+            assert match
+            self.pos = match.end()
+
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+
+            if not self._read():
+                return ""
+
+    def _consume(self, char: str) -> bool:
+        """Consume the given character if it is next. Return True if consumed"""
+        if self._peek() == char:
+            self.pos += 1
+            return True
+
+        return False
+
+    def _expect(self, char: str) -> None:
+        if not self._consume(char):
+            raise self._error(f"Expecting {char!r}")
+
+    def _read(self, size: int = 1) -> bool:
+        """Append at least size characters to the buffer, discarding what has been decoded
+
+        Fewer are appended if the chunks run out first. Return False if there are no
+        more chunks.
+        """
+        chunks = [self.buffer[self.pos :]]
+        wanted = len(chunks[0]) + max(size, 1)
+        length = len(chunks[0])
+
+        for chunk in self.chunks:
+            chunks.append(chunk)
+            length += len(chunk)
+            if length >= wanted:
+                break
+
+        if length == len(chunks[0]):
+            return False
+
+        self.buffer = "".join(chunks)
+        self.pos = 0
+
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
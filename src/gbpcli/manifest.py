@@ -0,0 +1,186 @@
+"""Cached manifest of the gbpcli subcommands
+
+Subcommands are modules registered under the "gbpcli.subcommands" entry point group.
+Building the argument parser needs only their names and help text, yet finding the
+entry points and importing every subcommand module (and, in turn, much of rich) takes
+longer than many commands themselves. So the names and help text are stored in a
+manifest in the user's cache directory. The manifest is rebuilt when the installed
+distributions (or the subcommand modules themselves) change.
+"""
+
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterable, cast
+
+import platformdirs
+
+from gbpcli import snapshot
+
+GROUP = "gbpcli.subcommands"
+FILENAME = "subcommands.json"
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class Subcommand:
+    """A subcommand's entry in the manifest"""
+
+    name: str
+    # The entry point's value. The module (and attribute) to load
+    value: str
+    # The handler's docstring
+    doc: str | None
+    # The module's HELP text
+    help: str | None
+    # The module's file and its mtime (in ns) when the manifest was built
+    path: str | None
+    mtime: int | None
+
+    def load(self) -> ModuleType:
+        """Import and return the subcommand module
+
+        The entry point's value is resolved here, as EntryPoint.load() would, because
+        importlib.metadata is slow to import and not otherwise needed when the manifest
+        is used.
+        """
+        module_name, _, attrs = self.value.partition(":")
+        module: Any = importlib.import_module(module_name.strip())
+
+        for attr in filter(None, attrs.partition("[")[0].strip().split(".")):
+            module = getattr(module, attr)
+
+        return cast(ModuleType, module)
+
+    @property
+    def builtin(self) -> bool:
+        """True if the subcommand is one of gbpcli's own (not a plugin's)"""
+        return self.value.partition(".")[0] == "gbpcli"
+
+    def is_current(self) -> bool:
+        """Return True if the module has not changed since the manifest was built"""
+        if self.path is None:
+            return True
+
+        try:
+            return os.stat(self.path).st_mtime_ns == self.mtime
+        except OSError:
+            return False
+
+
+def get(
+    cache_dir: str | Path | None = None, search_path: Iterable[str] = ()
+) -> list[Subcommand]:
+    """Return the subcommands
+
+    They are read from the manifest in the given cache directory (by default the user's
+    cache directory) if it is current. Otherwise the manifest is (re)built.
+
+    search_path are additional directories where subcommands may be installed (e.g.
+    from the server's PYTHONPATH). They are only added to sys.path when the manifest is
+    (re)built.
+    """
+    path = Path(cache_dir or platformdirs.user_cache_dir("gbpcli")) / FILENAME
+    search_path = [entry for entry in search_path if entry not in sys.path]
+    key = environment_key(search_path)
+
+    def make() -> list[dict[str, Any]]:
+        if (subcommands := read(path, key)) is None:
+            sys.path[:0] = search_path
+            subcommands = build()
+            write(path, key, subcommands)
+
+        return [asdict(subcommand) for subcommand in subcommands]
+
+    items = snapshot.cached(
+        "subcommands",
+        make,
+        key=key,
+        files=lambda items: [item["path"] for item in items if item["path"]],
+    )
+
+    return [Subcommand(**item) for item in items]
+
+
+def build() -> list[Subcommand]:
+    """Build the manifest from the subcommand entry points
+
+    This imports every subcommand module.
+    """
+    from importlib.metadata import (  # pylint: disable=import-outside-toplevel
+        entry_points,
+    )
+
+    subcommands: list[Subcommand] = []
+
+    for entry_point in entry_points().select(group=GROUP):
+        module = entry_point.load()
+        path = getattr(module, "__file__", None)
+        subcommands.append(
+            Subcommand(
+                name=entry_point.name,
+                value=entry_point.value,
+                doc=module.handler.__doc__,
+                help=getattr(module, "HELP", None),
+                path=path,
+                mtime=os.stat(path).st_mtime_ns if path else None,
+            )
+        )
+
+    return subcommands
+
+
+def read(path: Path, key: str) -> list[Subcommand] | None:
+    """Return the subcommands in the manifest at path
+
+    Return None if there is no (valid) manifest or it is not current.
+    """
+    try:
+        with open(path, "rb") as fp:
+            manifest: dict[str, Any] = json.load(fp)
+        if manifest["key"] != key:
+            return None
+        subcommands = [Subcommand(**item) for item in manifest["subcommands"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    return subcommands if all(i.is_current() for i in subcommands) else None
+
+
+def write(path: Path, key: str, subcommands: list[Subcommand]) -> None:
+    """Write the manifest to path
+
+    Failing to write the manifest is not an error. It will be built again next time.
+    """
+    manifest = {"key": key, "subcommands": [asdict(i) for i in subcommands]}
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(manifest), encoding="UTF-8")
+        tmp.replace(path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+
+
+def environment_key(search_path: Iterable[str] = ()) -> str:
+    """Return a key which changes when the installed distributions change
+
+    Installing, upgrading or removing a distribution changes the modification time of
+    the directory (on sys.path or the given search_path) it is installed in.
+    """
+    parts = [sys.executable]
+
+    for entry in [*search_path, *sys.path]:
+        try:
+            parts.append(f"{entry}:{os.stat(entry or os.curdir).st_mtime_ns}")
+        except OSError:
+            continue
+
+    return hashlib.sha256("\0".join(parts).encode("UTF-8")).hexdigest()
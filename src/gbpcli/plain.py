@@ -0,0 +1,95 @@
+"""Plain text output
+
+Importing rich and parsing markup is a large part of the run time of commands whose
+output is a few lines of text, such as `gbp latest`, when the output goes to a pipe
+and is not styled anyway. PlainConsole is a stand-in for rich's Console which writes
+strings as they are, minus their markup. Only other objects (rich renderables such as
+tables) are rendered by rich, without styles.
+"""
+
+import re
+import sys
+from functools import cached_property
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import rich.console
+
+# rich's markup tags (see rich.markup.RE_TAGS) along with their escaping backslashes
+RE_TAGS = re.compile(r"(\\*)\[([a-z#/@][^[]*?)]")
+
+
+def strip_markup(text: str) -> str:
+    """Return text without its rich markup
+
+    Like rich, escaped tags (e.g. "\\[bold]") are kept, without the escape.
+    """
+    if "[" not in text:
+        return text
+
+    return RE_TAGS.sub(replace_tag, text)
+
+
+def replace_tag(match: re.Match[str]) -> str:
+    """Return the replacement of the tag (and its backslashes) matched by RE_TAGS"""
+    backslashes, escaped = divmod(len(match.group(1)), 2)
+
+    return "\\" * backslashes + (f"[{match.group(2)}]" if escaped else "")
+
+
+class PlainConsole:
+    """Writes plain text to a file
+
+    Only implements the parts of rich.console.Console's interface that gbpcli uses.
+    """
+
+    def __init__(
+        self,
+        file: IO[str] | None = None,
+        *,
+        stderr: bool = False,
+        width: int | None = None,
+    ) -> None:
+        """file defaults to stdout (or stderr if stderr is True) at the time of writing"""
+        self._file = file
+        self.stderr = stderr
+        self.width = width
+
+    @property
+    def file(self) -> IO[str]:
+        """The file written to"""
+        if self._file is not None:
+            return self._file
+
+        return sys.stderr if self.stderr else sys.stdout
+
+    def print(
+        self, *objects: Any, sep: str = " ", end: str = "\n", **kwargs: Any
+    ) -> None:
+        """Print the objects
+
+        Strings are printed without their markup. If any of the objects is not a
+        string or number it (and the rest) are printed by rich.
+        """
+        if not all(isinstance(obj, (str, int, float)) for obj in objects):
+            self.rich_console.print(*objects, sep=sep, end=end, **kwargs)
+            return
+
+        self.file.write(sep.join(strip_markup(str(obj)) for obj in objects) + end)
+
+    @cached_property
+    def rich_console(self) -> "rich.console.Console":
+        """Console for printing rich renderables without styles"""
+        # pylint: disable=import-outside-toplevel
+        import rich.console
+
+        from gbpcli.theme import get_theme_from_string
+
+        return rich.console.Console(
+            file=self.file,
+            width=self.width,
+            color_system=None,
+            force_terminal=False,
+            highlight=False,
+            theme=get_theme_from_string(""),
+        )
@@ -0,0 +1,132 @@
+"""Quick responses to `gbp --version` and `gbp --help`
+
+Health checks run `gbp --version` often, and neither it nor `gbp --help` needs the
+server's environment, the user's config or the subcommand modules. Yet finding and
+formatting the answer takes most of gbp's start up. So when gbp answers them it saves the
+answer in the user's cache directory, along with a key of the things that could change
+it: the installed distributions, the subcommand manifest and the server's environment
+file. Next time the saved answer is given as long as the key matches. Checking that
+takes a few stat() calls.
+
+So that it is quick, this module imports nothing but os and sys. In particular it does
+not use platformdirs to find the user's cache directory.
+"""
+
+import os
+import sys
+
+# The responses that can be given quickly. The values are the responses' file names
+ARGUMENTS = {"--version": "version", "-h": "help", "--help": "help"}
+DIRNAME = "responses"
+# Files which, when changed, may change the responses. Relative paths are in the user's
+# cache directory. The first is utils.DEFAULT_SERVER_CONF
+WATCHED = ["/etc/gentoo-build-publisher.conf", "subcommands.json"]
+
+
+def get(argv: list[str]) -> str | None:
+    """Return the saved response to the given command-line arguments
+
+    Return None if it can't be given quickly.
+    """
+    if (path := response_path(argv)) is None:
+        return None
+
+    try:
+        with open(path, encoding="UTF-8") as fp:
+            key, _, response = fp.read().partition("\n")
+    except (OSError, ValueError):
+        return None
+
+    return response if key == environment_key() else None
+
+
+def save(argv: list[str], response: str) -> None:
+    """Save the response to the given command-line arguments
+
+    Failing to save the response is not an error. It will be saved again next time.
+    """
+    if (path := response_path(argv)) is None:
+        return
+
+    tmp = f"{path}.{os.getpid()}"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="UTF-8") as fp:
+            fp.write(f"{environment_key()}\n{response}")
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def response_path(argv: list[str]) -> str | None:
+    """Return the path of the saved response to the given command-line arguments
+
+    Return None if they are not ones which can be answered quickly.
+    """
+    if len(argv) != 1 or (name := ARGUMENTS.get(argv[0])) is None:
+        return None
+
+    if (cache_dir := user_cache_dir()) is None:
+        return None
+
+    if name == "help":
+        # The help is wrapped to the terminal's width
+        name = f"{name}-{columns()}"
+
+    return os.path.join(cache_dir, DIRNAME, name)
+
+
+def environment_key() -> str:
+    """Return a key which changes when the responses may change
+
+    See manifest.environment_key().
+    """
+    cache_dir = user_cache_dir() or ""
+    parts = [sys.executable, os.environ.get("XDG_CONFIG_HOME", "")]
+
+    for entry in [*(os.path.join(cache_dir, path) for path in WATCHED), *sys.path]:
+        try:
+            stat = os.stat(entry or os.curdir)
+        except OSError:
+            continue
+        parts.append(f"{entry}:{stat.st_mtime_ns}:{stat.st_size}")
+
+    # The key is stored on a line of its own
+    return "\0".join(parts).replace("\n", "\0")
+
+
+def user_cache_dir() -> str | None:
+    """Return the user's cache directory for gbpcli, like platformdirs does
+
+    Return None on platforms other than Linux (and other Unixes) and macOS.
+    """
+    if sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    elif os.name == "posix":
+        base = os.environ.get("XDG_CACHE_HOME", "").strip() or os.path.expanduser(
+            "~/.cache"
+        )
+    else:
+        return None
+
+    return os.path.join(base, "gbpcli")
+
+
+def columns() -> int:
+    """Return the width of the terminal, as shutil.get_terminal_size() does"""
+    try:
+        width = int(os.environ.get("COLUMNS", 0))
+    except ValueError:
+        width = 0
+
+    if width <= 0 and sys.__stdout__ is not None:
+        try:
+            width = os.get_terminal_size(sys.__stdout__.fileno()).columns
+        except (ValueError, OSError):
+            width = 0
+
+    return width or 80
@@ -5,14 +5,41 @@ from __future__ import annotations
 import argparse
 import datetime as dt
 import io
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import partial
-from typing import Literal
+from typing import Iterator, Literal
 
 from gbpcli import utils
 from gbpcli.types import Build
 
 LOCAL_TIMEZONE = dt.datetime.now().astimezone().tzinfo
 
+# Whether the format_*() functions (and style()) add rich markup
+markup_enabled: ContextVar[bool] = ContextVar("markup_enabled", default=True)
+
+
+@contextmanager
+def markup(enabled: bool) -> Iterator[None]:
+    """Context manager enabling (or disabling) markup within the context
+
+    With markup disabled, strings are formatted as plain text.
+    """
+    token = markup_enabled.set(enabled)
+
+    try:
+        yield
+    finally:
+        markup_enabled.reset(token)
+
+
+def style(name: str, text: str) -> str:
+    """Return text wrapped in the markup for the given style
+
+    If markup is disabled, return text as is.
+    """
+    return f"[{name}]{text}[/{name}]" if markup_enabled.get() else text
+
 
 def yesno(value: bool) -> Literal["yes", "no"]:
     """Convert bool value to 'yes' or 'no'"""
@@ -29,7 +56,7 @@ def timestr(timestamp: dt.datetime, timezone: dt.tzinfo | None = None) -> str:
 
 def styled_yes(yes_or_no: str) -> str:
     """Like yesno() but yes's are wrapped in green"""
-    return f"[{yes_or_no}]{yes_or_no}[/{yes_or_no}]"
+    return style(yes_or_no, yes_or_no)
 
 
 def build_to_str(build: Build) -> str:
@@ -43,22 +70,23 @@ def build_to_str(build: Build) -> str:
     myio = io.StringIO()
 
     fprint = partial(print, file=myio)
-    fprint(f"[bold]Build:[/bold] [blue]{build.machine}/{build.number}[/blue]")
+    bold = partial(style, "bold")
+    fprint(f"{bold('Build:')} {style('blue', f'{build.machine}/{build.number}')}")
 
     if build.info.built is not None:
         built = timestr(build.info.built)
-        fprint(f"[bold]BuildDate:[/bold] {built}")
+        fprint(f"{bold('BuildDate:')} {built}")
 
     submitted = timestr(build.info.submitted)
-    fprint(f"[bold]Submitted:[/bold] {submitted}")
+    fprint(f"{bold('Submitted:')} {submitted}")
 
     completed = timestr(build.info.completed) if build.info.completed else "no"
-    fprint(f"[bold]Completed:[/bold] {completed}")
+    fprint(f"{bold('Completed:')} {completed}")
 
-    fprint(f"[bold]Published:[/bold] {yesno(build.info.published)}")
-    fprint(f"[bold]Keep:[/bold] {yesno(build.info.keep)}")
-    fprint(f"[bold]Tags:[/bold] {' '.join(build.info.tags)}")
-    fprint("[bold]Packages-built:[/bold]", end="")
+    fprint(f"{bold('Published:')} {yesno(build.info.published)}")
+    fprint(f"{bold('Keep:')} {yesno(build.info.keep)}")
+    fprint(f"{bold('Tags:')} {' '.join(build.info.tags)}")
+    fprint(bold("Packages-built:"), end="")
 
     if packages := build.packages_built:
         fprint()
@@ -79,7 +107,8 @@ def build_to_str(build: Build) -> str:
     return myio.getvalue()
 
 
-## format_**() functions below return rich.Console-enabled format strings
+## format_**() functions below return rich.Console-enabled format strings (unless
+## markup is disabled)
 def format_flags(build: Build) -> str:
     """Return build (info) as a string of rich'ly formatted symbols.
 
@@ -93,21 +122,21 @@ def format_flags(build: Build) -> str:
         raise ValueError("Build contains no `.info")
 
     return (
-        f"{'[package]*[/package]' if build.packages_built else ' '}"
-        f"{'[keep]K[/keep]' if build.info.keep else ' '}"
-        f"{'[published]P[/published]' if build.info.published else ' '}"
-        f"{'[note_flag]N[/note_flag]' if build.info.note else ' '}"
+        f"{style('package', '*') if build.packages_built else ' '}"
+        f"{style('keep', 'K') if build.info.keep else ' '}"
+        f"{style('published', 'P') if build.info.published else ' '}"
+        f"{style('note_flag', 'N') if build.info.note else ' '}"
     )
 
 
 def format_build_number(number: int) -> str:
     """Return the (build) number rich'ly formatted"""
-    return f"[build_id]{number}[/build_id]"
+    return style("build_id", str(number))
 
 
 def format_timestamp(timestamp: dt.datetime) -> str:
     """Return the timestamp rich'ly formatted"""
-    return f"[timestamp]{timestamp.strftime('%x %X')}[/timestamp]"
+    return style("timestamp", timestamp.strftime("%x %X"))
 
 
 def format_tags(tags: list[str]) -> str:
@@ -118,7 +147,7 @@ def format_tags(tags: list[str]) -> str:
     tags = [tag for tag in tags if tag]
     tag_list = [f"@{tag}" for tag in tags]
 
-    return f"[tag]{' '.join(tag_list)}[/tag]" if tag_list else ""
+    return style("tag", " ".join(tag_list)) if tag_list else ""
 
 
 def format_machine(machine: str, args: argparse.Namespace) -> str:
@@ -127,13 +156,10 @@ def format_machine(machine: str, args: argparse.Namespace) -> str:
     If the given machine is given in the `my_machines` argument then it will have
     special styling.
     """
-    pre, post = "", ""
-
     if machine in utils.get_my_machines_from_args(args):
-        pre = "[mymachine]"
-        post = "[/mymachine]"
+        machine = style("mymachine", machine)
 
-    return f"[machine]{pre}{machine}{post}[/machine]"
+    return style("machine", machine)
 
 
 def pluralize(singular: str, plural: str, count: int) -> str:
@@ -45,6 +45,60 @@ class BaseSettings:
         return cls.from_dict(prefix, dict(os.environ))
 
 
+@dataclass(kw_only=True, frozen=True)
+class Settings(BaseSettings):  # pylint: disable=too-many-instance-attributes
+    """Settings for gbpcli
+
+    These are set using environment variables prefixed with "GBPCLI_". For example
+    GBPCLI_RETRIES=5.
+    """
+
+    # pylint: disable=invalid-name
+    env_prefix: ClassVar = "GBPCLI_"
+
+    DEBUG: bool = False
+
+    # Number of times to retry a (non-mutation) query on transient server errors
+    RETRIES: int = 2
+    # Seconds to wait before the first retry. Doubled on each subsequent retry
+    RETRY_BACKOFF: float = 0.5
+    # Maximum seconds to wait between retries
+    RETRY_MAX_BACKOFF: float = 8.0
+
+    # Number of consecutive failed requests before failing fast
+    CIRCUIT_THRESHOLD: int = 5
+    # Seconds to fail fast before trying the server again
+    CIRCUIT_COOLDOWN: float = 30.0
+
+    # Send queries as hashes (automatic persisted queries). The server must support it
+    PERSISTED_QUERIES: bool = False
+
+    # Request bodies at least this many bytes are sent gzip-compressed. 0 disables.
+    # The server must support it
+    COMPRESS_MIN_SIZE: int = 0
+
+    # Seconds to wait for a connection to the server
+    CONNECT_TIMEOUT: float = 10.0
+    # Seconds to wait for the server to send data
+    READ_TIMEOUT: float = 60.0
+
+    # Seconds that values used for shell completion (machine names, build numbers) are
+    # cached. After that they are refreshed in the background. 0 disables the cache
+    COMPLETION_TTL: float = 60.0
+    # Seconds after which cached completion values are no longer used, even while they
+    # are refreshed in the background. They are fetched from the server instead
+    COMPLETION_MAX_AGE: float = 3600.0
+
+    # Keep the user's config, the subcommand manifest and the GraphQL queries in one
+    # file in the user's cache directory, which is quicker to read
+    SNAPSHOT: bool = False
+
+    # Forward commands to the agent (`gbp agent`) if it is running
+    AGENT: bool = False
+    # Path of the agent's socket. Defaults to agent.sock in the user's runtime directory
+    AGENT_SOCKET: str = ""
+
+
 def string_value_to_field_value(value: str, type_: str | type[Any]) -> Any:
     """Coerse the given string value to the given type"""
     match getattr(type_, "__name__", type_):
@@ -52,6 +106,8 @@ def string_value_to_field_value(value: str, type_: str | type[Any]) -> Any:
             return get_bool(value)
         case "int":
             return int(value)
+        case "float":
+            return float(value)
         case "Path":
             return Path(value)
         case _:
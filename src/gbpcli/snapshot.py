@@ -0,0 +1,175 @@
+"""Snapshot of the data read at start up, for warm starts
+
+Each time gbp starts it reads and parses the user's config (TOML), the subcommand
+manifest (JSON) and, when they are not bundled (see gbpcli.bundle), the GraphQL queries.
+When the GBPCLI_SNAPSHOT setting is true these are instead kept in a single file in the
+user's cache directory which is read in one go and decoded with marshal. Each entry in
+the snapshot records the modification times of the files it was made from and is made
+again when any of them change.
+
+The snapshot holds the user's config, which may include an API key, so it is only
+readable by the user.
+"""
+
+import marshal
+import os
+import sys
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator
+
+FILENAME = "snapshot.bin"
+# marshal's format is specific to the Python version
+FORMAT = f"{sys.implementation.cache_tag}:{marshal.version}"
+
+
+class Snapshot:
+    """Entries of plain (marshallable) data which are made again when their files change"""
+
+    def __init__(self, path: str, entries: dict[str, Any] | None = None) -> None:
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        """Return the snapshot stored at path
+
+        If there is no (valid) snapshot at path, return an empty one.
+        """
+        try:
+            with open(path, "rb") as fp:
+                data = marshal.loads(fp.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            data = None
+
+        if not isinstance(data, dict) or data.get("format") != FORMAT:
+            return cls(path)
+
+        return cls(path, data["entries"])
+
+    def get[T](
+        self,
+        name: str,
+        make: Callable[[], T],
+        *,
+        key: str = "",
+        files: Callable[[T], Iterable[str]] = lambda value: (),
+    ) -> T:
+        """Return the value of the named entry
+
+        If the entry does not exist, was made with a different key or the files (given
+        by files(value)) have changed since, the value is made again with make().
+        """
+        entry = self.entries.get(name)
+
+        if entry is not None and entry["key"] == key and is_current(entry["files"]):
+            value: T = entry["value"]
+            return value
+
+        value = make()
+
+        try:
+            marshal.dumps(value)  # type: ignore[arg-type]
+        except ValueError:  # Not plain data
+            return value
+
+        self.entries[name] = {"key": key, "files": stamps(files(value)), "value": value}
+        self.changed = True
+
+        return value
+
+    def save(self) -> None:
+        """Write the snapshot if it has changed
+
+        Failing to write the snapshot is not an error. It will be written again next
+        time.
+        """
+        if not self.changed:
+            return
+
+        data = marshal.dumps({"format": FORMAT, "entries": self.entries})
+        tmp = f"{self.path}.{os.getpid()}"
+
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp, self.path)
+        except OSError:
+            with suppress(OSError):
+                os.unlink(tmp)
+            return
+
+        self.changed = False
+
+
+current_snapshot: ContextVar[Snapshot | None] = ContextVar(
+    "current_snapshot", default=None
+)
+
+
+@contextmanager
+def enabled(enable: bool = True, path: str | None = None) -> Iterator[Snapshot | None]:
+    """Use the snapshot at path (by default in the user's cache directory) in the context
+
+    The snapshot is saved when the context exits. If enable is false, do nothing.
+    """
+    if not enable:
+        yield None
+        return
+
+    if path is None:
+        import platformdirs  # pylint: disable=import-outside-toplevel
+
+        path = os.path.join(platformdirs.user_cache_dir("gbpcli"), FILENAME)
+
+    snapshot = Snapshot.load(path)
+    token = current_snapshot.set(snapshot)
+
+    try:
+        yield snapshot
+    finally:
+        current_snapshot.reset(token)
+        snapshot.save()
+
+
+def is_enabled() -> bool:
+    """Return True if a snapshot is used in the current context"""
+    return current_snapshot.get() is not None
+
+
+def cached[T](
+    name: str,
+    make: Callable[[], T],
+    *,
+    key: str = "",
+    files: Callable[[T], Iterable[str]] = lambda value: (),
+) -> T:
+    """Return the named entry of the current snapshot (see Snapshot.get())
+
+    If no snapshot is used in the current context, return make().
+    """
+    if (snapshot := current_snapshot.get()) is None:
+        return make()
+
+    return snapshot.get(name, make, key=key, files=files)
+
+
+def stamps(paths: Iterable[str]) -> dict[str, int | None]:
+    """Return the modification times (in ns) of the files. None if they don't exist"""
+    return {path: mtime(path) for path in paths}
+
+
+def is_current(files: dict[str, int | None]) -> bool:
+    """Return True if the files' modification times are the given ones"""
+    return all(mtime(path) == value for path, value in files.items())
+
+
+def mtime(path: str) -> int | None:
+    """Return the modification time (in ns) of the file at path or None"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
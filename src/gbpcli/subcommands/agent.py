@@ -0,0 +1,145 @@
+"""Run the gbp agent"""
+
+import argparse
+import io
+import os
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from gbpcli import (
+    COLOR_CHOICES,
+    agent,
+    build_parser,
+    get_console,
+    get_gbp,
+    get_plain_console,
+    get_user_config,
+    is_plain,
+    render,
+    run_subcommand,
+    trace,
+)
+from gbpcli.config import Config
+from gbpcli.settings import Settings
+from gbpcli.subcommands import notes
+from gbpcli.types import Console
+
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
+HELP = """Run the gbp agent
+
+The agent is a long-running process that runs gbp commands on behalf of other gbp
+processes. It keeps its connections to the GBP server open, so that commands sent to it
+do not need to start up and connect to the server each time. This is useful when gbp is
+called many times, for example from cron jobs or shell loops.
+
+To have gbp send commands to the agent, set the GBPCLI_AGENT environment variable to 1.
+If the agent is not running, gbp runs commands itself.
+
+The agent listens on a Unix socket that only the user can connect to. The socket path
+can be changed using the GBPCLI_AGENT_SOCKET environment variable. The agent uses its
+own configuration and environment, not those of the gbp process sending the command.
+"""
+
+# These handlers need the user's terminal (or are the agent itself)
+LOCAL_HANDLERS = frozenset({notes.handler})
+
+
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
+    """Run the gbp agent"""
+    path = (
+        Path(args.socket) if args.socket else agent.socket_path(Settings.from_environ())
+    )
+
+    if agent.is_listening(path):
+        console.err.print(f"An agent is already listening on {path}")
+        return 1
+
+    runner = Runner({args.url: gbp}, get_user_config(os.environ.get("GBPCLI_CONFIG")))
+    console.out.print(f"Listening on {path}")
+
+    try:
+        agent.serve(path, runner)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+def parse_args(parser: argparse.ArgumentParser) -> None:
+    """Set subcommand arguments"""
+    parser.add_argument("--socket", default="", help="path of the socket to listen on")
+
+
+class Runner:
+    """Run the commands sent to the agent"""
+
+    def __init__(self, gbps: dict[str, "GBP"], user_config: Config) -> None:
+        """gbps are the (warm) GBP instances for the given urls"""
+        # pylint: disable=import-outside-toplevel
+        from gbpcli.theme import get_theme_from_string
+
+        self.gbps = gbps
+        self.user_config = user_config
+        self.parser = build_parser(user_config)
+        self.theme = get_theme_from_string(os.getenv("GBPCLI_COLORS", ""))
+        self.lock = threading.Lock()
+
+    def __call__(
+        self, request: agent.Request, out: IO[str], err: IO[str]
+    ) -> int | None:
+        args = self.parse_args(request["argv"])
+
+        if args is None or args.func in LOCAL_HANDLERS or args.func is handler:
+            return None
+
+        color = COLOR_CHOICES[args.color]
+        force_terminal = request["tty"] if color is None else color
+        width = request.get("width")
+
+        if plain := is_plain(args, request["tty"]):
+            console = get_plain_console(out=out, err=err, width=width)
+        else:
+            console = get_console(
+                force_terminal, self.theme, out=out, err=err, width=width
+            )
+
+        with trace.Tracer(enabled=args.trace) as tracer, render.markup(not plain):
+            if args.trace:
+                trace.instrument_console(console)
+
+            try:
+                status = run_subcommand(args, self.gbp(args.url), console)
+            except SystemExit as error:
+                # For example utils.ResolveBuildError
+                status = agent.exit_status(error, err)
+
+            if args.trace:
+                tracer.report(console.err)
+
+        return status
+
+    def parse_args(self, argv: list[str]) -> argparse.Namespace | None:
+        """Return the parsed argv
+
+        Return None if argv does not give a command to run, for example "--help" or
+        invalid arguments. Such commands are left to the client.
+        """
+        with self.lock, redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            try:
+                args = self.parser.parse_args(argv)
+            except SystemExit:
+                return None
+
+        return args if hasattr(args, "func") else None
+
+    def gbp(self, url: str) -> "GBP":
+        """Return the GBP instance for the given url"""
+        with self.lock:
+            if (gbp := self.gbps.get(url)) is None:
+                gbp = self.gbps[url] = get_gbp(url, self.user_config)
+
+        return gbp
@@ -1,15 +1,18 @@
 """Schedule a build for the given machine in CI/CD"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Console
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = "Schedule a build for the given machine in CI/CD"
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Schedule a build for the given machine in CI/CD"""
     params = {"is_repo": getattr(args, "is_repo", False)}
     for param in args.param or []:
@@ -0,0 +1,48 @@
+"""Show statistics for or clear the local cache"""
+
+import argparse
+from typing import TYPE_CHECKING
+
+from gbpcli import render
+from gbpcli.types import Console
+
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
+HELP = """Show statistics for or clear the local cache
+
+Logs, packages and diffs of completed builds never change, so these are stored in a
+local cache and only downloaded once. The "stats" action shows the size of the cache.
+The "clear" action removes all entries from the cache.
+
+The maximum size of the cache (in bytes) can be set using the `cache_size` setting in
+gbpcli.toml. Setting it to 0 disables the cache.
+"""
+
+
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
+    """Show statistics for or clear the local cache"""
+    if gbp.cache is None:
+        console.err.print("The cache is disabled")
+        return 1
+
+    if args.action == "clear":
+        count = gbp.cache.clear()
+        console.out.print(
+            f"Removed {count} {render.pluralize('entry', 'entries', count)}"
+        )
+        return 0
+
+    stats = gbp.cache.stats()
+    console.out.print(f"[header]Path:[/header] {stats.path}")
+    console.out.print(f"[header]Entries:[/header] {stats.entries}")
+    console.out.print(f"[header]Size:[/header] {stats.size}/{stats.max_size} bytes")
+
+    return 0
+
+
+def parse_args(parser: argparse.ArgumentParser) -> None:
+    """Set subcommand arguments"""
+    parser.add_argument(
+        "action", choices=("stats", "clear"), default="stats", nargs="?"
+    )
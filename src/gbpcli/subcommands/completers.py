@@ -4,7 +4,7 @@
 import argparse
 from typing import Iterable, Protocol
 
-from gbpcli import GBP
+from gbpcli import completion
 
 
 class Completer(Protocol):  # pylint: disable=too-few-public-methods
@@ -28,10 +28,9 @@ def machines(
     parsed_args: argparse.Namespace,
 ) -> list[str]:
     """Completer for machine names"""
-    gbp = GBP(parsed_args.url)
-    gbp_machines = (i[0] for i in gbp.machines())
+    machine_names = completion.machines(parsed_args.url)
 
-    return [machine for machine in gbp_machines if machine.startswith(prefix)]
+    return [machine for machine in machine_names if machine.startswith(prefix)]
 
 
 def build_ids(
@@ -42,9 +41,7 @@ def build_ids(
     parsed_args: argparse.Namespace,
 ) -> list[str]:
     """Completer for build IDs (numbers)"""
-    machine = parsed_args.machine
-    gbp = GBP(parsed_args.url)
-    numbers = (str(build.number) for build in gbp.builds(machine))
+    numbers = completion.build_numbers(parsed_args.url, parsed_args.machine)
 
     return [number for number in numbers if number.startswith(prefix)]
 
@@ -2,16 +2,27 @@
 
 import argparse
 import locale
-import re
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, replace
 from functools import cache, partial
 from math import ceil
-from typing import Any, Self
+from typing import TYPE_CHECKING, Any, Self
 
-from gbpcli import GBP, render, utils
+from gbpcli import render, utils
+from gbpcli.cpv import Cpv
 from gbpcli.subcommands import completers as comp
-from gbpcli.types import Build, BuildInfo, Change, ChangeState, Console
+from gbpcli.types import (
+    Build,
+    BuildCollection,
+    BuildFlag,
+    BuildInfo,
+    Change,
+    ChangeState,
+    Console,
+)
+
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
 
 HELP = """Show differences between two builds
 
@@ -28,22 +39,24 @@ class Package:
     Basically Change turned inside out.
     """
 
-    cp: str
-    v: str
+    cpv: Cpv
     build_id: int
     size: int
     status: ChangeState
 
     @classmethod
     def from_api(cls, item: Change) -> Self:
-        """Return Package from diff query item"""
+        """Return Package from diff query item
+
+        Raise ValueError if the item's cpv is not valid.
+        """
         assert item.package
-        if match := re.match(r"(.*)-(\d.*)", item.package["cpv"]):
-            cp, v = match.groups()
-            return cls(
-                cp, v, item.package["buildId"], item.package["size"], item.status
-            )
-        raise ValueError(item.package["cpv"])
+        return cls(
+            Cpv.parse(item.package["cpv"]),
+            item.package["buildId"],
+            item.package["size"],
+            item.status,
+        )
 
 
 @dataclass(kw_only=True)
@@ -57,13 +70,16 @@ class DiffStats:
     download_size: int = 0
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Handler for subcommand"""
-    if (left := get_left_build(args.machine, args.left, gbp)) is None:
+    # The machine's builds are retrieved at most once, and only if needed
+    builds = cache(partial(gbp.builds, args.machine))
+
+    if (left := get_left_build(args.machine, args.left, gbp, builds)) is None:
         console.err.print("No builds given and no builds published")
         return 1
 
-    if (right := get_right_build(args.machine, args.right, gbp)) is None:
+    if (right := get_right_build(args.machine, args.right, gbp, builds)) is None:
         console.err.print("Need at least two builds to diff")
         return 1
 
@@ -122,9 +138,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     )
 
 
-def get_left_build(machine: str, requested: str, gbp: GBP) -> int | None:
+def get_left_build(
+    machine: str, requested: str, gbp: "GBP", builds: Callable[[], BuildCollection]
+) -> int | None:
     """Return the requested left build number
 
+    builds returns the machine's builds.
+
     - If requested is not None, returns to the requested build (number)
     - If requested is None, return to the published build for the machine
     - If neither of this is possible, return None
@@ -132,15 +152,18 @@ def get_left_build(machine: str, requested: str, gbp: GBP) -> int | None:
     if requested is not None:
         return utils.resolve_build_id(machine, requested, gbp).number
 
-    builds = cached_builds(machine, gbp)
-    published = [i for i in builds if (i.info and i.info.published)]
+    published = builds().numbers_with(BuildFlag.PUBLISHED)
 
-    return published[0].number if published else None
+    return published[0] if published else None
 
 
-def get_right_build(machine: str, requested: str, gbp: GBP) -> int | None:
+def get_right_build(
+    machine: str, requested: str, gbp: "GBP", builds: Callable[[], BuildCollection]
+) -> int | None:
     """Return the requested right build number
 
+    builds returns the machine's builds.
+
     - If requested is not None, returns to the requested build (number)
     - If requested is None, return the last built build for the machine
     - If neither of this is possible, return None
@@ -148,9 +171,9 @@ def get_right_build(machine: str, requested: str, gbp: GBP) -> int | None:
     if requested is not None:
         return utils.resolve_build_id(machine, requested, gbp).number
 
-    builds = cached_builds(machine, gbp)
+    numbers = builds().numbers
 
-    return builds[-1].number if builds else None
+    return numbers[-1] if numbers else None
 
 
 def print_diff(diff: Iterable[Change], console: Console, with_stats: bool) -> None:
@@ -208,10 +231,10 @@ def aggregate_stats(
         stats.download_size += package.size
         stats.new += 1
         if previous:
-            if previous.cp == package.cp:
+            if previous.cpv.cp == package.cpv.cp:
                 stats.upgrade += 1
                 stats.new -= 1
-                if previous.v == package.v:
+                if previous.cpv == package.cpv:
                     stats.reinstall += 1
                     stats.upgrade -= 1
     elif package.status == ChangeState.REMOVED:
@@ -226,15 +249,6 @@ def humansize(size: int) -> str:
     return f"{locale.format_string('%d', kb, grouping=True)} KiB"
 
 
-@cache
-def cached_builds(machine: str, gbp: GBP) -> list[Build]:
-    """Return the list of builds for the given machine.
-
-    This is a cached version of GBP.builds()
-    """
-    return gbp.builds(machine)
-
-
 def ensure_diffable_build(build: Build) -> Build:
     """Ensure that the build has the right fields to do a diff
 
@@ -2,16 +2,22 @@
 
 import argparse
 import datetime as dt
+import itertools
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import closing
+from typing import TYPE_CHECKING
 
-from rich.console import RenderableType
-from rich.panel import Panel
-from rich.table import Table
-from rich.tree import Tree
-
-from gbpcli import GBP, render, utils
+from gbpcli import render, utils
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Build, Console, Package
 
+if TYPE_CHECKING:
+    import rich.console
+    from rich.console import RenderableType
+    from rich.tree import Tree
+
+    from gbpcli.gbp import GBP
+
 HELP = """Show the GBP builds as a tree
 
 Display all the builds (or the last n builds if --tail is given) for all the
@@ -19,46 +25,106 @@ machines (or only the machines given).  Display the build's timestamp as well as
 the timestamp for each build's packages' completion.  If the build has a note
 that will be displayed as well.
 """
+LABEL = "[header]Machines[/header]"
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Show the machines builds as a tree"""
-    tree = Tree("[header]Machines[/header]", guide_style="box")
-
-    for machine in get_machines(args, gbp):
-        if "." in machine:
-            try:
-                machine, build = get_dotted_machine_and_build(machine, gbp)
-                builds = [build]
-            except utils.ResolveBuildError:
-                console.err.print("Not found")
-                return 1
-        else:
-            builds = gbp.builds(machine, with_packages=True)[-1 * args.tail :]
+    # pylint: disable=import-outside-toplevel
+    from rich.tree import Tree
+
+    machines = get_machines(args, gbp)
+
+    try:
+        dotted_builds = get_dotted_builds(machines, gbp)
+    except utils.ResolveBuildError:
+        console.err.print("Not found")
+        return 1
+
+    if not machines:
+        console.out.print(Tree(LABEL, guide_style="box"))
+        return 0
+
+    # The tree is printed a machine at a time, each machine's builds retrieved just
+    # before it is printed, so only one machine's builds are held in memory.
+    machine_builds = iter_machine_builds(machines, dotted_builds, args.tail, gbp)
+
+    for index, (machine, builds) in enumerate(machine_builds):
+        branch = Branch(
+            LABEL,
+            machine_branch(machine, builds, args),
+            first=index == 0,
+            last=index == len(machines) - 1,
+        )
+        console.out.print(branch)
 
-        branch = tree.add(render.format_machine(machine, args))
+    return 0
 
-        for build in builds:
-            assert build.info
 
-            p_branch = branch.add(render_build(build))
-            build_date = (
-                (build.info.built or build.info.submitted)
-                .astimezone(render.LOCAL_TIMEZONE)
-                .date()
-            )
-            packages: list[Package] = build.packages_built or []
-            packages = sort_packages_by_build_time(packages)
+class Branch:  # pylint: disable=too-few-public-methods
+    """A top-level branch of a tree, renderable on its own
 
-            for package in packages:
-                p_branch.add(render_package(package, build_date))
+    Printing each of the branches of a tree gives the same output as printing the tree.
+    The first branch includes the tree's label.
+    """
 
-    console.out.print(tree)
+    def __init__(
+        self, label: str, branch: "Tree", *, first: bool = True, last: bool = True
+    ) -> None:
+        self.label = label
+        self.branch = branch
+        self.first = first
+        self.last = last
 
-    return 0
+    def __rich_console__(
+        self, console: "rich.console.Console", options: "rich.console.ConsoleOptions"
+    ) -> "rich.console.RenderResult":
+        # pylint: disable=import-outside-toplevel
+        from rich.segment import Segment
+        from rich.tree import Tree
+
+        tree = Tree(self.label, guide_style="box")
+        tree.children.append(self.branch)
+
+        if not self.last:
+            # A sibling to follow the branch so that its guides continue
+            tree.add("")
+
+        lines = console.render_lines(tree, options, pad=False)
+        lines = lines[0 if self.first else 1 : None if self.last else -1]
+
+        for line in lines:
+            yield from line
+            yield Segment.line()
+
+
+def machine_branch(
+    machine: str, builds: Iterable[Build], args: argparse.Namespace
+) -> "Tree":
+    """Return the tree of the machine's builds and their packages"""
+    # pylint: disable=import-outside-toplevel
+    from rich.tree import Tree
+
+    branch = Tree(render.format_machine(machine, args))
+
+    for build in builds:
+        assert build.info
+
+        p_branch = branch.add(render_build(build))
+        build_date = (
+            (build.info.built or build.info.submitted)
+            .astimezone(render.LOCAL_TIMEZONE)
+            .date()
+        )
+        packages = sort_packages_by_build_time(build.packages_built or [])
+
+        for package in packages:
+            p_branch.add(render_package(package, build_date))
 
+    return branch
 
-def get_machines(args: argparse.Namespace, gbp: GBP) -> list[str]:
+
+def get_machines(args: argparse.Namespace, gbp: "GBP") -> list[str]:
     """Return the list of machines requested by the arguments
 
     - If --mine is passed then use --my-machines is returned
@@ -75,7 +141,46 @@ def get_machines(args: argparse.Namespace, gbp: GBP) -> list[str]:
     return gbp.machine_names()
 
 
-def sort_packages_by_build_time(packages: list[Package]) -> list[Package]:
+def get_dotted_builds(machines: list[str], gbp: "GBP") -> dict[str, Build]:
+    """Return the builds of the "dotted" machines (machine.number) given
+
+    The builds are retrieved in one request. Raise ResolveBuildError if any of them is
+    not found.
+    """
+    dotted = [machine for machine in machines if "." in machine]
+    builds = gbp.get_build_info_batch([Build.from_id(machine) for machine in dotted])
+    result: dict[str, Build] = {}
+
+    for machine, build in zip(dotted, builds):
+        if build is None:
+            raise utils.ResolveBuildError(machine)
+        result[machine] = build
+
+    return result
+
+
+def iter_machine_builds(
+    machines: list[str], dotted_builds: dict[str, Build], tail: int, gbp: "GBP"
+) -> Iterator[tuple[str, Sequence[Build]]]:
+    """Yield the given machines each paired with its builds
+
+    For "dotted" machines (machine.number) the builds are only the given build (from
+    dotted_builds). Otherwise they are the last `tail` builds of the machine (all builds
+    if `tail` is 0), retrieved when the machine is reached.
+    """
+    for machine in machines:
+        if (build := dotted_builds.get(machine)) is not None:
+            yield build.machine, [build]
+        elif tail > 0:
+            # The most recent builds come first so the rest of the response is not read
+            with closing(gbp.iter_builds(machine, with_packages=True)) as builds:
+                last = [*itertools.islice(builds, tail)]
+            yield machine, last[::-1]
+        else:
+            yield machine, gbp.builds(machine, with_packages=True)
+
+
+def sort_packages_by_build_time(packages: Sequence[Package]) -> list[Package]:
     """Missing docstring"""
     sorted_packages = [*packages]
     sorted_packages.sort(key=lambda p: getattr(p, "build_time", dt.datetime.min))
@@ -83,8 +188,12 @@ def sort_packages_by_build_time(packages: list[Package]) -> list[Package]:
     return sorted_packages
 
 
-def render_build(build: Build) -> RenderableType:
+def render_build(build: Build) -> "RenderableType":
     """Convert `build` into a rich renderable"""
+    # pylint: disable=import-outside-toplevel
+    from rich.panel import Panel
+    from rich.table import Table
+
     assert build.info
 
     build_str = f"[build_id]{build.number}[/build_id]"
@@ -126,17 +235,6 @@ def render_package(package: Package, build_build_date: dt.date) -> str:
     return f"[package]{package.cpv}[/package] [timestamp]({build_time})[/timestamp]"
 
 
-def get_dotted_machine_and_build(machine_dot_build: str, gbp: GBP) -> tuple[str, Build]:
-    """Split machine_dot_build and return the machine name and Build"""
-    machine, _, number = machine_dot_build.partition(".")
-    build = gbp.get_build_info(Build(machine=machine, number=int(number)))
-
-    if build is None:
-        raise utils.ResolveBuildError(machine_dot_build)
-
-    return machine, build
-
-
 def parse_args(parser: argparse.ArgumentParser) -> None:
     """Set subcommand arguments"""
     parser.add_argument("-t", "--tail", type=int, default=0)
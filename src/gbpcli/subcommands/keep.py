@@ -1,15 +1,19 @@
 """Keep (or release) a build"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP, utils
+from gbpcli import utils
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Console
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """Keep (or release) a build"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Keep (or release) a build"""
     build = utils.resolve_build_id(args.machine, args.number, gbp)
 
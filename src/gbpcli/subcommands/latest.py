@@ -1,15 +1,18 @@
 """Show the latest build number for the given machine"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Console
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """Show the latest build number for the given machine"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Show the latest build number for a machine"""
     if latest_build := gbp.latest(args.machine):
         console.out.print(latest_build.number)
@@ -1,15 +1,18 @@
 """List builds for the given machines"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from rich import box
-from rich.table import Table
-
-from gbpcli import GBP, render
+from gbpcli import render
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Build, Console
 from gbpcli.utils import ColumnData, add_columns
 
+if TYPE_CHECKING:
+    from rich.table import Table
+
+    from gbpcli.gbp import GBP
+
 HELP = """List builds for the given machines
 
 Key for the "Flags" column:
@@ -22,8 +25,12 @@ Key for the "Flags" column:
 """
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """List a machine's builds"""
+    # pylint: disable=import-outside-toplevel
+    from rich import box
+    from rich.table import Table
+
     columns: ColumnData
     builds = gbp.builds(args.machine, with_packages=True)
     table = Table(
@@ -43,7 +50,7 @@ def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
     return 0
 
 
-def add_build_to_row(build: Build, table: Table) -> None:
+def add_build_to_row(build: Build, table: "Table") -> None:
     """Add the given Build to the Table"""
     if build.info is None:  # This should never happen though
         return
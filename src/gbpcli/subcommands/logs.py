@@ -1,15 +1,19 @@
 """Display logs for the given build"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP, render, utils
+from gbpcli import render, utils
 from gbpcli.subcommands import make_searchable
 from gbpcli.types import Console, SearchField
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """Display logs for the given build"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Show build logs"""
     if args.search:
         return search_logs(gbp, args, console)
@@ -30,20 +34,20 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     make_searchable(parser)
 
 
-def search_logs(gbp: GBP, args: argparse.Namespace, console: Console) -> int:
+def search_logs(gbp: "GBP", args: argparse.Namespace, console: Console) -> int:
     """--search handler for the notes subcommand"""
     if not (builds := gbp.search(args.machine, SearchField.logs, args.number)):
         console.err.print("No matches found")
         return 1
 
     sep = ""
-    for build in builds:  # pylint: disable=duplicate-code
+    for build, logs in zip(builds, gbp.logs_batch(builds)):
         console.out.print(sep, end="")
         console.out.print(
             f"{render.format_machine(build.machine, args)}/"
             f"{render.format_build_number(build.number)}"
         )
-        console.out.print(gbp.logs(build))
+        console.out.print(logs)
         sep = "---\n"
 
     return 0
@@ -1,21 +1,21 @@
 """List machines with builds"""
 
 import argparse
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from rich import box
-from rich.table import Table
-
-from gbpcli import GBP, render, utils
+from gbpcli import render, utils
 from gbpcli.types import Console
 from gbpcli.utils import ColumnData, add_columns
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 type Machines = list[tuple[str, int, dict[str, Any]]]
 
 HELP = """List machines with builds"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """List machines with builds"""
     names = utils.get_my_machines_from_args(args) if args.mine else None
     machines = gbp.machines(names=names)
@@ -33,6 +33,11 @@ def print_list(machines: Machines, console: Console, args: argparse.Namespace) -
 
 def print_table(machines: Machines, console: Console, args: argparse.Namespace) -> None:
     """Print the given machines as a table"""
+    # Not needed for the (plain) list
+    # pylint: disable=import-outside-toplevel
+    from rich import box
+    from rich.table import Table
+
     table = Table(
         title=f"{len(machines)} Machines",
         box=box.ROUNDED,
@@ -75,6 +80,6 @@ def latest_build_to_str(build: dict[str, Any]) -> str:
     build_id = build["id"].rpartition(".")[2]
 
     if build["published"]:
-        build_id = f"[published]{build_id}[/published]"
+        build_id = render.style("published", build_id)
 
-    return f"[build_id]{build_id}[/build_id]"
+    return render.style("build_id", build_id)
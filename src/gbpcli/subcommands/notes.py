@@ -5,15 +5,19 @@ import os
 import subprocess
 import sys
 import tempfile
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP, render, utils
+from gbpcli import render, utils
 from gbpcli.subcommands import make_searchable
 from gbpcli.types import Console, SearchField
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """notes subcommand for gbpcli"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Show, search, and edit build notes"""
     if args.search:
         return search_notes(gbp, args.machine, args.number, console)
@@ -44,7 +48,7 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     make_searchable(parser)
 
 
-def search_notes(gbp: GBP, machine: str, key: str, console: Console) -> int:
+def search_notes(gbp: "GBP", machine: str, key: str, console: Console) -> int:
     """--search handler for the notes subcommand"""
     if not (builds := gbp.search(machine, SearchField.notes, key)):
         console.err.print("No matches found")
@@ -1,15 +1,19 @@
 """Display the list of packages for a given build"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP, utils
+from gbpcli import utils
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Console
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """Display the list of packages for a given build"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """List a build's packages"""
     build = utils.resolve_build_id(args.machine, args.number, gbp)
 
@@ -1,19 +1,22 @@
 """Publish a build"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Console
 from gbpcli.utils import resolve_build_id
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """Publish a build
 
 If NUMBER is not specified, defaults to the latest build for the given machine.
 """
 
 
-def handler(args: argparse.Namespace, gbp: GBP, _console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", _console: Console) -> int:
     """Publish a build"""
     build = resolve_build_id(args.machine, args.number, gbp)
 
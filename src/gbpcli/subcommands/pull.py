@@ -1,15 +1,18 @@
 """Pull a build"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Build, Console
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """Pull a build"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, _console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", _console: Console) -> int:
     """Pull a build"""
     build = Build(machine=args.machine, number=args.number)
 
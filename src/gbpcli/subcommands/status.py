@@ -2,22 +2,27 @@
 
 import argparse
 import datetime as dt
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
-from rich import box
-from rich.panel import Panel
-from rich.table import Table
-
-from gbpcli import GBP
 from gbpcli.render import styled_yes, timestr, yesno
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Build, Console, Package
 from gbpcli.utils import resolve_build_id
 
+if TYPE_CHECKING:
+    from rich.table import Table
+
+    from gbpcli.gbp import GBP
+
 HELP = """Show details for a given build"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Show build details"""
+    # pylint: disable=import-outside-toplevel
+    from rich.panel import Panel
+
     resolved_build = resolve_build_id(args.machine, args.number, gbp)
 
     if (build := gbp.get_build_info(resolved_build)) is None:
@@ -41,12 +46,15 @@ def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
     return 0
 
 
-def create_grid() -> Table:
+def create_grid() -> "Table":
     """Create and return a grid with the specified number of columns"""
+    # pylint: disable=import-outside-toplevel
+    from rich.table import Table
+
     return Table.grid("", "")
 
 
-def add_timestamps_to_grid(grid: Table, build: Build) -> None:
+def add_timestamps_to_grid(grid: "Table", build: Build) -> None:
     """Add build timestamps to the grid as rows.
 
     Timestamps include:
@@ -70,6 +78,10 @@ def print_note(console: Console, note: str | None) -> None:
     if not note:
         return
 
+    # pylint: disable=import-outside-toplevel
+    from rich import box
+    from rich.table import Table
+
     console.out.print()
     table = Table(
         "📎 Notes", box=box.ROUNDED, pad_edge=False, style="box", header_style="header"
@@ -93,7 +105,7 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     )
 
 
-def timestamp_row(header: str, timestamp: dt.datetime | None, grid: Table) -> None:
+def timestamp_row(header: str, timestamp: dt.datetime | None, grid: "Table") -> None:
     """Add a header with a timestamp"""
     if timestamp:
         col2 = f"[timestamp]{timestr(timestamp)}[/timestamp]"
@@ -102,7 +114,7 @@ def timestamp_row(header: str, timestamp: dt.datetime | None, grid: Table) -> No
     add_row(grid, header, col2)
 
 
-def add_packages(packages: list[Package] | None, grid: Table) -> None:
+def add_packages(packages: Sequence[Package] | None, grid: "Table") -> None:
     """Add the packages header and list"""
     packages = packages or []
     add_row(
@@ -114,7 +126,7 @@ def add_packages(packages: list[Package] | None, grid: Table) -> None:
         add_row(grid, "", f"[package]{package.cpv}[/package]")
 
 
-def add_row(grid: Table, col1: str, col2: str) -> None:
+def add_row(grid: "Table", col1: str, col2: str) -> None:
     """Add  2-column row to the given grid"""
     sep = ":" if col1 else ""
     grid.add_row(f"[header]{col1}{sep} [/header]", col2)
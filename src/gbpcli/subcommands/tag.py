@@ -1,15 +1,19 @@
 """Add tag to the given build"""
 
 import argparse
+from typing import TYPE_CHECKING
 
-from gbpcli import GBP, utils
+from gbpcli import utils
 from gbpcli.subcommands import completers as comp
 from gbpcli.types import Build, Console
 
+if TYPE_CHECKING:
+    from gbpcli.gbp import GBP
+
 HELP = """Add tag to the given build"""
 
 
-def handler(args: argparse.Namespace, gbp: GBP, console: Console) -> int:
+def handler(args: argparse.Namespace, gbp: "GBP", console: Console) -> int:
     """Add tags builds"""
     build: Build | None
     machine: str = args.machine
@@ -0,0 +1,244 @@
+"""Timing of the phases of a gbp command for the --trace option
+
+Code is instrumented with span() (or accumulate()) context managers. When a Tracer is
+active (and enabled) these record the time spent in the given phase. Otherwise they do
+(almost) nothing. After the command has finished, the Tracer's report() shows the
+recorded spans as a waterfall.
+"""
+
+import functools
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Self
+
+if TYPE_CHECKING:
+    from rich.console import Console as RichConsole
+
+    from gbpcli.plain import PlainConsole
+    from gbpcli.types import Console
+
+BAR_WIDTH = 30
+
+
+@dataclass(kw_only=True, slots=True)
+class Span:
+    """A timed phase"""
+
+    kind: str
+    name: str
+    start: float
+    duration: float = 0.0
+    depth: int = 0
+    count: int = 1
+    details: dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """Records Spans while active
+
+    This is a context manager. Spans are recorded within the context (see contextvars)
+    as long as the Tracer is enabled.
+    """
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.spans: list[Span] = []
+        self.totals: dict[tuple[int, str, str], Span] = {}
+        self._tokens: list[Token[Tracer | None]] = []
+
+    def __enter__(self) -> Self:
+        self._tokens.append(current_tracer.set(self))
+
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        current_tracer.reset(self._tokens.pop())
+
+    def report(self, console: "RichConsole | PlainConsole") -> None:
+        """Print the waterfall of recorded spans to the given console"""
+        # pylint: disable=import-outside-toplevel
+        from rich import box
+        from rich.table import Table
+
+        total = max(
+            (item.start + item.duration - self.start for item in self.spans),
+            default=0.0,
+        )
+        table = Table(
+            title=f"Trace ({total * 1000:.1f}ms)", box=box.SIMPLE, title_style="bold"
+        )
+        table.add_column("Phase")
+        table.add_column("Start", justify="right")
+        table.add_column("Time", justify="right")
+        table.add_column("")
+        table.add_column("Details")
+
+        for item in sorted(self.spans, key=lambda item: item.start):
+            offset = item.start - self.start
+            table.add_row(
+                f"{'  ' * item.depth}{item.kind} [bold]{item.name}[/bold]",
+                f"{offset * 1000:.1f}ms",
+                f"{item.duration * 1000:.1f}ms",
+                waterfall_bar(offset, item.duration, total),
+                format_details(item),
+            )
+
+        console.print(table)
+
+
+current_tracer: ContextVar[Tracer | None] = ContextVar("current_tracer", default=None)
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(kind: str, name: str, **details: Any) -> Iterator[Span]:
+    """Record the time spent in the context as a Span
+
+    The Span is yielded so that details can be added to it. Its duration is set when
+    the context exits. If there is no (enabled) Tracer the Span is not recorded.
+
+    Because the Span becomes the parent of Spans started within the context, don't
+    yield from a generator within the context. Use record() instead.
+    """
+    tracer = current_tracer.get()
+    parent = current_span.get()
+    new_span = Span(
+        kind=kind,
+        name=name,
+        start=time.perf_counter(),
+        depth=0 if parent is None else parent.depth + 1,
+        details=details,
+    )
+
+    if tracer is None or not tracer.enabled:
+        try:
+            yield new_span
+        finally:
+            new_span.duration = time.perf_counter() - new_span.start
+        return
+
+    tracer.spans.append(new_span)
+    token = current_span.set(new_span)
+
+    try:
+        yield new_span
+    finally:
+        new_span.duration = time.perf_counter() - new_span.start
+        current_span.reset(token)
+
+
+def record(kind: str, name: str, start: float, **details: Any) -> None:
+    """Record a Span which started at the given time (perf_counter) and ends now"""
+    if not is_enabled():
+        return
+
+    tracer = current_tracer.get()
+    assert tracer
+    parent = current_span.get()
+    tracer.spans.append(
+        Span(
+            kind=kind,
+            name=name,
+            start=start,
+            duration=time.perf_counter() - start,
+            depth=0 if parent is None else parent.depth + 1,
+            details=details,
+        )
+    )
+
+
+def is_enabled() -> bool:
+    """Return True if spans are being recorded in the current context"""
+    tracer = current_tracer.get()
+
+    return tracer is not None and tracer.enabled
+
+
+@contextmanager
+def accumulate(kind: str, name: str) -> Iterator[None]:
+    """Like span() but the time is added to a single Span for the kind and name
+
+    Use this for phases that happen many times, for example per item. The Span's count
+    is the number of times the phase happened.
+    """
+    tracer = current_tracer.get()
+
+    if tracer is None or not tracer.enabled:
+        yield
+        return
+
+    parent = current_span.get()
+    key = (id(parent), kind, name)
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+
+        if (total := tracer.totals.get(key)) is None:
+            total = tracer.totals[key] = Span(
+                kind=kind,
+                name=name,
+                start=start,
+                depth=0 if parent is None else parent.depth + 1,
+                count=0,
+            )
+            tracer.spans.append(total)
+
+        total.duration += duration
+        total.count += 1
+
+
+def instrument_console(console: "Console") -> None:
+    """Time the printing (rendering) done by the given Console"""
+    for name, rich_console in [("out", console.out), ("err", console.err)]:
+        setattr(rich_console, "print", timed("render", name, rich_console.print))
+
+
+def timed[**P, T](kind: str, name: str, func: Callable[P, T]) -> Callable[P, T]:
+    """Wrap func so that calls to it are accumulated"""
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        with accumulate(kind, name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def waterfall_bar(offset: float, duration: float, total: float) -> str:
+    """Return the waterfall bar for a span"""
+    if total <= 0:
+        return ""
+
+    start = int(offset / total * BAR_WIDTH)
+    length = max(1, round(duration / total * BAR_WIDTH))
+
+    return f"{' ' * start}[cyan]{'█' * length}[/cyan]"
+
+
+def format_details(span_: Span) -> str:
+    """Return the span's details as a string
+
+    Float values are durations (in seconds).
+    """
+    from rich.markup import escape  # pylint: disable=import-outside-toplevel
+
+    parts = [] if span_.count == 1 else [f"×{span_.count}"]
+
+    for key, value in span_.details.items():
+        if value is None:
+            continue
+        if isinstance(value, float):
+            parts.append(f"{key}={value * 1000:.1f}ms")
+        elif isinstance(value, (dict, list)):
+            parts.append(f"{key}={json.dumps(value, separators=(',', ':'))}")
+        else:
+            parts.append(f"{key}={value}")
+
+    return escape(" ".join(parts))
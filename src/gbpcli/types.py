@@ -1,71 +1,239 @@
 """gbp-cli data types"""
 
 import datetime as dt
-from dataclasses import dataclass
-from enum import Enum, IntEnum
-from typing import Any, Self, TypedDict
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import MISSING, dataclass
+from enum import Enum, IntEnum, IntFlag
+from typing import TYPE_CHECKING, Any, Callable, Self, TypedDict, cast, overload
 
-import rich.console
+if TYPE_CHECKING:
+    import rich.console
+
+    from gbpcli.plain import PlainConsole
 
 fromisoformat = dt.datetime.fromisoformat
 fromtimestamp = dt.datetime.fromtimestamp
+setattr_ = object.__setattr__
 
 
-@dataclass(frozen=True, kw_only=True, slots=True)
-class BuildInfo:
+class Decoded[T]:
+    """A dataclass field which may be given its raw value from the API
+
+    The raw value (an instance of `raw`) is decoded with `decode` when the field is
+    first read and the decoded value replaces it. The value is stored in the instance's
+    slot named after the field with a leading underscore.
+
+    Most of the timestamps in API responses are never looked at, so parsing them when
+    the response is converted is wasted time.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[Any], T],
+        raw: type | tuple[type, ...],
+        default: Any = MISSING,
+    ) -> None:
+        self.decode = decode
+        self.raw = raw
+        self.default = default
+        self.slot = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = f"_{name}"
+
+    def __get__(self, instance: object | None, owner: type | None = None) -> T:
+        if instance is None:
+            # dataclass gets the field's default from the class
+            if self.default is MISSING:
+                raise AttributeError(self.slot[1:])
+            return self.default
+
+        value = getattr(instance, self.slot)
+
+        if isinstance(value, self.raw):
+            value = self.decode(value)
+            object.__setattr__(instance, self.slot, value)
+
+        return cast(T, value)
+
+    def __set__(self, instance: object, value: T | Any) -> None:
+        object.__setattr__(instance, self.slot, value)
+
+
+class FrozenSlots:
+    """Pickle support for frozen dataclasses that declare their own __slots__
+
+    (dataclass(slots=True) adds this but can't be used with Decoded fields.)
+    """
+
+    __slots__: tuple[str, ...] = ()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for slot, value in state.items():
+            object.__setattr__(self, slot, value)
+
+
+def decoded(
+    decode: Callable[[Any], Any], raw: type | tuple[type, ...], default: Any = MISSING
+) -> Any:
+    """Return a Decoded field
+
+    The type is Any so that it can be the value of the field's (decoded) type.
+    """
+    return Decoded(decode, raw, default)
+
+
+@dataclass(frozen=True, kw_only=True)
+class BuildInfo(FrozenSlots):
     """Metadata about a Build
 
-    Retrieved from the API.
+    Retrieved from the API. The timestamps are parsed when first read.
     """
 
+    __slots__ = (
+        "keep",
+        "note",
+        "published",
+        "tags",
+        "_submitted",
+        "_completed",
+        "_built",
+    )
+
     keep: bool
     note: str | None
     published: bool
     tags: list[str]
-    submitted: dt.datetime
-    completed: dt.datetime | None = None
-    built: dt.datetime | None = None
+    submitted: dt.datetime = decoded(fromisoformat, str)
+    completed: dt.datetime | None = decoded(fromisoformat, str, None)
+    built: dt.datetime | None = decoded(fromisoformat, str, None)
 
     @classmethod
     def from_api_response(cls: type[Self], api_response: dict[str, Any]) -> Self:
-        """Return a BuildInfo given the response from the API"""
-        built = api_response.get("built")
-        completed = api_response.get("completed")
-        submitted = api_response["submitted"]
+        """Return a BuildInfo given the response from the API
 
-        return cls(
+        The timestamps are parsed when first read.
+        """
+        return cls.from_raw(
             keep=api_response.get("keep", False),
             published=api_response.get("published", False),
             tags=api_response.get("tags", []),
             note=api_response.get("notes"),
-            submitted=fromisoformat(submitted),
-            completed=fromisoformat(completed) if completed is not None else None,
-            built=fromisoformat(built) if built is not None else None,
+            submitted=api_response["submitted"],
+            completed=api_response.get("completed"),
+            built=api_response.get("built"),
         )
 
+    @classmethod
+    def from_raw(  # pylint: disable=too-many-arguments
+        cls: type[Self],
+        *,
+        keep: bool,
+        note: str | None,
+        published: bool,
+        tags: list[str],
+        submitted: str,
+        completed: str | None,
+        built: str | None,
+    ) -> Self:
+        """Return a BuildInfo given its timestamps as ISO 8601 strings
+
+        The timestamps are stored as given, bypassing __init__ (and Decoded.__set__)
+        as builds are converted by the thousand.
+        """
+        info = cls.__new__(cls)
+        setattr_(info, "keep", keep)
+        setattr_(info, "published", published)
+        setattr_(info, "tags", tags)
+        setattr_(info, "note", note)
+        setattr_(info, "_submitted", submitted)
+        setattr_(info, "_completed", completed)
+        setattr_(info, "_built", built)
 
-@dataclass(frozen=True, kw_only=True, slots=True)
-class Package:
-    """A (binary) package"""
+        return info
+
+
+@dataclass(frozen=True, kw_only=True)
+class Package(FrozenSlots):
+    """A (binary) package
+
+    The build time is given by the API as seconds since the epoch and converted when
+    first read.
+    """
+
+    __slots__ = ("cpv", "_build_time")
 
     cpv: str
-    build_time: dt.datetime
+    build_time: dt.datetime = decoded(fromtimestamp, (int, float))
 
     @classmethod
-    def from_api_response(
-        cls: type[Self], api_response: dict[str, Any]
-    ) -> list[Self] | None:
-        """Return a list of Packages from the api reponse.
+    def from_api_response(cls, api_response: dict[str, Any]) -> "PackageList | None":
+        """Return the Packages of the api reponse.
 
         If the response's "packagesBuild" field is None, return None.
         """
         if (packages := api_response.get("packagesBuilt", None)) is None:
             return None
 
-        return [
-            cls(cpv=p["cpv"], build_time=fromtimestamp(p.get("buildTime", 0)))
-            for p in packages
-        ]
+        return PackageList(packages)
+
+    @classmethod
+    def from_raw(cls: type[Self], cpv: str, build_time: int | float) -> Self:
+        """Return a Package given its cpv and build time (seconds since the epoch)"""
+        package = cls.__new__(cls)
+        setattr_(package, "cpv", cpv)
+        setattr_(package, "_build_time", build_time)
+
+        return package
+
+
+class PackageList(Sequence[Package]):
+    """The packages built of a Build
+
+    Builds can have thousands of packages, and often (as in `gbp list`) they are only
+    counted. So the list holds the "packagesBuilt" items of the API response and makes
+    each Package when it is accessed.
+    """
+
+    __slots__ = ("raw", "length")
+
+    def __init__(self, raw: list[dict[str, Any]]) -> None:
+        self.raw = raw
+        self.length = len(raw)
+
+    def __len__(self) -> int:
+        return self.length
+
+    @overload
+    def __getitem__(self, index: int) -> Package: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "PackageList": ...
+
+    def __getitem__(self, index: int | slice) -> "Package | PackageList":
+        if isinstance(index, slice):
+            return PackageList(self.raw[index])
+
+        item = self.raw[index]
+
+        return Package.from_raw(item["cpv"], item.get("buildTime", 0))
+
+    def __iter__(self) -> Iterator[Package]:
+        for item in self.raw:
+            yield Package.from_raw(item["cpv"], item.get("buildTime", 0))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
 
 
 @dataclass(frozen=True, kw_only=True, slots=True)
@@ -75,7 +243,7 @@ class Build:
     machine: str
     number: int
     info: BuildInfo | None = None
-    packages_built: list[Package] | None = None
+    packages_built: Sequence[Package] | None = None
 
     @property
     def id(self) -> str:  # pylint: disable=invalid-name
@@ -98,6 +266,241 @@ class Build:
         return cls.from_id(api_response["id"], info=info, packages_built=packages_built)
 
 
+class BuildFlag(IntFlag):
+    """Flags of a Build in a BuildCollection"""
+
+    KEEP = 1
+    PUBLISHED = 2
+    NOTE = 4
+
+
+# The flags as ints. Combining and testing ints is much quicker than BuildFlags, which
+# matters when done for each of a machine's builds
+KEEP = int(BuildFlag.KEEP)
+PUBLISHED = int(BuildFlag.PUBLISHED)
+NOTE = int(BuildFlag.NOTE)
+
+
+class Interned[T]:  # pylint: disable=too-few-public-methods
+    """A table of distinct values, each referred to by its index"""
+
+    __slots__ = ("values", "indexes")
+
+    def __init__(self, *values: T) -> None:
+        self.values: list[T] = []
+        self.indexes: dict[T, int] = {}
+
+        for value in values:
+            self.add(value)
+
+    def add(self, value: T) -> int:
+        """Add the value to the table, if not already there, and return its index"""
+        if (index := self.indexes.get(value)) is None:
+            index = self.indexes[value] = len(self.values)
+            self.values.append(value)
+
+        return index
+
+
+class Timestamps:
+    """A column of (optional) ISO 8601 timestamps, as given by the API
+
+    The timestamps are kept as text, packed into one buffer, and are only parsed when
+    the BuildInfo of a Build made from the column is read. Most are never looked at.
+    Columns made by take() share the buffer.
+    """
+
+    __slots__ = ("text", "starts", "lengths")
+
+    def __init__(self) -> None:
+        self.text = bytearray()
+        self.starts = array("L")
+        # 0 for None
+        self.lengths = array("B")
+
+    def append(self, value: str | None) -> None:
+        """Add the timestamp to the end of the column"""
+        encoded = value.encode("ascii") if value is not None else b""
+        self.starts.append(len(self.text))
+        self.lengths.append(len(encoded))
+        self.text += encoded
+
+    def __getitem__(self, index: int) -> str | None:
+        if not (length := self.lengths[index]):
+            return None
+
+        start = self.starts[index]
+
+        return self.text[start : start + length].decode("ascii")
+
+    def take(self, indexes: slice) -> "Timestamps":
+        """Return the column of the given rows"""
+        column = Timestamps()
+        column.text = self.text
+        column.starts = self.starts[indexes]
+        column.lengths = self.lengths[indexes]
+
+        return column
+
+    def reverse(self) -> None:
+        """Reverse the column in place"""
+        self.starts.reverse()
+        self.lengths.reverse()
+
+
+class BuildCollection(Sequence[Build]):  # pylint: disable=too-many-instance-attributes
+    """A sequence of Builds stored column-wise
+
+    Machines with long histories have tens of thousands of builds, and as Build objects
+    (with their BuildInfo, datetimes and strings) they take hundreds of bytes each. Here
+    the builds' numbers are kept in an array, their (unparsed) timestamps in Timestamps
+    columns, their keep/published/note flags in an array of BuildFlags and their
+    machines, tags and notes in tables of distinct values, which is around a hundred
+    bytes per build. The Builds are made when they are accessed.
+
+    Builds are added in the order of the API response with append_api_response().
+    """
+
+    def __init__(self) -> None:
+        self.numbers = array("q")
+        self.flags = array("B")
+        self.machines = array("L")
+        self.tags = array("L")
+        self.notes = array("L")
+        self.submitted = Timestamps()
+        self.completed = Timestamps()
+        self.built = Timestamps()
+        self.packages_built: list[PackageList | None] = []
+        self.machine_table: Interned[str] = Interned()
+        self.tag_table: Interned[tuple[str, ...]] = Interned(())
+        self.note_table: Interned[str] = Interned("")
+
+    @classmethod
+    def from_api_response(cls, api_response: Iterable[dict[str, Any]]) -> Self:
+        """Return a BuildCollection of the builds in the API response"""
+        collection = cls()
+
+        for item in api_response:
+            collection.append_api_response(item)
+
+        return collection
+
+    def append_api_response(self, api_response: dict[str, Any]) -> None:
+        """Add the build, given its response from the API, to the end"""
+        machine, _, number = api_response["id"].partition(".")
+        note = api_response.get("notes")
+        flags = 0
+
+        if api_response.get("keep", False):
+            flags |= KEEP
+        if api_response.get("published", False):
+            flags |= PUBLISHED
+        if note is not None:
+            flags |= NOTE
+
+        self.numbers.append(int(number))
+        self.flags.append(flags)
+        self.machines.append(self.machine_table.add(machine))
+        self.tags.append(self.tag_table.add(tuple(api_response.get("tags", []))))
+        self.notes.append(self.note_table.add(note or ""))
+        self.submitted.append(api_response["submitted"])
+        self.completed.append(api_response.get("completed"))
+        self.built.append(api_response.get("built"))
+
+        self.packages_built.append(Package.from_api_response(api_response))
+
+    def numbers_with(self, flag: BuildFlag) -> list[int]:
+        """Return the numbers of the builds having the given flag"""
+        value = int(flag)
+
+        return [
+            number for number, flags in zip(self.numbers, self.flags) if flags & value
+        ]
+
+    def reverse(self) -> None:
+        """Reverse the builds in place"""
+        for column in [self.numbers, self.flags, self.machines, self.tags, self.notes]:
+            column.reverse()
+
+        self.submitted.reverse()
+        self.completed.reverse()
+        self.built.reverse()
+        self.packages_built.reverse()
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    @overload
+    def __getitem__(self, index: int) -> Build: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "BuildCollection": ...
+
+    def __getitem__(self, index: int | slice) -> "Build | BuildCollection":
+        if isinstance(index, slice):
+            return self.take(index)
+
+        return self.build(index)
+
+    def __iter__(self) -> Iterator[Build]:
+        for index in range(len(self)):
+            yield self.build(index)
+
+    def build(self, index: int) -> Build:
+        """Return the Build at the given index"""
+        flags = self.flags[index]
+        submitted = self.submitted[index]
+        assert submitted is not None
+
+        info = BuildInfo.from_raw(
+            keep=bool(flags & KEEP),
+            published=bool(flags & PUBLISHED),
+            note=(self.note_table.values[self.notes[index]] if flags & NOTE else None),
+            tags=list(self.tag_table.values[self.tags[index]]),
+            submitted=submitted,
+            completed=self.completed[index],
+            built=self.built[index],
+        )
+
+        return Build(
+            machine=self.machine_table.values[self.machines[index]],
+            number=self.numbers[index],
+            info=info,
+            packages_built=self.packages_built[index],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def take(self, indexes: slice) -> "BuildCollection":
+        """Return a BuildCollection of the given builds
+
+        The new collection shares this one's tables.
+        """
+        collection = BuildCollection()
+        collection.machine_table = self.machine_table
+        collection.tag_table = self.tag_table
+        collection.note_table = self.note_table
+
+        collection.numbers = self.numbers[indexes]
+        collection.flags = self.flags[indexes]
+        collection.machines = self.machines[indexes]
+        collection.tags = self.tags[indexes]
+        collection.notes = self.notes[indexes]
+        collection.submitted = self.submitted.take(indexes)
+        collection.completed = self.completed.take(indexes)
+        collection.built = self.built.take(indexes)
+        collection.packages_built = self.packages_built[indexes]
+
+        return collection
+
+
 class ChangeState(IntEnum):
     """Diff status"""
 
@@ -136,5 +539,5 @@ class Change:
 class Console:
     """Output sinks for handlers"""
 
-    out: rich.console.Console
-    err: rich.console.Console
+    out: "rich.console.Console | PlainConsole"
+    err: "rich.console.Console | PlainConsole"
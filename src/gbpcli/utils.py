@@ -1,22 +1,29 @@
 """Utility functions"""
 
 import argparse
+import contextlib
 import datetime as dt
+import io
+import json
 import os
 import sys
 from pathlib import Path
-from typing import Any, Iterable, cast
+from typing import TYPE_CHECKING, Any, Iterable, cast
 
-from dotenv import load_dotenv
-from rich.table import Table
+import platformdirs
 
-from gbpcli.gbp import GBP
 from gbpcli.types import Build
 
+if TYPE_CHECKING:
+    from rich.table import Table
+
+    from gbpcli.gbp import GBP
+
 # This is the datetime of the first git commit of gentoo-build-publisher
 EPOCH = dt.datetime.fromtimestamp(1616266641, tz=dt.UTC)
 
 DEFAULT_SERVER_CONF = "/etc/gentoo-build-publisher.conf"
+SERVER_ENV_CACHE = "serverenv.json"
 TAG_SYM = "@"
 
 ColumnData = Iterable[tuple[str, dict[str, Any]]]
@@ -30,7 +37,7 @@ class ResolveBuildError(SystemExit):
     """
 
 
-def resolve_build_id(machine: str, build_id: str | None, gbp: GBP) -> Build:
+def resolve_build_id(machine: str, build_id: str | None, gbp: "GBP") -> Build:
     """Resolve build ids, tags, and optional numbers into a Build object
 
     If there is an issue finding/calculating the build, then ResolveBuildError, which a
@@ -72,11 +79,12 @@ def set_env() -> None:
 def load_env(path: str | Path = DEFAULT_SERVER_CONF) -> bool:
     """Silently load the server config into the environment
 
-    Also re-evaluate sys.path according to PYTHONPATH.
-
     Contents of the file are loaded as environment variables. Return True.
 
     If the path does not exist or is not readable. Return False
+
+    Note that sys.path is not re-evaluated according to the (new) PYTHONPATH. That is
+    left to re_path() when modules from the server are needed.
     """
     if os.environ.get("GBPCLI_DONTLOADSERVERENV", ""):
         return False
@@ -84,12 +92,64 @@ def load_env(path: str | Path = DEFAULT_SERVER_CONF) -> bool:
     if not (os.path.exists(path) and os.access(path, os.R_OK)):
         return False
 
-    load_dotenv(path, override=True)
-    re_path()
+    os.environ.update(read_env(path))
 
     return True
 
 
+def read_env(path: str | Path) -> dict[str, str]:
+    """Return the variables set in the env file at path
+
+    The result is cached in the user's cache directory, keyed on the file's path,
+    modification time and size. Files using variable expansion are not cached as their
+    values depend on the environment.
+    """
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    cache_path = Path(platformdirs.user_cache_dir("gbpcli"), SERVER_ENV_CACHE)
+
+    try:
+        cached = json.loads(cache_path.read_bytes())
+        if cached["key"] == key:
+            return cast(dict[str, str], cached["values"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    from dotenv import dotenv_values  # pylint: disable=import-outside-toplevel
+
+    text = Path(path).read_text(encoding="UTF-8")
+    parsed = dotenv_values(stream=io.StringIO(text))
+    values = {name: value for name, value in parsed.items() if value is not None}
+
+    if "${" not in text:
+        write_private(cache_path, json.dumps({"key": key, "values": values}))
+
+    return values
+
+
+def write_private(path: Path, content: str) -> None:
+    """Atomically write content to a file only the user can read
+
+    Failing to write the file is not an error.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="UTF-8") as fp:
+            fp.write(content)
+        tmp.replace(path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+
+
+def python_path() -> list[str]:
+    """Return the (non-empty) entries of PYTHONPATH"""
+    return [path for path in os.environ.get("PYTHONPATH", "").split(os.pathsep) if path]
+
+
 def re_path() -> None:
     """Evaluate PYTHONPATH and set sys.path accordingly"""
     environ = os.environ
@@ -100,7 +160,7 @@ def re_path() -> None:
             sys.path.insert(0, path)
 
 
-def add_columns(table: Table, data: ColumnData) -> None:
+def add_columns(table: "Table", data: ColumnData) -> None:
     """Add the given ColumnData to the given table"""
     for header, kwargs in data:
         kwargs = kwargs.copy()
@@ -108,7 +168,7 @@ def add_columns(table: Table, data: ColumnData) -> None:
         table.add_column(header, **kwargs)
 
 
-def latest(machine: str, gbp: GBP) -> Build:
+def latest(machine: str, gbp: "GBP") -> Build:
     """Return the latest build for the given machine
 
     Raise ResolveBuildError if there are no builds
@@ -119,7 +179,7 @@ def latest(machine: str, gbp: GBP) -> Build:
     return build
 
 
-def resolve_tag(machine: str, tag: str, gbp: GBP) -> Build:
+def resolve_tag(machine: str, tag: str, gbp: "GBP") -> Build:
     """Resolves the given tag for the given machine
 
     `tag` should not start with a `"@"`.
@@ -3,19 +3,21 @@
 # pylint: disable=missing-docstring,protected-access
 
 import datetime as dt
+import hashlib
 from json import dumps as stringify
-from typing import Sequence
+from typing import Any, Sequence
 from unittest import mock
 
 import gbp_testkit.fixtures as testkit
 import requests
-from gbp_testkit.helpers import ts
+from gbp_testkit.helpers import mock_gbp_session_post, ts
 from gentoo_build_publisher import publisher
 from gentoo_build_publisher.records import BuildRecord
 from gentoo_build_publisher.types import Build
 from unittest_fixtures import FixtureContext, Fixtures, fixture
 
 from gbpcli import types
+from gbpcli.cache import Cache
 
 NO_JSON = object()
 
@@ -46,11 +48,20 @@ build = types.Build(
 @fixture(testkit.tmpdir)
 def user_config_dir(fixtures: Fixtures) -> FixtureContext[mock.Mock]:
     with mock.patch(
-        "gbpcli.platformdirs.user_config_dir", return_value=fixtures.tmpdir
+        "platformdirs.user_config_dir", return_value=fixtures.tmpdir
     ) as patch:
         yield patch
 
 
+@fixture(testkit.tmpdir, testkit.gbp)
+def cache(fixtures: Fixtures, max_size: int = 1024 * 1024) -> Cache:
+    """Cache in a temporary directory. Also set as the gbp fixture's cache"""
+    cache_ = Cache(fixtures.tmpdir / "cache", max_size=max_size)
+    fixtures.gbp.cache = cache_
+
+    return cache_
+
+
 @fixture(testkit.publisher, testkit.build)
 def pulled_build(  # pylint: disable=too-many-arguments,redefined-outer-name
     fixtures: Fixtures,
@@ -95,6 +106,7 @@ def http_response(status_code=200, json=NO_JSON, content=None) -> requests.Respo
     response = requests.Response()
     response.status_code = status_code
     response._content = content
+    response._content_consumed = True
 
     if json is not NO_JSON:
         response._content = stringify(json, sort_keys=True).encode("utf-8")
@@ -106,3 +118,46 @@ def http_response(status_code=200, json=NO_JSON, content=None) -> requests.Respo
 def create_machine_builds(machine: str, count: int, stop: int):
     for i in range(stop - count + 1, stop + 1):
         publisher.pull(Build(machine=machine, build_id=str(i)))
+
+
+class APQServer:  # pylint: disable=too-few-public-methods
+    """Stand-in for a GBP server that supports automatic persisted queries
+
+    Use this as a replacement for session.post. Queries are executed by the in-process
+    GBP. The payloads posted are recorded in .payloads.
+    """
+
+    def __init__(self) -> None:
+        self.queries: dict[str, str] = {}
+        self.payloads: list[dict[str, Any]] = []
+
+    def __call__(self, url: str, *, json: dict[str, Any]) -> requests.Response:
+        self.payloads.append(json)
+        persisted = (json.get("extensions") or {}).get("persistedQuery")
+
+        if persisted is None:
+            return mock_gbp_session_post(url, json=json)
+
+        sha256 = persisted["sha256Hash"]
+
+        if query := json.get("query"):
+            if hashlib.sha256(query.encode("UTF-8")).hexdigest() != sha256:
+                return http_response(
+                    json={"errors": [{"message": "provided sha does not match query"}]}
+                )
+            self.queries[sha256] = query
+        elif (query := self.queries.get(sha256)) is None:
+            return http_response(
+                json={
+                    "errors": [
+                        {
+                            "message": "PersistedQueryNotFound",
+                            "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+                        }
+                    ]
+                }
+            )
+
+        return mock_gbp_session_post(
+            url, json={"query": query, "variables": json.get("variables")}
+        )
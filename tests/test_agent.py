@@ -0,0 +1,198 @@
+"""Tests for the gbp agent"""
+
+# pylint: disable=missing-docstring,unused-argument
+import io
+import os
+import threading
+from pathlib import Path
+from unittest import TestCase, mock
+
+import gbp_testkit.fixtures as testkit
+from gentoo_build_publisher import publisher
+from gentoo_build_publisher.types import Build
+from unittest_fixtures import FixtureContext, Fixtures, fixture, given
+
+from gbpcli import agent, main
+from gbpcli.config import Config
+from gbpcli.subcommands.agent import Runner
+
+from . import lib
+
+URL = "http://gbp.invalid/"
+
+
+@fixture(testkit.tmpdir, testkit.gbp)
+def agent_socket(fixtures: Fixtures) -> FixtureContext[Path]:
+    """Path to the socket of an agent running in a thread"""
+    path = fixtures.tmpdir / "agent.sock"
+    runner = Runner({URL: fixtures.gbp}, Config(url=URL))
+
+    with agent.AgentServer(path, runner) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        yield path
+        server.shutdown()
+        thread.join()
+
+
+def forward(path: Path, argv: list[str]) -> tuple[int | None, str, str]:
+    with (
+        mock.patch("sys.stdout", new_callable=io.StringIO) as stdout,
+        mock.patch("sys.stderr", new_callable=io.StringIO) as stderr,
+    ):
+        status = agent.forward(path, argv)
+
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+@given(agent_socket, testkit.publisher)
+class ForwardTests(TestCase):
+    def test_runs_command_on_agent(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 3)
+
+        status, stdout, stderr = forward(
+            fixtures.agent_socket, ["latest", "lighthouse"]
+        )
+
+        self.assertEqual((status, stdout, stderr), (0, "3\n", ""))
+
+    def test_trace(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 3)
+
+        status, stdout, stderr = forward(
+            fixtures.agent_socket, ["--trace", "latest", "lighthouse"]
+        )
+
+        self.assertEqual((status, stdout), (0, "3\n"))
+        self.assertIn("Trace (", stderr)
+        self.assertIn("command latest", stderr)
+        self.assertIn("query latest", stderr)
+
+    def test_plain_output(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 3)
+        argv = ["--color=always", "machines", "--short"]
+
+        _, rich_stdout, _ = forward(fixtures.agent_socket, argv)
+        _, plain_stdout, _ = forward(fixtures.agent_socket, ["--format=plain", *argv])
+
+        self.assertIn("\x1b[", rich_stdout)
+        self.assertEqual(plain_stdout, "lighthouse\n")
+
+    def test_exit_status_and_stderr(self, fixtures: Fixtures) -> None:
+        status, stdout, stderr = forward(fixtures.agent_socket, ["latest", "bogus"])
+
+        self.assertEqual(
+            (status, stdout, stderr), (1, "", "No builds exist for the given machine\n")
+        )
+
+    def test_system_exit(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 3)
+
+        status, stdout, stderr = forward(
+            fixtures.agent_socket, ["status", "lighthouse", "@bogus"]
+        )
+
+        self.assertEqual(
+            (status, stdout, stderr), (1, "", "No such tag for lighthouse: 'bogus'\n")
+        )
+
+    def test_diff_sees_new_builds(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 2, 2)
+        publisher.publish(Build(machine="lighthouse", build_id="1"))
+        gbp = fixtures.gbp
+
+        with mock.patch.object(gbp, "diff", wraps=gbp.diff) as diff:
+            forward(fixtures.agent_socket, ["diff", "lighthouse"])
+            publisher.publish(Build(machine="lighthouse", build_id="2"))
+            lib.create_machine_builds("lighthouse", 1, 3)
+            forward(fixtures.agent_socket, ["diff", "lighthouse"])
+
+        self.assertEqual(
+            [call.args for call in diff.call_args_list],
+            [("lighthouse", 1, 2), ("lighthouse", 2, 3)],
+        )
+
+    def test_unexpected_exceptions(self, fixtures: Fixtures) -> None:
+        with (
+            mock.patch.object(
+                fixtures.gbp, "latest", side_effect=ValueError("boom")
+            ) as latest,
+            self.assertLogs("gbpcli.agent"),
+        ):
+            status, _, stderr = forward(fixtures.agent_socket, ["latest", "lighthouse"])
+
+        latest.assert_called_once_with("lighthouse")
+        self.assertEqual((status, stderr), (1, "boom\n"))
+
+    def test_commands_run_locally(self, fixtures: Fixtures) -> None:
+        for argv in [["notes", "lighthouse", "1"], ["agent"], ["--help"], ["bogus"]]:
+            with self.subTest(argv=argv):
+                status, stdout, stderr = forward(fixtures.agent_socket, argv)
+
+                self.assertEqual((status, stdout, stderr), (None, "", ""))
+
+    def test_no_agent(self, fixtures: Fixtures) -> None:
+        path = fixtures.agent_socket.parent / "bogus.sock"
+
+        self.assertEqual(forward(path, ["latest", "lighthouse"]), (None, "", ""))
+
+    def test_socket_is_private(self, fixtures: Fixtures) -> None:
+        self.assertEqual(fixtures.agent_socket.stat().st_mode & 0o777, 0o600)
+
+
+@given(testkit.gbpcli, testkit.tmpdir)
+class AgentSubcommandTests(TestCase):
+    def test_serves(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "agent.sock"
+
+        with mock.patch.object(agent, "serve") as serve:
+            status = fixtures.gbpcli(f"gbp agent --socket {path}")
+
+        self.assertEqual(status, 0)
+        serve.assert_called_once_with(path, mock.ANY)
+        runner = serve.call_args[0][1]
+        self.assertIs(runner.gbp(URL), fixtures.gbp)
+
+
+@given(testkit.gbpcli, agent_socket)
+class AgentSubcommandListeningTests(TestCase):
+    def test_already_listening(self, fixtures: Fixtures) -> None:
+        status = fixtures.gbpcli(f"gbp agent --socket {fixtures.agent_socket}")
+
+        self.assertEqual(status, 1)
+        self.assertEqual(
+            fixtures.console.stderr,
+            f"An agent is already listening on {fixtures.agent_socket}\n",
+        )
+
+
+@given(testkit.tmpdir, testkit.environ)
+class MainTests(TestCase):
+    def test_forwards_to_agent(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "agent.sock"
+        environ = {"GBPCLI_AGENT": "1", "GBPCLI_AGENT_SOCKET": str(path)}
+
+        with (
+            mock.patch.dict(os.environ, environ),
+            mock.patch.object(agent, "forward", return_value=0) as forward_,
+            mock.patch("gbpcli.gbp.GBP") as gbp,
+        ):
+            status = main(["latest", "lighthouse"])
+
+        self.assertEqual(status, 0)
+        forward_.assert_called_once_with(path, ["latest", "lighthouse"])
+        gbp.assert_not_called()
+
+
+class ExitStatusTests(TestCase):
+    def test(self) -> None:
+        for code, status, message in [
+            (None, 0, ""),
+            (3, 3, ""),
+            ("Not found", 1, "Not found\n"),
+        ]:
+            with self.subTest(code=code):
+                err = io.StringIO()
+
+                self.assertEqual(agent.exit_status(SystemExit(code), err), status)
+                self.assertEqual(err.getvalue(), message)
@@ -0,0 +1,109 @@
+"""Tests for the bundle module"""
+
+# pylint: disable=missing-docstring
+from importlib import metadata
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import TestCase, mock
+
+import gbp_testkit.fixtures as testkit
+from unittest_fixtures import Fixtures, given
+
+import gbpcli
+from gbpcli import bundle
+
+SRC = Path(gbpcli.__file__).parent
+
+
+class VersionTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        bundle.version.cache_clear()
+        self.addCleanup(bundle.version.cache_clear)
+
+    def test_from_bundle(self) -> None:
+        module = SimpleNamespace(VERSION="1.2.3", QUERIES={})
+
+        with mock.patch.object(bundle, "load", return_value=module):
+            self.assertEqual(bundle.version("gbpcli"), "1.2.3")
+
+    def test_without_bundle(self) -> None:
+        with mock.patch.object(bundle, "load", return_value=None):
+            self.assertEqual(bundle.version("gbpcli"), metadata.version("gbpcli"))
+
+
+class QueriesTests(TestCase):
+    def test_from_bundle(self) -> None:
+        module = SimpleNamespace(VERSION="1.2.3", QUERIES={"logs": "query { logs }"})
+
+        with mock.patch.object(bundle, "load", return_value=module):
+            self.assertEqual(bundle.queries("gbpcli"), {"logs": "query { logs }"})
+
+    def test_without_bundle(self) -> None:
+        with mock.patch.object(bundle, "load", return_value=None):
+            self.assertIsNone(bundle.queries("gbpcli"))
+
+
+class LoadTests(TestCase):
+    def test_package_without_bundle(self) -> None:
+        self.assertIsNone(bundle.load("json"))
+
+    def test_missing_package(self) -> None:
+        self.assertIsNone(bundle.load("bogus"))
+
+
+class RenderTests(TestCase):
+    def test(self) -> None:
+        queries = bundle.read_queries(SRC)
+        namespace: dict[str, object] = {}
+
+        exec(bundle.render("1.2.3", queries), namespace)  # pylint: disable=exec-used
+
+        self.assertEqual(namespace["VERSION"], "1.2.3")
+        self.assertEqual(namespace["QUERIES"], queries)
+        self.assertEqual(
+            queries["logs"], (SRC / "queries/logs.graphql").read_text(encoding="UTF-8")
+        )
+
+
+@given(testkit.tmpdir)
+class PDMBuildHookTests(TestCase):
+    def context(self, root: Path, target: str = "wheel") -> SimpleNamespace:
+        return SimpleNamespace(
+            root=root,
+            target=target,
+            build_dir=root / ".pdm-build",
+            config=SimpleNamespace(
+                build_config=SimpleNamespace(package_dir="src"),
+                metadata={"version": "1.2.3"},
+            ),
+        )
+
+    def test_writes_bundle_for_packages_with_queries(self, fixtures: Fixtures) -> None:
+        root = fixtures.tmpdir
+        package = root / "src/plugin"
+        (package / "queries").mkdir(parents=True)
+        (package / "__init__.py").write_text("", encoding="UTF-8")
+        (package / "queries/foo.graphql").write_text("query { foo }", encoding="UTF-8")
+        (root / "src/other").mkdir()
+        (root / "src/other/__init__.py").write_text("", encoding="UTF-8")
+        context = self.context(root)
+
+        bundle.pdm_build_initialize(context)
+
+        namespace: dict[str, object] = {}
+        source = (context.build_dir / "plugin/_bundle.py").read_text(encoding="UTF-8")
+        exec(source, namespace)  # pylint: disable=exec-used
+        self.assertEqual(namespace["VERSION"], "1.2.3")
+        self.assertEqual(namespace["QUERIES"], {"foo": "query { foo }"})
+        self.assertFalse((context.build_dir / "other").exists())
+
+    def test_enabled_for_wheels_only(self, fixtures: Fixtures) -> None:
+        for target, expected in [
+            ("wheel", True),
+            ("sdist", False),
+            ("editable", False),
+        ]:
+            with self.subTest(target=target):
+                context = self.context(fixtures.tmpdir, target)
+                self.assertEqual(bundle.pdm_build_hook_enabled(context), expected)
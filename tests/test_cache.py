@@ -0,0 +1,150 @@
+"""Tests for the cache module and the cache subcommand"""
+
+# pylint: disable=missing-docstring,unused-argument
+import os
+from unittest import TestCase, mock
+
+import gbp_testkit.fixtures as testkit
+from unittest_fixtures import Fixtures, given
+
+from gbpcli.cache import Cache
+
+from . import lib
+
+
+@given(testkit.tmpdir)
+class CacheTests(TestCase):
+    def test_get_and_set(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache")
+
+        self.assertIsNone(cache.get("test"))
+
+        cache.set("test", {"build": {"logs": "This is a test"}})
+
+        self.assertEqual(cache.get("test"), {"build": {"logs": "This is a test"}})
+
+    def test_does_not_create_directory_until_set(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache")
+
+        self.assertIsNone(cache.get("test"))
+        self.assertEqual(cache.stats().entries, 0)
+        self.assertFalse(cache.path.exists())
+
+    def test_directory_is_private(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache")
+
+        cache.set("test", "test")
+
+        self.assertEqual(cache.path.stat().st_mode & 0o777, 0o700)
+
+    def test_unusable_directory(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "cache"
+        path.write_text("not a directory", encoding="UTF-8")
+        cache = Cache(path)
+
+        cache.set("test", "test")
+
+        self.assertIsNone(cache.get("test"))
+
+    def test_entry_evicted_while_read(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache")
+        cache.set("test", "test")
+
+        with mock.patch.object(os, "utime", side_effect=FileNotFoundError):
+            self.assertEqual(cache.get("test"), "test")
+
+    def test_scans_only_when_over_max_size(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache", max_size=25)
+        cache.set("first", "x" * 8)
+
+        with mock.patch.object(cache, "evict", wraps=cache.evict) as evict:
+            cache.set("second", "x" * 8)
+            evict.assert_not_called()
+
+            cache.set("third", "x" * 8)
+            evict.assert_called_once_with()
+
+        self.assertIsNone(cache.get("first"))
+
+    def test_key(self, fixtures: Fixtures) -> None:
+        key = Cache.key("http://gbp.invalid/graphql", "query { foo }", {"a": 1})
+
+        self.assertEqual(
+            key, Cache.key("http://gbp.invalid/graphql", "query { foo }", {"a": 1})
+        )
+        self.assertNotEqual(
+            key, Cache.key("http://gbp2.invalid/graphql", "query { foo }", {"a": 1})
+        )
+        self.assertNotEqual(
+            key, Cache.key("http://gbp.invalid/graphql", "query { bar }", {"a": 1})
+        )
+        self.assertNotEqual(
+            key, Cache.key("http://gbp.invalid/graphql", "query { foo }", {"a": 2})
+        )
+
+    def test_evicts_least_recently_used(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache", max_size=25)
+        cache.set("first", "x" * 8)
+        cache.set("second", "x" * 8)
+        os.utime(cache.path / "second.json", (0, 0))
+
+        cache.set("third", "x" * 8)
+
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+        self.assertIsNotNone(cache.get("third"))
+
+    def test_stats(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache", max_size=1000)
+        cache.set("first", "test")
+        cache.set("second", "test")
+
+        stats = cache.stats()
+
+        self.assertEqual(stats.path, fixtures.tmpdir / "cache")
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual(stats.size, 12)
+        self.assertEqual(stats.max_size, 1000)
+
+    def test_clear(self, fixtures: Fixtures) -> None:
+        cache = Cache(fixtures.tmpdir / "cache")
+        cache.set("first", "test")
+        cache.set("second", "test")
+
+        self.assertEqual(cache.clear(), 2)
+        self.assertEqual(cache.stats().entries, 0)
+
+
+@given(testkit.gbpcli, lib.cache, lib.pulled_build)
+class CacheSubcommandTests(TestCase):
+    def test_stats(self, fixtures: Fixtures) -> None:
+        fixtures.cache.set("test", "test")
+
+        status = fixtures.gbpcli("gbp cache stats")
+
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            fixtures.console.stdout,
+            f"$ gbp cache stats\nPath: {fixtures.cache.path}\nEntries: 1\n"
+            "Size: 6/1048576 bytes\n",
+        )
+
+    def test_clear(self, fixtures: Fixtures) -> None:
+        fixtures.cache.set("test", "test")
+
+        status = fixtures.gbpcli("gbp cache clear")
+
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            fixtures.console.stdout, "$ gbp cache clear\nRemoved 1 entry\n"
+        )
+        self.assertEqual(fixtures.cache.stats().entries, 0)
+
+
+@given(testkit.gbpcli)
+class CacheSubcommandDisabledTests(TestCase):
+    def test(self, fixtures: Fixtures) -> None:
+        status = fixtures.gbpcli("gbp cache stats")
+
+        self.assertEqual(status, 1)
+        self.assertEqual(fixtures.console.stderr, "The cache is disabled\n")
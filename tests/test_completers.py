@@ -1,24 +1,19 @@
 """Tests for the completers module"""
 
-# pylint: disable=missing-docstring
+# pylint: disable=missing-docstring,unused-argument
 
 from argparse import Namespace
 from unittest import TestCase, mock
 
-from gbpcli import GBP
 from gbpcli.subcommands import completers
-from gbpcli.types import Build
 
 
-def patch_gbp(func):
-    return mock.patch("gbpcli.subcommands.completers.GBP", spec=GBP)(func)
-
-
-@patch_gbp
+@mock.patch(
+    "gbpcli.subcommands.completers.completion.machines",
+    return_value=["lighthouse", "babette"],
+)
 class MachinesTests(TestCase):
-    def test(self, mock_gbp) -> None:
-        gbp = mock_gbp.return_value
-        gbp.machines.return_value = [("lighthouse",), ("babette",)]
+    def test(self, machines) -> None:
         parsed_args = Namespace(url="http://gbp.invalid/")
         _ = mock.Mock()
 
@@ -26,10 +21,9 @@ class MachinesTests(TestCase):
             completers.machines(prefix="", action=_, parser=_, parsed_args=parsed_args),
             ["lighthouse", "babette"],
         )
+        machines.assert_called_once_with("http://gbp.invalid/")
 
-    def test_with_prefix(self, mock_gbp):
-        gbp = mock_gbp.return_value
-        gbp.machines.return_value = [("lighthouse",), ("babette",)]
+    def test_with_prefix(self, machines):
         parsed_args = Namespace(url="http://gbp.invalid/")
 
         self.assertEqual(
@@ -40,15 +34,12 @@ class MachinesTests(TestCase):
         )
 
 
-@patch_gbp
+@mock.patch(
+    "gbpcli.subcommands.completers.completion.build_numbers",
+    return_value=["1", "2", "12"],
+)
 class BuildIDsTests(TestCase):
-    def test(self, mock_gbp) -> None:
-        gbp = mock_gbp.return_value
-        gbp.builds.return_value = [
-            make_build("lighthouse", 1),
-            make_build("lighthouse", 2),
-            make_build("lighthouse", 12),
-        ]
+    def test(self, build_numbers) -> None:
         _ = mock.Mock()
 
         parsed_args = Namespace(url="http://gbp.invalid/", machine="lighthouse")
@@ -57,14 +48,9 @@ class BuildIDsTests(TestCase):
         )
 
         self.assertEqual(build_ids, ["1", "2", "12"])
+        build_numbers.assert_called_once_with("http://gbp.invalid/", "lighthouse")
 
-    def test_with_prefix(self, mock_gbp) -> None:
-        gbp = mock_gbp.return_value
-        gbp.builds.return_value = [
-            make_build("lighthouse", 1),
-            make_build("lighthouse", 2),
-            make_build("lighthouse", 12),
-        ]
+    def test_with_prefix(self, build_numbers) -> None:
         _ = mock.Mock()
 
         parsed_args = Namespace(url="http://gbp.invalid/", machine="lighthouse")
@@ -73,7 +59,3 @@ class BuildIDsTests(TestCase):
         )
 
         self.assertEqual(build_ids, ["1", "12"])
-
-
-def make_build(machine: str, number: int) -> Build:
-    return Build(machine=machine, number=number)
@@ -0,0 +1,159 @@
+"""Tests for the completion module"""
+
+# pylint: disable=missing-docstring,unused-argument
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from unittest import TestCase, mock
+
+import gbp_testkit.fixtures as testkit
+from unittest_fixtures import FixtureContext, Fixtures, fixture, given
+
+from gbpcli import completion
+
+from . import lib
+
+URL = "http://gbp.invalid/"
+
+
+@fixture(testkit.tmpdir)
+def cache_dir(fixtures: Fixtures) -> FixtureContext[mock.Mock]:
+    with mock.patch.object(
+        completion.platformdirs, "user_cache_dir", return_value=str(fixtures.tmpdir)
+    ) as mock_obj:
+        yield mock_obj
+
+
+@fixture(testkit.gbp)
+def get_gbp(fixtures: Fixtures) -> FixtureContext[mock.Mock]:
+    with mock.patch("gbpcli.get_gbp", return_value=fixtures.gbp) as mock_obj:
+        yield mock_obj
+
+
+def write_aged(path: Path, key: str, values: list[str], age: float) -> None:
+    """Write the cache entry as if written age seconds ago"""
+    completion.write(path, key, values)
+    entries = completion.read(path)
+    entries[key]["time"] = time.time() - age
+    path.write_text(json.dumps(entries), encoding="UTF-8")
+
+
+@given(testkit.environ, testkit.publisher, cache_dir, get_gbp)
+class GetTests(TestCase):
+    def test_fetches_and_caches_when_not_cached(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 3)
+
+        self.assertEqual(completion.machines(URL), ["lighthouse"])
+
+        entries = completion.read(completion.cache_path(URL))
+        self.assertEqual(entries["machines"]["values"], ["lighthouse"])
+
+    def test_uses_cached_values(self, fixtures: Fixtures) -> None:
+        completion.write(completion.cache_path(URL), "machines", ["babette"])
+
+        self.assertEqual(completion.machines(URL), ["babette"])
+        fixtures.get_gbp.assert_not_called()
+
+    def test_refreshes_stale_values_in_background(self, fixtures: Fixtures) -> None:
+        write_aged(completion.cache_path(URL), "machines", ["babette"], 120)
+
+        with mock.patch.object(completion.subprocess, "Popen") as popen:
+            self.assertEqual(completion.machines(URL), ["babette"])
+
+        fixtures.get_gbp.assert_not_called()
+        popen.assert_called_once_with(
+            [sys.executable, "-m", "gbpcli.completion", URL, "machines"],
+            env=mock.ANY,
+            stdin=mock.ANY,
+            stdout=mock.ANY,
+            stderr=mock.ANY,
+            start_new_session=True,
+        )
+        python_path = popen.call_args[1]["env"]["PYTHONPATH"].split(os.pathsep)
+        self.assertEqual(python_path, [path for path in sys.path if path])
+
+    def test_does_not_use_values_past_max_age(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 3)
+        path = completion.cache_path(URL)
+        write_aged(path, "machines", ["babette"], 7200)
+
+        with mock.patch.object(completion.subprocess, "Popen") as popen:
+            self.assertEqual(completion.machines(URL), ["lighthouse"])
+
+        popen.assert_not_called()
+        self.assertEqual(completion.read(path)["machines"]["values"], ["lighthouse"])
+
+    def test_build_numbers(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 12)
+
+        self.assertEqual(
+            completion.build_numbers(URL, "lighthouse"), ["10", "11", "12"]
+        )
+
+    def test_zero_ttl_bypasses_cache(self, fixtures: Fixtures) -> None:
+        fixtures.environ["GBPCLI_COMPLETION_TTL"] = "0"
+        lib.create_machine_builds("lighthouse", 3, 3)
+
+        self.assertEqual(completion.machines(URL), ["lighthouse"])
+        self.assertFalse(completion.cache_path(URL).exists())
+
+    def test_caches_per_server(self, fixtures: Fixtures) -> None:
+        self.assertNotEqual(
+            completion.cache_path(URL), completion.cache_path("http://other.invalid/")
+        )
+
+
+@given(testkit.environ, testkit.publisher, cache_dir, get_gbp)
+class FetchTests(TestCase):
+    def test_uses_user_config(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "gbpcli.toml"
+        path.write_bytes(b'[gbpcli]\nauth = { user = "test", api_key = "secret" }\n')
+        path.chmod(0o600)
+        fixtures.environ["GBPCLI_CONFIG"] = str(path)
+
+        completion.fetch(URL, "machines")
+
+        url, user_config = fixtures.get_gbp.call_args.args
+        self.assertEqual(url, URL)
+        self.assertEqual(user_config.auth, {"user": "test", "api_key": "secret"})
+
+    def test_invalid_key(self, fixtures: Fixtures) -> None:
+        with self.assertRaises(ValueError):
+            completion.fetch(URL, "bogus")
+
+    def test_refresh(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 2, 2)
+
+        completion.refresh(URL, "builds/lighthouse")
+
+        entries = completion.read(completion.cache_path(URL))
+        self.assertEqual(entries["builds/lighthouse"]["values"], ["1", "2"])
+
+
+@given(testkit.tmpdir)
+class ReadWriteTests(TestCase):
+    def test_read_missing_file(self, fixtures: Fixtures) -> None:
+        self.assertEqual(completion.read(fixtures.tmpdir / "missing.json"), {})
+
+    def test_read_invalid_file(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "invalid.json"
+        path.write_text("[]", encoding="UTF-8")
+
+        self.assertEqual(completion.read(path), {})
+
+    def test_write_keeps_other_keys(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "completion" / "cache.json"
+
+        completion.write(path, "machines", ["babette"])
+        completion.write(path, "builds/babette", ["1"])
+
+        entries = completion.read(path)
+        self.assertEqual(entries["machines"]["values"], ["babette"])
+        self.assertEqual(entries["builds/babette"]["values"], ["1"])
+
+    def test_write_error_is_ignored(self, fixtures: Fixtures) -> None:
+        (fixtures.tmpdir / "file").write_text("", encoding="UTF-8")
+
+        completion.write(fixtures.tmpdir / "file" / "cache.json", "machines", [])
@@ -0,0 +1,120 @@
+"""Tests for the cpv module"""
+
+# pylint: disable=missing-docstring
+from unittest import TestCase
+
+from gbpcli.cpv import Cpv, parse_version
+
+
+class ParseTests(TestCase):
+    def test(self) -> None:
+        cpv = Cpv.parse("sys-apps/acl-2.3.2-r2")
+
+        self.assertEqual(cpv.category, "sys-apps")
+        self.assertEqual(cpv.package, "acl")
+        self.assertEqual(cpv.version, "2.3.2")
+        self.assertEqual(cpv.revision, 2)
+        self.assertEqual(cpv.cp, "sys-apps/acl")
+        self.assertEqual(cpv.pvr, "2.3.2-r2")
+        self.assertEqual(str(cpv), "sys-apps/acl-2.3.2-r2")
+
+    def test_without_revision(self) -> None:
+        cpv = Cpv.parse("app-arch/libarchive-3.7.9")
+
+        self.assertEqual(cpv.revision, 0)
+        self.assertEqual(cpv.pvr, "3.7.9")
+
+    def test_package_name_with_hyphens_and_digits(self) -> None:
+        cpv = Cpv.parse("media-fonts/font-adobe-100dpi-1.0.4_p20240101-r1")
+
+        self.assertEqual(cpv.package, "font-adobe-100dpi")
+        self.assertEqual(cpv.version, "1.0.4_p20240101")
+        self.assertEqual(cpv.revision, 1)
+
+    def test_package_name_ending_in_digits(self) -> None:
+        cpv = Cpv.parse("dev-lang/python3-3.12.1")
+
+        self.assertEqual(cpv.package, "python3")
+
+    def test_invalid(self) -> None:
+        for value in [
+            "sys-apps/acl",
+            "acl-2.3.2",
+            "sys-apps/acl-two",
+            "sys-apps/acl-1-r",
+        ]:
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                Cpv.parse(value)
+
+    def test_is_cached_and_interned(self) -> None:
+        cpv = Cpv.parse("sys-apps/acl-2.3.2-r2")
+        other = Cpv.parse("sys-apps/acl-2.3.1")
+
+        self.assertIs(Cpv.parse("sys-apps/acl-2.3.2-r2"), cpv)
+        self.assertIs(cpv.category, other.category)
+        self.assertIs(cpv.package, other.package)
+
+
+class OrderingTests(TestCase):
+    def assert_ordered(self, *versions: str) -> None:
+        parsed = [parse_version(version) for version in versions]
+
+        for lesser, greater in zip(parsed, parsed[1:]):
+            self.assertLess(lesser, greater)
+            self.assertGreater(greater, lesser)
+
+    def test_numbers(self) -> None:
+        self.assert_ordered("1", "1.0", "1.2", "1.10", "2", "10")
+
+    def test_leading_zeros(self) -> None:
+        self.assert_ordered("1.01", "1.1")
+        self.assert_ordered("1.001", "1.01")
+        self.assertEqual(parse_version("1.010"), parse_version("1.01"))
+        self.assertEqual(hash(parse_version("1.010")), hash(parse_version("1.01")))
+
+    def test_letters(self) -> None:
+        self.assert_ordered("1.0", "1.0a", "1.0b", "1.1")
+
+    def test_suffixes(self) -> None:
+        self.assert_ordered(
+            "1.0_alpha",
+            "1.0_alpha2",
+            "1.0_beta",
+            "1.0_pre",
+            "1.0_rc1",
+            "1.0_rc1_p1",
+            "1.0",
+            "1.0_p1",
+            "1.0_p1_p1",
+            "1.0_p2",
+        )
+        self.assert_ordered("1.0_p1_alpha", "1.0_p1")
+
+    def test_cpvs(self) -> None:
+        cpvs = [
+            Cpv.parse(value)
+            for value in [
+                "sys-apps/acl-2.3.2-r2",
+                "app-arch/libarchive-3.7.9",
+                "sys-apps/acl-2.3.10",
+                "sys-apps/acl-2.3.2",
+            ]
+        ]
+
+        self.assertEqual(
+            [str(cpv) for cpv in sorted(cpvs)],
+            [
+                "app-arch/libarchive-3.7.9",
+                "sys-apps/acl-2.3.2",
+                "sys-apps/acl-2.3.2-r2",
+                "sys-apps/acl-2.3.10",
+            ],
+        )
+
+    def test_eq(self) -> None:
+        self.assertEqual(
+            Cpv.parse("sys-apps/acl-2.3-r0"), Cpv.parse("sys-apps/acl-2.3")
+        )
+        self.assertNotEqual(
+            Cpv.parse("sys-apps/acl-2.3"), Cpv.parse("dev-libs/acl-2.3")
+        )
@@ -3,24 +3,32 @@
 # pylint: disable=missing-function-docstring,protected-access,unused-argument
 import argparse
 import importlib
+import io
 import os.path
+import subprocess
 import sys
 import unittest
 from unittest import TestCase, mock
 
 import gbp_testkit.fixtures as testkit
+import requests
 from unittest_fixtures import Fixtures, given, where
 
 import gbpcli
 import gbpcli.subcommands.list as list_subcommand
-from gbpcli import build_parser, config, main
-from gbpcli.graphql import APIError, auth_encode
+from gbpcli import build_parser, bundle, config, main, snapshot
+from gbpcli.cache import DEFAULT_MAX_SIZE
+from gbpcli.graphql import APIError, DeadlineExceeded, auth_encode, current_deadline
+from gbpcli.settings import Settings
 from gbpcli.theme import get_theme_from_string
+from gbpcli.types import Build
 
 from . import lib
 
 SUBCOMMANDS = [
+    "agent",
     "build",
+    "cache",
     "diff",
     "inspect",
     "keep",
@@ -55,24 +63,70 @@ class GBPTests(unittest.TestCase):
 class BuildParserTestCase(unittest.TestCase):
     """build_parser() tests"""
 
-    @mock.patch("gbpcli.argparse.ArgumentParser.add_subparsers")
+    @mock.patch("argparse.ArgumentParser.add_subparsers")
     def test(self, add_subparsers_mock):
         parser = build_parser(config.Config())
 
         self.assertIsInstance(parser, argparse.ArgumentParser)
         subparsers = add_subparsers_mock.return_value
-        self.assertGreaterEqual(subparsers.add_parser.call_count, len(SUBCOMMANDS))
+        self.assertGreaterEqual(subparsers.add_subcommand.call_count, len(SUBCOMMANDS))
+        names = {i.args[0].name for i in subparsers.add_subcommand.call_args_list}
+        self.assertTrue(names.issuperset(SUBCOMMANDS))
 
         for subcommand in SUBCOMMANDS:
             with self.subTest(subcommand=subcommand):
                 module = importlib.import_module(f"gbpcli.subcommands.{subcommand}")
-                subparsers.add_parser.assert_any_call(
-                    subcommand,
-                    description=module.HELP,
-                    formatter_class=argparse.RawTextHelpFormatter,
+                self.assertIn(
+                    f"  * {subcommand} - {module.handler.__doc__}\n", parser.usage
                 )
-                subparser = subparsers.add_parser.return_value
-                subparser.set_defaults.assert_any_call(func=module.handler)
+
+    def test_loads_only_the_subcommand_used(self):
+        parser = build_parser(config.Config())
+        subparsers = parser._subparsers._group_actions[0]
+
+        self.assertTrue(set(subparsers.unloaded).issuperset(SUBCOMMANDS))
+
+        args = parser.parse_args(["list", "lighthouse"])
+
+        self.assertEqual(args.func, list_subcommand.handler)
+        self.assertNotIn("list", subparsers.unloaded)
+        self.assertIn("status", subparsers.unloaded)
+
+    def test_plugin_subcommand_loads_server_path(self):
+        parser = build_parser(config.Config())
+        subparsers = parser._subparsers._group_actions[0]
+        plugins = [i for i in subparsers.unloaded.values() if not i.builtin]
+
+        with mock.patch("gbpcli.utils.re_path") as re_path:
+            subparsers.load("list")
+            re_path.assert_not_called()
+
+            if plugins:
+                subparsers.load(plugins[0].name)
+                re_path.assert_called_once_with()
+
+    def test_help(self):
+        parser = build_parser(config.Config())
+
+        with (
+            mock.patch("sys.stdout", new_callable=io.StringIO) as stdout,
+            self.assertRaises(SystemExit),
+        ):
+            parser.parse_args(["status", "--help"])
+
+        self.assertIn("MACHINE", stdout.getvalue())
+
+    def test_version(self):
+        parser = build_parser(config.Config())
+
+        with (
+            mock.patch("sys.stdout", new_callable=io.StringIO) as stdout,
+            self.assertRaises(SystemExit) as context,
+        ):
+            parser.parse_args(["--version"])
+
+        self.assertEqual(context.exception.code, 0)
+        self.assertRegex(stdout.getvalue(), r"^gbpcli \S+\n$")
 
 
 class GetArgumentsTestCase(unittest.TestCase):
@@ -93,6 +147,9 @@ class GetArgumentsTestCase(unittest.TestCase):
         expected = argparse.Namespace(
             url="https://gbp.invalid/",
             color="auto",
+            format="auto",
+            deadline=None,
+            trace=False,
             my_machines="lighthouse polaris",
             machine="lighthouse",
             func=list_subcommand.handler,
@@ -110,6 +167,9 @@ class GetArgumentsTestCase(unittest.TestCase):
         expected = argparse.Namespace(
             url="https://gbp.invalid/",
             color="auto",
+            format="auto",
+            deadline=None,
+            trace=False,
             my_machines="lighthouse polaris",
             machine="lighthouse",
             func=list_subcommand.handler,
@@ -146,17 +206,40 @@ class GetConsoleTestCase(unittest.TestCase):
         self.assertEqual(violet.style.color.name, "blue")
 
 
+class IsPlainTests(TestCase):
+    """Tests for the is_plain function"""
+
+    def test_auto(self) -> None:
+        for color, tty, expected in [
+            ("auto", True, False),
+            ("auto", False, True),
+            ("never", False, True),
+            ("always", False, False),
+        ]:
+            with self.subTest(color=color, tty=tty):
+                args = argparse.Namespace(format="auto", color=color)
+                self.assertEqual(gbpcli.is_plain(args, tty), expected)
+
+    def test_format_given(self) -> None:
+        for fmt, expected in [("plain", True), ("rich", False)]:
+            with self.subTest(format=fmt):
+                args = argparse.Namespace(format=fmt, color="always")
+                self.assertEqual(gbpcli.is_plain(args, True), expected)
+
+
 @given(testkit.environ)
 @given(testkit.tmpdir, lib.user_config_dir, testkit.console, gbp=testkit.patch)
-@where(gbp__target="gbpcli.GBP")
+@where(gbp__target="gbpcli.gbp.GBP")
 class MainTestCase(TestCase):
     """tests for the main function"""
 
-    @mock.patch("gbpcli.argparse.ArgumentParser.parse_args")
-    @mock.patch("gbpcli.Console")
+    @mock.patch("argparse.ArgumentParser.parse_args")
+    @mock.patch("gbpcli.types.Console")
     def test(self, console_mock, parse_args_mock, fixtures: Fixtures):
         parse_args_mock.return_value.url = "http://test.invalid/"
         parse_args_mock.return_value.color = "auto"
+        parse_args_mock.return_value.deadline = None
+        parse_args_mock.return_value.trace = False
         func = parse_args_mock.return_value.func
         func.return_value = 0
         argv = ["status", "lighthouse"]
@@ -170,14 +253,14 @@ class MainTestCase(TestCase):
         self.assertEqual(status, 0)
 
     def test_should_print_help_when_no_func(self, fixtures: Fixtures):
-        with mock.patch("gbpcli.argparse.ArgumentParser.print_help") as print_help_mock:
+        with mock.patch("argparse.ArgumentParser.print_help") as print_help_mock:
             with self.assertRaises(SystemExit) as context:
                 main([])
 
         self.assertEqual(context.exception.args, (1,))
         print_help_mock.assert_called_once_with(file=sys.stderr)
 
-    @mock.patch("gbpcli.rich.console.Console")
+    @mock.patch("rich.console.Console")
     def test_should_print_to_stderr_and_exit_1_on_exception(
         self, console_mock, fixtures: Fixtures
     ):
@@ -185,18 +268,46 @@ class MainTestCase(TestCase):
         message = "blah"
 
         fixtures.gbp.return_value.get_build_info.side_effect = error
-        status = main(["status", "lighthouse"])
+        status = main(["--format=rich", "status", "lighthouse"])
         self.assertEqual(status, 1)
         console_mock.return_value.print.assert_called_once_with(message)
 
-    @mock.patch("gbpcli.argparse.ArgumentParser.parse_args")
-    @mock.patch("gbpcli.Console")
+    def test_plain_output_when_not_a_tty(self, fixtures: Fixtures) -> None:
+        fixtures.gbp.return_value.latest.return_value = Build(
+            machine="lighthouse", number=12
+        )
+        stdout = io.StringIO()
+
+        with (
+            mock.patch("sys.stdout", stdout),
+            mock.patch("rich.console.Console") as console_mock,
+        ):
+            status = main(["latest", "lighthouse"])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout.getvalue(), "12\n")
+        console_mock.assert_not_called()
+
+    def test_format_rich_when_not_a_tty(self, fixtures: Fixtures) -> None:
+        fixtures.gbp.return_value.latest.return_value = Build(
+            machine="lighthouse", number=12
+        )
+
+        with mock.patch("rich.console.Console") as console_mock:
+            main(["--format=rich", "latest", "lighthouse"])
+
+        console_mock.return_value.print.assert_called_once_with(12)
+
+    @mock.patch("argparse.ArgumentParser.parse_args")
+    @mock.patch("gbpcli.types.Console")
     def test_should_instantiate_gbp_with_api_key_when_available(
         self, _mock_console, mock_parse_args, fixtures: Fixtures
     ):
         fixtures.gbp.return_value = fixtures.gbp
         mock_parse_args.return_value.url = "http://test.invalid/"
         mock_parse_args.return_value.color = "auto"
+        mock_parse_args.return_value.deadline = None
+        mock_parse_args.return_value.trace = False
         func = mock_parse_args.return_value.func
         func.return_value = 0
 
@@ -209,10 +320,13 @@ class MainTestCase(TestCase):
         main(["status", "lighthouse"])
 
         fixtures.gbp.assert_called_once_with(
-            "http://test.invalid/", auth={"user": "test", "api_key": "secret"}
+            "http://test.invalid/",
+            auth={"user": "test", "api_key": "secret"},
+            cache=mock.ANY,
+            timeout=(10.0, 60.0),
         )
 
-    @mock.patch("gbpcli.Console")
+    @mock.patch("gbpcli.types.Console")
     def test_with_config_file_option(self, _mock_console, fixtures: Fixtures) -> None:
         fixtures.gbp.return_value = fixtures.gbp
         tmpdir = fixtures.tmpdir
@@ -224,7 +338,42 @@ class MainTestCase(TestCase):
         fixtures.environ["GBPCLI_CONFIG"] = filename
         main(["status", "lighthouse"])
 
-        fixtures.gbp.assert_called_once_with("http://fromconfig.invalid/", auth=None)
+        fixtures.gbp.assert_called_once_with(
+            "http://fromconfig.invalid/", auth=None, cache=mock.ANY, timeout=mock.ANY
+        )
+
+    def test_version(self, fixtures: Fixtures) -> None:
+        fixtures.environ["XDG_CACHE_HOME"] = str(fixtures.tmpdir)
+
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            status = main(["--version"])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout.getvalue(), f"gbpcli {bundle.version('gbpcli')}\n")
+
+        # The second time the saved response is given
+        with (
+            mock.patch("sys.stdout", new_callable=io.StringIO) as stdout,
+            mock.patch.object(gbpcli, "build_parser") as build_parser_mock,
+        ):
+            status = main(["--version"])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout.getvalue(), f"gbpcli {bundle.version('gbpcli')}\n")
+        build_parser_mock.assert_not_called()
+
+    def test_help(self, fixtures: Fixtures) -> None:
+        fixtures.environ["XDG_CACHE_HOME"] = str(fixtures.tmpdir)
+        fixtures.environ["COLUMNS"] = "80"
+
+        for _ in range(2):
+            with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+                status = main(["--help"])
+
+            self.assertEqual(status, 0)
+            self.assertEqual(
+                stdout.getvalue(), build_parser(config.Config()).format_help()
+            )
 
     def test_main_no_args(self, fixtures: Fixtures) -> None:
         # admittedly this is mostly to get a good screenshot
@@ -264,6 +413,22 @@ my_machines = ["this", "that", "the_other"]
         self.assertEqual(user_config.url, "http://test.invalid/")
         self.assertEqual(user_config.my_machines, ["this", "that", "the_other"])
 
+    def test_with_snapshot(self, fixtures: Fixtures) -> None:
+        filename = os.path.join(fixtures.tmpdir, "gbpcli.toml")
+
+        with open(filename, "wb") as fp:
+            fp.write(b'[gbpcli]\nurl = "http://test.invalid/"\n')
+
+        path = os.path.join(fixtures.tmpdir, "snapshot.bin")
+        with snapshot.enabled(path=path):
+            gbpcli.get_user_config()
+
+        with snapshot.enabled(path=path), mock.patch.object(config, "read") as read:
+            user_config = gbpcli.get_user_config()
+
+        read.assert_not_called()
+        self.assertEqual(user_config.url, "http://test.invalid/")
+
     def test_with_no_config(self, fixtures: Fixtures) -> None:
         user_config = gbpcli.get_user_config()
 
@@ -294,6 +459,192 @@ my_machines = ["this", "that", "the_other"]
             gbpcli.get_user_config(custom_filename)
 
 
+@given(testkit.tmpdir, cache_dir=testkit.patch)
+@where(cache_dir__target="platformdirs.user_cache_dir")
+class GetCacheTests(TestCase):
+    """Tests for the get_cache function"""
+
+    def test_default(self, fixtures: Fixtures) -> None:
+        fixtures.cache_dir.return_value = str(fixtures.tmpdir)
+
+        cache = gbpcli.get_cache(config.Config())
+
+        assert cache is not None
+        self.assertEqual(cache.path, fixtures.tmpdir / "responses-cache")
+        self.assertEqual(cache.max_size, DEFAULT_MAX_SIZE)
+        fixtures.cache_dir.assert_called_once_with("gbpcli")
+
+    def test_other_cached_files_are_not_entries(self, fixtures: Fixtures) -> None:
+        fixtures.cache_dir.return_value = str(fixtures.tmpdir)
+        other = fixtures.tmpdir / "subcommands.json"
+        other.write_text("{}", encoding="UTF-8")
+
+        cache = gbpcli.get_cache(config.Config())
+        assert cache is not None
+        cache.set("test", "test")
+
+        self.assertEqual(cache.stats().entries, 1)
+        self.assertEqual(cache.clear(), 1)
+        self.assertTrue(other.exists())
+
+    def test_with_cache_size(self, fixtures: Fixtures) -> None:
+        cache = gbpcli.get_cache(config.Config(cache_size=1024))
+
+        assert cache is not None
+        self.assertEqual(cache.max_size, 1024)
+
+    def test_disabled(self, fixtures: Fixtures) -> None:
+        cache = gbpcli.get_cache(config.Config(cache_size=0))
+
+        self.assertIsNone(cache)
+
+
+class GetTimeoutTests(TestCase):
+    """Tests for the get_timeout function"""
+
+    def test_from_settings(self) -> None:
+        settings = Settings(CONNECT_TIMEOUT=1.0, READ_TIMEOUT=2.0)
+
+        self.assertEqual(gbpcli.get_timeout(config.Config(), settings), (1.0, 2.0))
+
+    def test_config_takes_precedence(self) -> None:
+        settings = Settings(CONNECT_TIMEOUT=1.0, READ_TIMEOUT=2.0)
+        user_config = config.Config(read_timeout=30.0)
+
+        self.assertEqual(gbpcli.get_timeout(user_config, settings), (1.0, 30.0))
+
+
+@given(testkit.console)
+class RunSubcommandTests(TestCase):
+    """Tests for the run_subcommand function"""
+
+    def test_deadline_exceeded(self, fixtures: Fixtures) -> None:
+        def func(args, gbp, console):
+            self.assertIsNotNone(current_deadline.get())
+            raise DeadlineExceeded("Deadline exceeded")
+
+        args = argparse.Namespace(func=func, deadline=5.0)
+
+        status = gbpcli.run_subcommand(args, mock.Mock(), fixtures.console)
+
+        self.assertEqual(status, gbpcli.DEADLINE_EXIT_STATUS)
+        self.assertEqual(fixtures.console.stderr, "Deadline exceeded\n")
+
+    def test_timeout(self, fixtures: Fixtures) -> None:
+        func = mock.Mock(side_effect=requests.ReadTimeout("Read timed out"))
+        args = argparse.Namespace(func=func, deadline=None)
+
+        status = gbpcli.run_subcommand(args, mock.Mock(), fixtures.console)
+
+        self.assertEqual(status, 1)
+        self.assertEqual(fixtures.console.stderr, "Read timed out\n")
+
+    def test_no_deadline(self, fixtures: Fixtures) -> None:
+        def func(args, gbp, console):
+            self.assertIsNone(current_deadline.get())
+            return 0
+
+        args = argparse.Namespace(func=func, deadline=None)
+
+        self.assertEqual(gbpcli.run_subcommand(args, mock.Mock(), fixtures.console), 0)
+
+
+@given(testkit.tmpdir, lib.user_config_dir, testkit.environ)
+class CompleteTests(TestCase):
+    """Tests for the complete function"""
+
+    def complete(self, environ: dict[str, str], line: str) -> str:
+        environ.update(
+            {"_ARGCOMPLETE": "1", "COMP_LINE": line, "COMP_POINT": str(len(line))}
+        )
+        output = io.StringIO()
+
+        with self.assertRaises(SystemExit):
+            gbpcli.complete(output, exit_method=sys.exit)
+
+        return output.getvalue()
+
+    def test_subcommand_options(self, fixtures: Fixtures) -> None:
+        completions = self.complete(fixtures.environ, "gbp --url http://x logs --se")
+
+        self.assertEqual(completions, "--search ")
+
+    def test_loads_only_the_subcommand_completed(self, fixtures: Fixtures) -> None:
+        with mock.patch.object(gbpcli.LazySubParsersAction, "load") as load:
+            self.complete(fixtures.environ, "gbp --color never logs --se")
+
+        self.assertEqual(load.call_args_list[0], mock.call("logs"))
+        self.assertEqual({i.args for i in load.call_args_list}, {("logs",)})
+
+    def test_subcommands(self, fixtures: Fixtures) -> None:
+        with mock.patch.object(gbpcli.LazySubParsersAction, "load") as load:
+            completions = self.complete(fixtures.environ, "gbp la")
+
+        self.assertEqual(completions, "latest ")
+        load.assert_not_called()
+
+    def test_subcommands_load_without_client_or_rich(self, fixtures: Fixtures) -> None:
+        # A fresh interpreter, as sys.modules here already has everything
+        code = (
+            "import sys\n"
+            f"for name in {SUBCOMMANDS!r}:\n"
+            "    __import__(f'gbpcli.subcommands.{name}')\n"
+            "print(*sorted(sys.modules))\n"
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            text=True,
+        )
+        modules = process.stdout.split()
+
+        self.assertNotIn("gbpcli.gbp", modules)
+        self.assertNotIn("importlib.metadata", modules)
+        self.assertEqual([i for i in modules if i.partition(".")[0] == "rich"], [])
+
+    def test_main(self, fixtures: Fixtures) -> None:
+        fixtures.environ["_ARGCOMPLETE"] = "1"
+
+        with mock.patch.object(gbpcli, "complete", side_effect=SystemExit) as complete:
+            with self.assertRaises(SystemExit):
+                main(["status"])
+
+        complete.assert_called_once_with()
+
+
+class FindSubcommandTests(TestCase):
+    """Tests for the find_subcommand function"""
+
+    def test(self) -> None:
+        parser = build_parser(config.Config())
+        tests = [
+            (["logs", "lighthouse"], "logs"),
+            (["--url", "http://gbp.invalid/", "logs"], "logs"),
+            (["--url=http://gbp.invalid/", "--trace", "logs"], "logs"),
+            (["--color", "never"], None),
+            (["bogus", "logs"], None),
+            ([], None),
+        ]
+
+        for words, expected in tests:
+            with self.subTest(words=words):
+                self.assertEqual(gbpcli.find_subcommand(parser, words), expected)
+
+
+class CompletionWordsTests(TestCase):
+    """Tests for the completion_words function"""
+
+    def test(self) -> None:
+        self.assertEqual(
+            gbpcli.completion_words("gbp logs 'light house'"), ["logs", "light house"]
+        )
+
+    def test_unterminated_quote(self) -> None:
+        self.assertEqual(gbpcli.completion_words('gbp logs "light'), ["logs", '"light'])
+
+
 class EnsureArgsHasFuncTests(TestCase):
     """Tests for the ensure_args_has_func helper function"""
 
@@ -1,14 +1,22 @@
 """Tests for the GBP interface"""
 
-# pylint: disable=missing-docstring,protected-access
-from unittest import TestCase
+# pylint: disable=missing-docstring,protected-access,unused-argument
+import asyncio
+import os
+import subprocess
+import sys
+from unittest import TestCase, mock
 
 import gbp_testkit.fixtures as testkit
 import requests.exceptions
 from unittest_fixtures import Fixtures, fixture, given, where
 
 from gbpcli import build_parser, config
-from gbpcli.gbp import GBP
+from gbpcli.gbp import GBP, AsyncGBP, is_completed
+from gbpcli.settings import Settings
+from gbpcli.types import Build, BuildCollection
+
+from . import lib
 
 
 class GGPTestCase(TestCase):
@@ -17,6 +25,18 @@ class GGPTestCase(TestCase):
 
         self.assertEqual(gbp.query._url, "http://gbp.invalid/graphql")
 
+    def test_import_does_not_import_asyncio(self) -> None:
+        # A fresh interpreter, as sys.modules here already has asyncio
+        process = subprocess.run(
+            [sys.executable, "-c", "import sys, gbpcli.gbp; print(*sys.modules)"],
+            capture_output=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            text=True,
+        )
+
+        self.assertNotIn("asyncio", process.stdout.split())
+
 
 @given(post=testkit.patch)
 @where(post__target="requests.Session.post")
@@ -65,3 +85,196 @@ class BuildParserTestCase(TestCase):
         args = parser_.parse_args(argv)
 
         self.assertEqual(args.my_machines, "this that the other")
+
+
+@given(testkit.gbp, testkit.publisher)
+class GBPBuildNumbersTestCase(TestCase):
+    def test(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("lighthouse", 3, 12)
+        lib.create_machine_builds("babette", 2, 2)
+
+        self.assertEqual(fixtures.gbp.build_numbers("lighthouse"), [12, 11, 10])
+
+    def test_no_builds(self, fixtures: Fixtures) -> None:
+        self.assertEqual(fixtures.gbp.build_numbers("lighthouse"), [])
+
+
+@given(testkit.gbp, testkit.publisher)
+class GBPBatchTestCase(TestCase):
+    def test_builds(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("babette", 3, 3)
+
+        builds = fixtures.gbp.builds("babette", with_packages=True)
+
+        self.assertIsInstance(builds, BuildCollection)
+        self.assertEqual(
+            builds,
+            list(reversed([*fixtures.gbp.iter_builds("babette", with_packages=True)])),
+        )
+
+    def test_iter_builds(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("babette", 3, 3)
+
+        builds = fixtures.gbp.iter_builds("babette", with_packages=True)
+
+        self.assertEqual(
+            [build.id for build in builds], ["babette.3", "babette.2", "babette.1"]
+        )
+
+    def test_logs_batch(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("babette", 2, 2)
+        builds = [Build(machine="babette", number=i) for i in (1, 2, 3)]
+
+        result = fixtures.gbp.logs_batch(builds)
+
+        self.assertEqual(len(result), 3)
+        self.assertIsNotNone(result[0])
+        self.assertIsNotNone(result[1])
+        self.assertIsNone(result[2])
+
+    def test_get_build_info_batch(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("babette", 2, 2)
+        builds = [Build(machine="babette", number=i) for i in (2, 3)]
+
+        result = fixtures.gbp.get_build_info_batch(builds)
+
+        assert result[0] is not None
+        self.assertEqual(result[0].id, "babette.2")
+        self.assertIsNotNone(result[0].info)
+        self.assertIsNone(result[1])
+
+
+@given(testkit.publisher, lib.pulled_build)
+@where(pulled_build__logs="This is a build log")
+class GBPPersistedQueriesTestCase(TestCase):
+    def test_uses_persisted_queries(self, fixtures: Fixtures):
+        gbp = GBP("http://gbp.invalid/", settings=Settings(PERSISTED_QUERIES=True))
+        server = lib.APQServer()
+        record = fixtures.pulled_build
+        build = Build(machine=record.machine, number=int(record.build_id))
+
+        with mock.patch.object(gbp.query._session, "post", server):
+            gbp.logs(build)
+            logs = gbp.logs(build)
+
+        self.assertEqual(logs, "This is a build log")
+        self.assertEqual(len(server.queries), 1)
+        self.assertEqual([len(payload) for payload in server.payloads], [2, 3, 2])
+
+    def test_builds_sends_only_hash_once_registered(self, fixtures: Fixtures):
+        gbp = GBP("http://gbp.invalid/", settings=Settings(PERSISTED_QUERIES=True))
+        server = lib.APQServer()
+        record = fixtures.pulled_build
+
+        with mock.patch.object(gbp.query._session, "post", server):
+            gbp.builds(record.machine)
+            builds = gbp.builds(record.machine)
+
+        self.assertEqual([build.number for build in builds], [int(record.build_id)])
+        self.assertEqual(len(server.queries), 1)
+        self.assertNotIn("query", server.payloads[-1])
+        self.assertEqual([len(payload) for payload in server.payloads], [2, 3, 2])
+
+
+@given(testkit.gbp, lib.pulled_build)
+class AsyncGBPTestCase(TestCase):
+    def test_has_same_methods_as_gbp(self, fixtures: Fixtures) -> None:
+        public = {name for name in dir(GBP) if not name.startswith("_")}
+
+        self.assertTrue(public <= set(dir(AsyncGBP)))
+
+    def test_builds(self, fixtures: Fixtures) -> None:
+        lib.create_machine_builds("babette", 3, 3)
+
+        builds = fixtures.gbp.builds("babette", with_packages=True)
+
+        self.assertIsInstance(builds, BuildCollection)
+        self.assertEqual(
+            builds,
+            list(reversed([*fixtures.gbp.iter_builds("babette", with_packages=True)])),
+        )
+
+    def test_iter_builds(self, fixtures: Fixtures) -> None:
+        gbp = AsyncGBP("http://gbp.invalid/")
+        gbp.gbp = fixtures.gbp
+        record = fixtures.pulled_build
+
+        async def get_builds():
+            return [build.id async for build in gbp.iter_builds(record.machine)]
+
+        self.assertEqual(asyncio.run(get_builds()), [record.id])
+
+    def test_gathers_queries(self, fixtures: Fixtures) -> None:
+        gbp = AsyncGBP("http://gbp.invalid/", max_concurrency=2)
+        gbp.gbp = fixtures.gbp
+        build = fixtures.pulled_build
+        builds = [Build(machine=build.machine, number=int(build.build_id))] * 4
+
+        async def get_infos():
+            return await asyncio.gather(*(gbp.get_build_info(b) for b in builds))
+
+        infos = asyncio.run(get_infos())
+
+        self.assertEqual(len(infos), 4)
+        self.assertEqual({info.id for info in infos}, {build.id})
+
+    def test_sets_connection_pool_size(self, fixtures: Fixtures) -> None:
+        gbp = AsyncGBP("http://gbp.invalid/", max_concurrency=32)
+
+        adapter = gbp.gbp.query._session.get_adapter("http://gbp.invalid/graphql")
+
+        self.assertEqual(adapter._pool_maxsize, 32)
+
+
+@given(testkit.gbp, lib.cache, lib.pulled_build)
+@where(pulled_build__logs="This is a test")
+class GBPCacheTestCase(TestCase):
+    def test_logs_of_completed_build_are_cached(self, fixtures: Fixtures) -> None:
+        record = fixtures.pulled_build
+        build = Build(machine=record.machine, number=int(record.build_id))
+
+        self.assertEqual(fixtures.gbp.logs(build), "This is a test")
+        self.assertEqual(fixtures.cache.stats().entries, 1)
+
+        with mock.patch.object(fixtures.gbp.query._session, "post") as post:
+            self.assertEqual(fixtures.gbp.logs(build), "This is a test")
+            self.assertEqual(fixtures.gbp.logs_batch([build]), ["This is a test"])
+
+        post.assert_not_called()
+
+    def test_logs_batch_caches_logs(self, fixtures: Fixtures) -> None:
+        record = fixtures.pulled_build
+        build = Build(machine=record.machine, number=int(record.build_id))
+
+        fixtures.gbp.logs_batch([build, Build(machine="bogus", number=1)])
+
+        self.assertEqual(fixtures.cache.stats().entries, 1)
+
+    def test_missing_builds_are_not_cached(self, fixtures: Fixtures) -> None:
+        fixtures.gbp.logs(Build(machine="bogus", number=1))
+
+        self.assertEqual(fixtures.cache.stats().entries, 0)
+
+    def test_packages_are_cached(self, fixtures: Fixtures) -> None:
+        record = fixtures.pulled_build
+        build = Build(machine=record.machine, number=int(record.build_id))
+
+        packages = fixtures.gbp.packages(build)
+
+        self.assertEqual(fixtures.cache.stats().entries, 1)
+        self.assertEqual(fixtures.gbp.packages(build), packages)
+
+
+class IsCompletedTests(TestCase):
+    def test_completed(self) -> None:
+        data = {"build": {"completed": "2025-04-08T07:10:00+00:00", "logs": "test"}}
+
+        self.assertTrue(is_completed(data))
+
+    def test_not_completed(self) -> None:
+        data = {"diff": {"left": {"completed": "2025"}, "right": {"completed": None}}}
+
+        self.assertFalse(is_completed(data))
+
+    def test_no_builds(self) -> None:
+        self.assertFalse(is_completed({"build": None}))
@@ -1,12 +1,22 @@
 """Tests for the graphql module"""
 
-# pylint: disable=missing-docstring
+# pylint: disable=missing-docstring,unused-argument
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
 from unittest import TestCase, mock
 
+import gbp_testkit.fixtures as testkit
 import requests
+import urllib3.util.request
+from unittest_fixtures import Fixtures, given
 from yarl import URL
 
-from gbpcli import graphql
+from gbpcli import graphql, snapshot, trace
+from gbpcli.settings import Settings
 
 from . import lib
 
@@ -14,6 +24,7 @@ from . import lib
 class QueryTestCase(TestCase):
     def test_passes_given_query_and_vars_to_graphql_request(self):
         session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(json={"data": {"bar": 1}})
         query = graphql.Query("query foo { bar }", "https://gbp.invalid", session)
         variables = {"name": "value"}
 
@@ -42,6 +53,532 @@ class QueryTestCase(TestCase):
 
         self.assertEqual(response, ({"foo": "bar"}, [{"this": "that"}]))
 
+    def test_with_timeout(self):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(json={"data": {"bar": 1}})
+        query = graphql.Query("query foo { bar }", "https://gbp.invalid", session)
+
+        query.with_timeout((1.0, 120.0))()
+        query()
+
+        self.assertEqual(session.post.call_args_list[0][1]["timeout"], (1.0, 120.0))
+        self.assertNotIn("timeout", session.post.call_args_list[1][1])
+
+    def test_traced(self):
+        session = mock.Mock(spec=requests.Session)
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, name="foo"
+        )
+        session.post.return_value = lib.http_response(json={"data": {"bar": 1}})
+
+        with trace.Tracer() as tracer:
+            query(x=1)
+
+        self.assertEqual(
+            [(s.kind, s.name, s.depth) for s in tracer.spans],
+            [
+                ("query", "foo", 0),
+                ("request", "POST", 1),
+                ("read", "response", 1),
+                ("decode", "JSON", 1),
+            ],
+        )
+        self.assertEqual(tracer.spans[0].details, {"variables": {"x": 1}})
+        self.assertEqual(tracer.spans[2].details["size"], 20)
+
+    def test_stream(self):
+        session = mock.Mock(spec=requests.Session)
+        query = graphql.Query("query foo { bars }", "https://gbp.invalid", session)
+        session.post.return_value = lib.http_response(json={"data": {"bars": [1, 2]}})
+
+        items = query.stream("bars")
+
+        self.assertEqual(list(items), [1, 2])
+
+    def test_stream_raises_errors_after_items(self):
+        session = mock.Mock(spec=requests.Session)
+        query = graphql.Query("query foo { bars }", "https://gbp.invalid", session)
+        data_and_errors = {"data": {"bars": [1]}, "errors": [{"this": "that"}]}
+        session.post.return_value = lib.http_response(json=data_and_errors)
+        items = query.stream("bars")
+
+        self.assertEqual(next(items), 1)
+
+        with self.assertRaises(graphql.APIError) as context:
+            next(items)
+
+        self.assertEqual(context.exception.args, ([{"this": "that"}],))
+
+
+class QueryCompressionTestCase(TestCase):
+    def test_compresses_large_request_bodies(self):
+        session = mock.Mock(spec=requests.Session)
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, compress_min_size=100
+        )
+        session.post.return_value = lib.http_response(json={"data": {"bar": 1}})
+
+        with self.assertLogs("gbpcli.graphql", "DEBUG") as logs:
+            query(name="x" * 100)
+
+        session.post.assert_called_once_with(
+            "https://gbp.invalid",
+            data=mock.ANY,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        body = json.loads(gzip.decompress(session.post.call_args[1]["data"]))
+        self.assertEqual(
+            body, {"query": "query foo { bar }", "variables": {"name": "x" * 100}}
+        )
+        self.assertRegex(
+            logs.output[0], r"bar: compressed request from 157 to \d+ bytes"
+        )
+
+    def test_does_not_compress_small_request_bodies(self):
+        session = mock.Mock(spec=requests.Session)
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, compress_min_size=100
+        )
+        session.post.return_value = lib.http_response(json={"data": {"bar": 1}})
+
+        query(name="x")
+
+        session.post.assert_called_once_with(
+            "https://gbp.invalid",
+            json={"query": "query foo { bar }", "variables": {"name": "x"}},
+        )
+
+    def test_logs_response_sizes(self):
+        session = mock.Mock(spec=requests.Session)
+        query = graphql.Query("query foo { bar }", "https://gbp.invalid", session)
+        response = lib.http_response(json={"data": {"bar": 1}})
+        response.raw = io.BytesIO(response.content)
+        response.raw.read()
+        response.headers["Content-Encoding"] = "br"
+        session.post.return_value = response
+
+        with self.assertLogs("gbpcli.graphql", "DEBUG") as logs:
+            query()
+
+        self.assertRegex(
+            logs.output[0],
+            r"bar: received 20 bytes \(br\), 20 bytes decompressed. "
+            r"Read in [\d.]+ms, JSON decoded in [\d.]+ms",
+        )
+
+
+@mock.patch("gbpcli.graphql.time.sleep")
+class QueryRetryTestCase(TestCase):
+    retry = graphql.RetryPolicy(retries=2, backoff=0.5)
+
+    def test_retries_transient_errors(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.side_effect = [
+            lib.http_response(status_code=503),
+            requests.exceptions.ConnectionError(),
+            lib.http_response(json={"data": {"foo": "bar"}}),
+        ]
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, retry=self.retry
+        )
+
+        with self.assertLogs("gbpcli.graphql", "DEBUG") as logs:
+            response = query()
+
+        self.assertEqual(response, ({"foo": "bar"}, {}))
+        self.assertEqual(session.post.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertIn("retry 1/2", logs.output[0])
+        self.assertIn("retry 2/2", logs.output[1])
+        self.assertIn("Succeeded after 2 retries", logs.output[2])
+
+    def test_gives_up_after_retries(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(status_code=502)
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, retry=self.retry
+        )
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            query()
+
+        self.assertEqual(session.post.call_count, 3)
+
+    def test_does_not_retry_mutations(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(status_code=503)
+        query = graphql.Query(
+            "mutation { foo }", "https://gbp.invalid", session, retry=self.retry
+        )
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            query()
+
+        session.post.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_does_not_retry_non_transient_errors(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(status_code=400)
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, retry=self.retry
+        )
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            query()
+
+        session.post.assert_called_once()
+
+    def test_circuit_breaker_fails_fast(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.side_effect = requests.exceptions.ConnectionError()
+        breaker = graphql.CircuitBreaker(threshold=3, cooldown=30)
+        query = graphql.Query(
+            "query foo { bar }",
+            "https://gbp.invalid",
+            session,
+            retry=self.retry,
+            breaker=breaker,
+        )
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            query()
+        self.assertEqual(session.post.call_count, 3)
+
+        with self.assertRaises(graphql.CircuitOpenError):
+            query()
+        self.assertEqual(session.post.call_count, 3)
+
+    def test_circuit_breaker_closes_after_cooldown(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(json={"data": {"foo": "bar"}})
+        breaker = graphql.CircuitBreaker(threshold=1, cooldown=30)
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, breaker=breaker
+        )
+
+        with mock.patch("gbpcli.graphql.time.monotonic", return_value=1000.0):
+            breaker.record_failure()
+            with self.assertRaises(graphql.CircuitOpenError):
+                query()
+
+        with mock.patch("gbpcli.graphql.time.monotonic", return_value=1031.0):
+            self.assertEqual(query(), ({"foo": "bar"}, {}))
+
+        self.assertIsNone(breaker.opened_at)
+        self.assertEqual(breaker.failures, 0)
+
+
+@given(testkit.publisher)
+class PersistedQueryTestCase(TestCase):
+    def query(self, server: lib.APQServer) -> graphql.Query:
+        session = mock.Mock(spec=requests.Session)
+        session.post = server
+
+        return graphql.Query(
+            "query { machines { machine } }",
+            "https://gbp.invalid",
+            session,
+            persisted=graphql.PersistedQueries(),
+        )
+
+    def test_registers_query_when_not_found(self, fixtures: Fixtures):
+        lib.create_machine_builds("babette", 1, 1)
+        server = lib.APQServer()
+        query = self.query(server)
+
+        response = query()
+
+        self.assertEqual(response, ({"machines": [{"machine": "babette"}]}, {}))
+        self.assertEqual(len(server.payloads), 2)
+        self.assertNotIn("query", server.payloads[0])
+        self.assertEqual(
+            server.payloads[0]["extensions"]["persistedQuery"]["sha256Hash"],
+            query.sha256,
+        )
+        self.assertEqual(server.payloads[1]["query"], query.query)
+
+    def test_sends_only_hash_once_registered(self, fixtures: Fixtures):
+        lib.create_machine_builds("babette", 1, 1)
+        server = lib.APQServer()
+        query = self.query(server)
+        query()
+
+        response = query()
+
+        self.assertEqual(response, ({"machines": [{"machine": "babette"}]}, {}))
+        self.assertEqual(len(server.payloads), 3)
+        self.assertNotIn("query", server.payloads[2])
+
+    def test_disables_when_server_does_not_support(self, fixtures: Fixtures):
+        session = mock.Mock(spec=requests.Session)
+        session.post.side_effect = [
+            lib.http_response(
+                status_code=400,
+                json={"errors": [{"message": "PersistedQueryNotSupported"}]},
+            ),
+            lib.http_response(json={"data": {"foo": "bar"}}),
+        ]
+        persisted = graphql.PersistedQueries()
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, persisted=persisted
+        )
+
+        response = query()
+
+        self.assertEqual(response, ({"foo": "bar"}, {}))
+        self.assertFalse(persisted.enabled)
+        self.assertEqual(
+            session.post.call_args[1]["json"],
+            {"query": "query foo { bar }", "variables": {}},
+        )
+
+    def test_stream_registers_query_when_not_found(self, fixtures: Fixtures):
+        lib.create_machine_builds("babette", 1, 1)
+        server = lib.APQServer()
+        query = self.query(server)
+
+        machines = list(query.stream("machines"))
+
+        self.assertEqual(machines, [{"machine": "babette"}])
+        self.assertEqual(len(server.payloads), 2)
+        self.assertNotIn("query", server.payloads[0])
+        self.assertEqual(server.payloads[1]["query"], query.query)
+
+    def test_stream_disables_when_server_does_not_support(self, fixtures: Fixtures):
+        session = mock.Mock(spec=requests.Session)
+        session.post.side_effect = [
+            lib.http_response(
+                status_code=400,
+                json={"errors": [{"message": "PersistedQueryNotSupported"}]},
+            ),
+            lib.http_response(json={"data": {"bars": [1, 2]}}),
+        ]
+        persisted = graphql.PersistedQueries()
+        query = graphql.Query(
+            "query foo { bars }", "https://gbp.invalid", session, persisted=persisted
+        )
+
+        self.assertEqual(list(query.stream("bars")), [1, 2])
+        self.assertFalse(persisted.enabled)
+        self.assertEqual(
+            session.post.call_args[1]["json"],
+            {"query": "query foo { bars }", "variables": {}},
+        )
+
+    def test_reraises_other_http_errors(self, fixtures: Fixtures):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(
+            status_code=400, json={"errors": [{"message": "Bad request"}]}
+        )
+        persisted = graphql.PersistedQueries()
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, persisted=persisted
+        )
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            query()
+
+        session.post.assert_called_once()
+        self.assertTrue(persisted.enabled)
+
+    def test_batches_are_not_persisted(self, fixtures: Fixtures):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = lib.http_response(json={"data": {"q0_bar": 1}})
+        batch = graphql.Batch(
+            "https://gbp.invalid", session, persisted=graphql.PersistedQueries()
+        )
+        item = batch.add(
+            graphql.Query("query foo { bar }", "https://gbp.invalid", session)
+        )
+
+        batch.send()
+
+        session.post.assert_called_once()
+        self.assertNotIn("extensions", session.post.call_args[1]["json"])
+        self.assertEqual(item.result(), ({"bar": 1}, {}))
+
+    def test_disabled_by_default(self, fixtures: Fixtures):
+        queries = graphql.Queries(URL("https://gbp.invalid"), settings=Settings())
+
+        self.assertFalse(queries.gbpcli.logs.persisted.enabled)
+
+
+@mock.patch("gbpcli.graphql.time.sleep")
+class DeadlineTestCase(TestCase):
+    retry = graphql.RetryPolicy(retries=2, backoff=4.0)
+
+    def test_does_not_send_after_deadline(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        query = graphql.Query("query foo { bar }", "https://gbp.invalid", session)
+
+        with self.assertRaises(graphql.DeadlineExceeded), graphql.Deadline(0):
+            query()
+
+        session.post.assert_not_called()
+
+    def test_does_not_retry_past_deadline(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.side_effect = requests.exceptions.ConnectionError()
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, retry=self.retry
+        )
+
+        with self.assertRaises(graphql.DeadlineExceeded) as context:
+            with graphql.Deadline(1):
+                query()
+
+        self.assertIs(context.exception.__cause__, session.post.side_effect)
+        session.post.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_timeout_at_deadline(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        error = requests.exceptions.ReadTimeout()
+
+        def post(*args, **kwargs):
+            time.sleep(0.01)
+            raise error
+
+        session.post.side_effect = post
+        query = graphql.Query(
+            "query foo { bar }", "https://gbp.invalid", session, retry=self.retry
+        )
+
+        with self.assertRaises(graphql.DeadlineExceeded) as context:
+            with graphql.Deadline(0.005):
+                query()
+
+        self.assertIs(context.exception.__cause__, error)
+
+    def test_deadline_passes_while_streaming(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = response = lib.http_response()
+        query = graphql.Query("query foo { bars }", "https://gbp.invalid", session)
+
+        with graphql.Deadline(10) as deadline:
+
+            def iter_content(_size):
+                yield b'{"data": {"bars": [1, '
+                deadline.expires = time.monotonic()
+                yield b"2]}}"
+
+            with mock.patch.object(response, "iter_content", iter_content):
+                items = query.stream("bars")
+
+                self.assertEqual(next(items), 1)
+                with self.assertRaises(graphql.DeadlineExceeded):
+                    next(items)
+
+    def test_read_timeout_while_streaming(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = response = lib.http_response()
+        query = graphql.Query("query foo { bars }", "https://gbp.invalid", session)
+        error = requests.exceptions.ConnectionError("Read timed out.")
+
+        with graphql.Deadline(10) as deadline:
+
+            def iter_content(_size):
+                yield b'{"data": {"bars": [1, '
+                deadline.expires = time.monotonic()
+                raise error
+
+            with mock.patch.object(response, "iter_content", iter_content):
+                with self.assertRaises(graphql.DeadlineExceeded) as context:
+                    list(query.stream("bars"))
+
+        self.assertIs(context.exception.__cause__, error)
+
+    def test_deadline_passes_while_reading_body(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = response = lib.http_response()
+        query = graphql.Query("query foo { bar }", "https://gbp.invalid", session)
+
+        with graphql.Deadline(10) as deadline:
+
+            def iter_content(_size):
+                yield b'{"data": '
+                deadline.expires = time.monotonic()
+                yield b'{"bar": 1}}'
+
+            with mock.patch.object(response, "iter_content", iter_content):
+                with self.assertRaises(graphql.DeadlineExceeded):
+                    query()
+
+    def test_read_timeout_while_reading_body(self, sleep):
+        session = mock.Mock(spec=requests.Session)
+        session.post.return_value = response = lib.http_response()
+        query = graphql.Query("query foo { bar }", "https://gbp.invalid", session)
+        error = requests.exceptions.ConnectionError("Read timed out.")
+
+        with graphql.Deadline(10) as deadline:
+
+            def iter_content(_size):
+                yield b'{"data": '
+                deadline.expires = time.monotonic()
+                raise error
+
+            with mock.patch.object(response, "iter_content", iter_content):
+                with self.assertRaises(graphql.DeadlineExceeded) as context:
+                    query()
+
+        self.assertIs(context.exception.__cause__, error)
+
+    def test_context(self, sleep):
+        self.assertIsNone(graphql.current_deadline.get())
+
+        with graphql.Deadline(10) as outer:
+            with graphql.Deadline(5) as inner:
+                self.assertIs(graphql.current_deadline.get(), inner)
+            self.assertIs(graphql.current_deadline.get(), outer)
+
+        self.assertIsNone(graphql.current_deadline.get())
+
+
+@mock.patch("requests.adapters.HTTPAdapter.send")
+class TimeoutAdapterTestCase(TestCase):
+    adapter = graphql.TimeoutAdapter((5.0, 30.0))
+    request = requests.Request("POST", "https://gbp.invalid/").prepare()
+
+    def test_default_timeout(self, send):
+        self.adapter.send(self.request)
+
+        self.assertEqual(send.call_args[1]["timeout"], (5.0, 30.0))
+
+    def test_given_timeout(self, send):
+        self.adapter.send(self.request, timeout=2.0)
+
+        self.assertEqual(send.call_args[1]["timeout"], (2.0, 2.0))
+
+    def test_limited_by_deadline(self, send):
+        with graphql.Deadline(10):
+            self.adapter.send(self.request)
+
+        connect, read = send.call_args[1]["timeout"]
+        self.assertEqual(connect, 5.0)
+        self.assertTrue(9 < read <= 10)
+
+    def test_deadline_passed(self, send):
+        with self.assertRaises(graphql.DeadlineExceeded), graphql.Deadline(0):
+            self.adapter.send(self.request)
+
+        send.assert_not_called()
+
+
+class RetryPolicyTestCase(TestCase):
+    def test_delay_is_exponential_with_jitter(self):
+        policy = graphql.RetryPolicy(retries=5, backoff=1.0, max_backoff=5.0)
+
+        for retry, (low, high) in enumerate([(0.5, 1), (1, 2), (2, 4), (2.5, 5)]):
+            delay = policy.delay(retry)
+            self.assertTrue(low <= delay <= high, (retry, delay))
+
+    def test_honors_retry_after(self):
+        policy = graphql.RetryPolicy(retries=5, backoff=1.0, max_backoff=5.0)
+
+        self.assertEqual(policy.delay(0, "4"), 4.0)
+        self.assertEqual(policy.delay(0, "60"), 5.0)
+
 
 class QueriesTestCase(TestCase):
     """Tests for the Queries wrapper"""
@@ -53,7 +590,8 @@ class QueriesTestCase(TestCase):
 
         self.assertEqual(
             logs_query.query,
-            "query ($id: ID!) {\n  build(id: $id) {\n    logs\n  }\n}\n",
+            "query ($id: ID!) {\n  build(id: $id) {\n"
+            "    completed\n    logs\n  }\n}\n",
         )
 
     def test_raises_attribute_error_when_file_not_found(self):
@@ -76,6 +614,73 @@ class QueriesTestCase(TestCase):
         self.assertIsInstance(as_dict, dict)
         self.assertIn("logs", as_dict)
 
+    def test_uses_bundled_queries(self):
+        bundled = {"logs": "query { logs }"}
+        queries = graphql.Queries(URL("https://gbp.invalid"))
+
+        with (
+            mock.patch.object(graphql.bundle, "queries", return_value=bundled),
+            mock.patch.object(graphql.resources, "files") as files,
+        ):
+            self.assertEqual(queries.gbpcli.logs.query, "query { logs }")
+            self.assertEqual(list(queries.gbpcli.to_dict()), ["logs"])
+
+            with self.assertRaises(AttributeError):
+                print(queries.gbpcli.machines)
+
+        files.assert_not_called()
+
+    def test_uses_snapshot(self):
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            snapshot.enabled(path=os.path.join(tmpdir, "snapshot.bin")),
+        ):
+            queries = graphql.Queries(URL("https://gbp.invalid"))
+            logs = queries.gbpcli.logs.query
+            current = snapshot.current_snapshot.get()
+
+            assert current is not None
+            self.assertEqual(current.entries["queries gbpcli"]["value"]["logs"], logs)
+
+            queries = graphql.Queries(URL("https://gbp.invalid"))
+            with mock.patch.object(graphql.bundle, "read_queries") as read_queries:
+                self.assertEqual(queries.gbpcli.logs.query, logs)
+
+            read_queries.assert_not_called()
+
+    def test_accepts_encodings_urllib3_can_decode(self):
+        # pylint: disable=protected-access
+        with mock.patch.object(urllib3.util.request, "ACCEPT_ENCODING", "gzip,zstd"):
+            queries = graphql.Queries(URL("https://gbp.invalid"))
+
+        self.assertEqual(queries._session.headers["Accept-Encoding"], "gzip,zstd")
+
+    def test_timeout_settings(self):
+        # pylint: disable=protected-access
+        settings = Settings(CONNECT_TIMEOUT=1.0, READ_TIMEOUT=2.0)
+        queries = graphql.Queries(URL("https://gbp.invalid"), settings=settings)
+
+        adapter = queries._session.get_adapter("https://gbp.invalid")
+
+        assert isinstance(adapter, graphql.TimeoutAdapter)
+        self.assertEqual(adapter.timeout, (1.0, 2.0))
+
+    def test_timeout(self):
+        # pylint: disable=protected-access
+        queries = graphql.Queries(URL("https://gbp.invalid"), timeout=(3.0, None))
+
+        adapter = queries._session.get_adapter("https://gbp.invalid")
+
+        assert isinstance(adapter, graphql.TimeoutAdapter)
+        self.assertEqual(adapter.timeout, (3.0, None))
+
+    def test_compression_settings(self):
+        queries = graphql.Queries(
+            URL("https://gbp.invalid"), settings=Settings(COMPRESS_MIN_SIZE=1024)
+        )
+
+        self.assertEqual(queries.gbpcli.logs.compress_min_size, 1024)
+
     def test_adds_auth_header_to_session(self):
         # pylint: disable=protected-access
         auth = {"user": "test", "api_key": "secret"}
@@ -84,6 +689,18 @@ class QueriesTestCase(TestCase):
         expected = f'Basic {graphql.auth_encode("test", "secret")}'
         self.assertEqual(queries._session.headers["Authorization"], expected)
 
+    def test_retry_settings(self):
+        settings = Settings(RETRIES=7, RETRY_BACKOFF=0.1, CIRCUIT_THRESHOLD=9)
+        queries = graphql.Queries(URL("https://gbp.invalid"), settings=settings)
+
+        query = queries.gbpcli.logs
+
+        self.assertEqual(query.retry.retries, 7)
+        self.assertEqual(query.retry.backoff, 0.1)
+        assert query.breaker is not None
+        self.assertEqual(query.breaker.threshold, 9)
+        self.assertIs(query.breaker, queries.gbpcli.machines.breaker)
+
     def test_repr(self):
         queries = graphql.Queries(URL("https://gbp.invalid"))
 
@@ -93,6 +710,131 @@ class QueriesTestCase(TestCase):
         )
 
 
+class BatchTests(TestCase):
+    def query(self, text: str) -> graphql.Query:
+        return graphql.Query(text, "https://gbp.invalid", mock.Mock())
+
+    @mock.patch.object(requests.Session, "post")
+    def test_merges_queries_into_one_request(self, post):
+        post.return_value = lib.http_response(
+            json={"data": {"q0_build": {"logs": "foo"}, "q1_build": None}}
+        )
+        queries = graphql.Queries(URL("https://gbp.invalid"))
+
+        with queries.batch() as batch:
+            first = batch.add(queries.gbpcli.logs, id="babette.1")
+            second = batch.add(queries.gbpcli.logs, id="babette.2")
+
+        post.assert_called_once()
+        payload = post.call_args[1]["json"]
+        self.assertEqual(
+            payload["variables"], {"q0_id": "babette.1", "q1_id": "babette.2"}
+        )
+        self.assertIn("($q0_id: ID!, $q1_id: ID!)", payload["query"])
+        self.assertIn("q0_build: build(id: $q0_id)", payload["query"])
+        self.assertIn("q1_build: build(id: $q1_id)", payload["query"])
+        self.assertEqual(first.result(), ({"build": {"logs": "foo"}}, {}))
+        self.assertEqual(second.result(), ({"build": None}, {}))
+
+    def test_maps_errors_to_their_query(self):
+        session = mock.Mock(spec=requests.Session)
+        errors = [
+            {"message": "Oh no!", "path": ["q1_build", "logs"]},
+            {"message": "Everything is wrong"},
+        ]
+        session.post.return_value = lib.http_response(
+            json={"data": {"q0_build": None, "q1_build": None}, "errors": errors}
+        )
+        batch = graphql.Batch("https://gbp.invalid", session)
+        first = batch.add(self.query("query ($id: ID!) { build(id: $id) { logs } }"))
+        second = batch.add(self.query("query ($id: ID!) { build(id: $id) { logs } }"))
+
+        batch.send()
+
+        self.assertEqual(first.result()[1], [{"message": "Everything is wrong"}])
+        self.assertEqual(
+            second.result()[1],
+            [
+                {"message": "Oh no!", "path": ["build", "logs"]},
+                {"message": "Everything is wrong"},
+            ],
+        )
+        with self.assertRaises(graphql.APIError):
+            graphql.check(second.result())
+
+    def test_empty_batch_does_not_send(self):
+        post = mock.Mock()
+        batch = graphql.Batch("https://gbp.invalid", mock.Mock(post=post))
+
+        batch.send()
+
+        post.assert_not_called()
+
+    def test_cannot_mix_operation_types(self):
+        batch = graphql.Batch("https://gbp.invalid", mock.Mock())
+        batch.add(self.query("query { machines { machine } }"))
+
+        with self.assertRaises(ValueError):
+            batch.add(self.query("mutation ($id: ID!) { keepBuild(id: $id) }"))
+
+    def test_result_before_send(self):
+        batch = graphql.Batch("https://gbp.invalid", mock.Mock())
+        item = batch.add(self.query("query { machines { machine } }"))
+
+        with self.assertRaises(RuntimeError):
+            item.result()
+
+
+class AliasFieldsTests(TestCase):
+    def test_aliases_top_level_fields_only(self):
+        selections = " build(id: $id) { id logs } latest(machine: $m) { id } "
+
+        result = graphql.alias_fields(selections, "q0_")
+
+        self.assertEqual(
+            result,
+            (
+                " q0_build: build(id: $id) { id logs } "
+                "q0_latest: latest(machine: $m) { id } ",
+                ["build", "latest"],
+            ),
+        )
+
+    def test_existing_alias(self):
+        result = graphql.alias_fields(" me: build(id: $id) { id } ", "q0_")
+
+        self.assertEqual(result, (" q0_me: build(id: $id) { id } ", ["me"]))
+
+    def test_directives(self):
+        result = graphql.alias_fields(" tags @include(if: $flag) ", "q3_")
+
+        self.assertEqual(result, (" q3_tags: tags @include(if: $flag) ", ["tags"]))
+
+
+class SplitOperationTests(TestCase):
+    def test_named_query_with_defaults(self):
+        query = (
+            "query GetBuilds($machine: String!, $withPackages: Boolean = false) {\n"
+            "  builds(machine: $machine) { id }\n}\n"
+        )
+
+        result = graphql.split_operation(query)
+
+        self.assertEqual(
+            result,
+            (
+                "query",
+                "$machine: String!, $withPackages: Boolean = false",
+                "\n  builds(machine: $machine) { id }\n",
+            ),
+        )
+
+    def test_shorthand_query(self):
+        result = graphql.split_operation("{ machines { machine } }")
+
+        self.assertEqual(result, ("query", "", " machines { machine } "))
+
+
 class AuthEncodeTests(TestCase):
     def test(self):
         # https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Authorization#basic_authentication
@@ -0,0 +1,162 @@
+"""Tests for the importprofile module"""
+
+# pylint: disable=missing-docstring
+import importlib
+import io
+import json
+import sys
+from unittest import TestCase, mock
+
+import gbp_testkit.fixtures as testkit
+from unittest_fixtures import FixtureContext, Fixtures, fixture, given
+
+from gbpcli import importprofile
+
+
+@fixture(testkit.tmpdir)
+def package(fixtures: Fixtures) -> FixtureContext[str]:
+    """A package (importprofile_test) whose __init__ imports its module, mod"""
+    path = fixtures.tmpdir / "importprofile_test"
+    path.mkdir()
+    (path / "__init__.py").write_text("from . import mod\n")
+    (path / "mod.py").write_text("VALUE = 1\n")
+    sys.path.insert(0, str(fixtures.tmpdir))
+
+    yield "importprofile_test"
+
+    sys.path.remove(str(fixtures.tmpdir))
+    for name in ["importprofile_test.mod", "importprofile_test"]:
+        sys.modules.pop(name, None)
+
+
+@fixture()
+def profiler(_fixtures: Fixtures) -> FixtureContext[importprofile.ImportProfiler]:
+    profiler_ = importprofile.ImportProfiler()
+    profiler_.install()
+
+    yield profiler_
+
+    profiler_.uninstall()
+
+
+@given(package, profiler)
+class ImportProfilerTests(TestCase):
+    def test_records_imports(self, fixtures: Fixtures) -> None:
+        importlib.import_module(fixtures.package)
+
+        imports = {item.name: item for item in fixtures.profiler.imports}
+        init, module = imports["importprofile_test"], imports["importprofile_test.mod"]
+
+        self.assertEqual(init.depth, 0)
+        self.assertEqual(module.depth, 1)
+        self.assertEqual(init.children, module.duration)
+        self.assertAlmostEqual(
+            init.self_time, init.duration - module.duration, places=9
+        )
+        self.assertEqual(module.package, "importprofile_test")
+
+    def test_uninstall(self, fixtures: Fixtures) -> None:
+        fixtures.profiler.uninstall()
+
+        importlib.import_module(fixtures.package)
+
+        self.assertEqual(fixtures.profiler.imports, [])
+        self.assertNotIn(fixtures.profiler, sys.meta_path)
+
+    def test_write_report(self, fixtures: Fixtures) -> None:
+        importlib.import_module(fixtures.package)
+        fp = io.StringIO()
+
+        fixtures.profiler.write_report(fp)
+
+        lines = fp.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("Import time: "))
+        self.assertTrue(any(line.endswith("ms  importprofile_test") for line in lines))
+        self.assertTrue(
+            any(line.endswith("ms  importprofile_test.mod") for line in lines)
+        )
+
+    def test_speedscope(self, fixtures: Fixtures) -> None:
+        importlib.import_module(fixtures.package)
+
+        data = fixtures.profiler.speedscope()
+
+        self.assertEqual(data["$schema"], importprofile.SPEEDSCOPE_SCHEMA)
+        frames = [frame["name"] for frame in data["shared"]["frames"]]
+        events = [
+            (event["type"], frames[event["frame"]])
+            for event in data["profiles"][0]["events"]
+        ]
+        self.assertEqual(
+            events,
+            [
+                ("O", "importprofile_test"),
+                ("O", "importprofile_test.mod"),
+                ("C", "importprofile_test.mod"),
+                ("C", "importprofile_test"),
+            ],
+        )
+
+
+@given(package, profiler, testkit.tmpdir)
+class FinishTests(TestCase):
+    def test_report_to_stderr(self, fixtures: Fixtures) -> None:
+        importlib.import_module(fixtures.package)
+
+        with mock.patch.object(sys, "stderr", new_callable=io.StringIO) as stderr:
+            fixtures.profiler.finish("1")
+
+        self.assertIn("importprofile_test.mod", stderr.getvalue())
+        self.assertNotIn(fixtures.profiler, sys.meta_path)
+
+    def test_speedscope_file(self, fixtures: Fixtures) -> None:
+        importlib.import_module(fixtures.package)
+        path = fixtures.tmpdir / "imports.json"
+
+        fixtures.profiler.finish(str(path))
+
+        data = json.loads(path.read_text(encoding="UTF-8"))
+        self.assertEqual(len(data["profiles"][0]["events"]), 4)
+
+    def test_report_file(self, fixtures: Fixtures) -> None:
+        importlib.import_module(fixtures.package)
+        path = fixtures.tmpdir / "imports.txt"
+
+        fixtures.profiler.finish(str(path))
+
+        self.assertIn("importprofile_test.mod", path.read_text(encoding="UTF-8"))
+
+    def test_cannot_write_file(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "missing" / "imports.txt"
+
+        with mock.patch.object(sys, "stderr", new_callable=io.StringIO) as stderr:
+            fixtures.profiler.finish(str(path))
+
+        self.assertIn("cannot write the import profile", stderr.getvalue())
+        self.assertFalse(path.exists())
+
+
+@given(testkit.environ)
+class StartTests(TestCase):
+    def test_not_set(self, fixtures: Fixtures) -> None:
+        fixtures.environ.pop(importprofile.ENV_VAR, None)
+
+        self.assertIsNone(importprofile.start())
+
+    def test_false_values(self, fixtures: Fixtures) -> None:
+        for value in ["0", "false", "No", "OFF"]:
+            with self.subTest(value=value):
+                fixtures.environ[importprofile.ENV_VAR] = value
+
+                self.assertIsNone(importprofile.start())
+
+    def test_set(self, fixtures: Fixtures) -> None:
+        fixtures.environ[importprofile.ENV_VAR] = "1"
+
+        with mock.patch.object(importprofile.atexit, "register") as register:
+            profiler_ = importprofile.start()
+
+        assert profiler_ is not None
+        self.addCleanup(profiler_.uninstall)
+        self.assertIs(sys.meta_path[0], profiler_)
+        register.assert_called_once_with(profiler_.finish, "1")
@@ -1,8 +1,8 @@
 """Tests for the inspect subcommand"""
 
 # pylint: disable=missing-docstring
-from typing import Sequence
-from unittest import TestCase
+from typing import Any, Iterator, Sequence
+from unittest import TestCase, mock
 
 import gbp_testkit.fixtures as testkit
 from gbp_testkit.helpers import LOCAL_TIMEZONE
@@ -10,6 +10,9 @@ from gentoo_build_publisher import publisher
 from gentoo_build_publisher.types import Build
 from unittest_fixtures import Fixtures, fixture, given, where
 
+from gbpcli.gbp import GBP
+from gbpcli.types import BuildCollection
+
 
 @fixture(testkit.publisher, pf=testkit.cpv_generator)
 def inspect_fixture(
@@ -61,6 +64,23 @@ class InspectTestCase(TestCase):
         self.assertEqual(status, 0)
         self.assertEqual(fixtures.console.stdout, INSPECT_SINGLE_WITH_TAIL)
 
+    def test_tail_reads_only_the_tail_builds(self, fixtures: Fixtures):
+        taken: list[int] = []
+        iter_builds = GBP.iter_builds
+
+        def record_taken(gbp: GBP, machine: str, **kwargs: Any) -> Iterator[Any]:
+            for build in iter_builds(gbp, machine, **kwargs):
+                taken.append(build.number)
+                yield build
+
+        with mock.patch.object(GBP, "iter_builds", autospec=True) as patched:
+            patched.side_effect = record_taken
+            status = fixtures.gbpcli("gbp inspect --tail=2 base")
+
+        self.assertEqual(status, 0)
+        self.assertEqual(fixtures.console.stdout, INSPECT_SINGLE_WITH_TAIL)
+        self.assertEqual(taken, [3, 2])
+
     def test_single_machine_with_build_id(self, fixtures: Fixtures):
         status = fixtures.gbpcli("gbp inspect base.2")
 
@@ -73,6 +93,32 @@ class InspectTestCase(TestCase):
         self.assertEqual(status, 0)
         self.assertEqual(fixtures.console.stdout, INSPECT_SINGLE_MINE)
 
+    def test_build_id_not_found(self, fixtures: Fixtures):
+        status = fixtures.gbpcli("gbp inspect babette base.99")
+
+        self.assertEqual(status, 1)
+        self.assertEqual(fixtures.console.stdout, "$ gbp inspect babette base.99\n")
+        self.assertEqual(fixtures.console.stderr, "Not found\n")
+
+    def test_machines_are_printed_as_retrieved(self, fixtures: Fixtures):
+        outputs: list[str] = []
+        builds = GBP.builds
+
+        def record_output(gbp: GBP, machine: str, **kwargs: Any) -> BuildCollection:
+            outputs.append(fixtures.console.stdout)
+            return builds(gbp, machine, **kwargs)
+
+        with mock.patch.object(GBP, "builds", autospec=True, side_effect=record_output):
+            status = fixtures.gbpcli("gbp inspect")
+
+        self.assertEqual(status, 0)
+        self.assertEqual(fixtures.console.stdout, INSPECT_ALL)
+        self.assertEqual(len(outputs), 3)
+        self.assertEqual(outputs[0], "$ gbp inspect\n")
+        self.assertIn("babette", outputs[1])
+        self.assertNotIn("base", outputs[1])
+        self.assertTrue(INSPECT_ALL.startswith(outputs[2]))
+
 
 INSPECT_SINGLE_WITH_TAIL = """$ gbp inspect --tail=2 base
 Machines
@@ -0,0 +1,76 @@
+"""Tests for the jsonstream module"""
+
+# pylint: disable=missing-docstring
+import json
+from typing import Any, Iterator
+from unittest import TestCase, mock
+
+from gbpcli import jsonstream
+from gbpcli.jsonstream import ArrayStream
+
+PATH = ("data", "builds")
+
+
+def chunked(text: str, size: int) -> Iterator[str]:
+    return (text[i : i + size] for i in range(0, len(text), size))
+
+
+class ArrayStreamTests(TestCase):
+    def decode(self, document: Any, size: int = 7) -> tuple[list[Any], dict[str, Any]]:
+        text = document if isinstance(document, str) else json.dumps(document, indent=1)
+        stream = ArrayStream(chunked(text, size), PATH)
+
+        return list(stream), stream.rest
+
+    def test_yields_items(self) -> None:
+        builds = [{"id": f"babette.{i}", "packages": ["a", "b"] * i} for i in range(5)]
+        document = {"data": {"builds": builds, "other": 1}, "errors": [{"e": None}]}
+
+        for size in [1, 2, 7, 1024]:
+            with self.subTest(size=size):
+                items, rest = self.decode(document, size)
+
+                self.assertEqual(items, builds)
+                self.assertEqual(rest, {"data": {"other": 1}, "errors": [{"e": None}]})
+
+    def test_yields_before_end_of_document(self) -> None:
+        chunks = iter(['{"data": {"builds": [1, ', "2, ", "3]}}"])
+        stream = iter(ArrayStream(chunks, PATH))
+
+        self.assertEqual(next(stream), 1)
+        self.assertEqual(list(chunks), ["2, ", "3]}}"])
+
+    def test_numbers_split_across_chunks(self) -> None:
+        items, _ = self.decode('{"data": {"builds": [12345, 678]}}', 3)
+
+        self.assertEqual(items, [12345, 678])
+
+    def test_large_items_are_not_decoded_once_per_chunk(self) -> None:
+        builds = [{"id": "babette.1", "packages": ["sys-apps/acl-2.3.2-r2"] * 1000}]
+        text = json.dumps({"data": {"builds": builds}})
+
+        with mock.patch.object(
+            jsonstream, "decoder", wraps=jsonstream.decoder
+        ) as decoder:
+            items = list(ArrayStream(chunked(text, 10), PATH))
+
+        self.assertEqual(items, builds)
+        # Over 2,500 chunks
+        self.assertLess(decoder.raw_decode.call_count, 20)
+
+    def test_empty_array(self) -> None:
+        items, rest = self.decode({"data": {"builds": []}})
+
+        self.assertEqual(items, [])
+        self.assertEqual(rest, {"data": {}})
+
+    def test_null(self) -> None:
+        items, rest = self.decode({"data": None, "errors": ["error"]})
+
+        self.assertEqual(items, [])
+        self.assertEqual(rest, {"data": None, "errors": ["error"]})
+
+    def test_malformed(self) -> None:
+        for document in ['{"data": {"builds": [1 2]}}', "[]", '{"data": {}} x', "{"]:
+            with self.subTest(document=document), self.assertRaises(ValueError):
+                self.decode(document)
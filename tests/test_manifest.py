@@ -0,0 +1,140 @@
+"""Tests for the manifest module"""
+
+# pylint: disable=missing-docstring
+import json
+import os
+import sys
+from unittest import TestCase, mock
+
+import gbp_testkit.fixtures as testkit
+from unittest_fixtures import Fixtures, given
+
+import gbpcli.subcommands.latest as latest_subcommand
+from gbpcli import manifest, snapshot
+
+
+@given(testkit.tmpdir)
+class GetTests(TestCase):
+    def test_builds_and_writes_manifest(self, fixtures: Fixtures) -> None:
+        subcommands = manifest.get(fixtures.tmpdir)
+
+        latest = next(i for i in subcommands if i.name == "latest")
+        self.assertEqual(latest.value, "gbpcli.subcommands.latest")
+        self.assertEqual(latest.doc, latest_subcommand.handler.__doc__)
+        self.assertEqual(latest.help, latest_subcommand.HELP)
+        self.assertEqual(latest.load(), latest_subcommand)
+
+        path = fixtures.tmpdir / manifest.FILENAME
+        self.assertEqual(
+            json.loads(path.read_text(encoding="UTF-8"))["key"],
+            manifest.environment_key(),
+        )
+
+    def test_docs_are_one_line(self, fixtures: Fixtures) -> None:
+        # The doc is the subcommand's summary in "gbp --help"
+        for subcommand in manifest.get(fixtures.tmpdir):
+            with self.subTest(subcommand=subcommand.name):
+                self.assertNotIn("\n", subcommand.doc or "")
+
+    def test_reads_current_manifest(self, fixtures: Fixtures) -> None:
+        subcommands = manifest.get(fixtures.tmpdir)
+
+        with mock.patch.object(manifest, "build") as build:
+            self.assertEqual(manifest.get(fixtures.tmpdir), subcommands)
+
+        build.assert_not_called()
+
+    def test_uses_snapshot(self, fixtures: Fixtures) -> None:
+        path = str(fixtures.tmpdir / "snapshot.bin")
+
+        with snapshot.enabled(path=path):
+            subcommands = manifest.get(fixtures.tmpdir)
+
+        with snapshot.enabled(path=path), mock.patch.object(manifest, "read") as read:
+            self.assertEqual(manifest.get(fixtures.tmpdir), subcommands)
+
+        read.assert_not_called()
+
+    def test_rebuilds_when_environment_changes(self, fixtures: Fixtures) -> None:
+        manifest.get(fixtures.tmpdir)
+
+        with (
+            mock.patch.object(manifest, "environment_key", return_value="changed"),
+            mock.patch.object(manifest, "build", return_value=[]) as build,
+        ):
+            self.assertEqual(manifest.get(fixtures.tmpdir), [])
+
+        build.assert_called_once_with()
+
+    def test_rebuilds_when_module_changes(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "mod.py"
+        path.write_text("", encoding="UTF-8")
+        subcommand = manifest.Subcommand(
+            name="mod",
+            value="mod",
+            doc=None,
+            help=None,
+            path=str(path),
+            mtime=os.stat(path).st_mtime_ns,
+        )
+        manifest.write(
+            fixtures.tmpdir / manifest.FILENAME,
+            manifest.environment_key(),
+            [subcommand],
+        )
+        self.assertEqual(manifest.get(fixtures.tmpdir), [subcommand])
+
+        os.utime(path, ns=(0, 0))
+
+        self.assertNotEqual(manifest.get(fixtures.tmpdir), [subcommand])
+
+    def test_rebuilds_when_manifest_is_invalid(self, fixtures: Fixtures) -> None:
+        (fixtures.tmpdir / manifest.FILENAME).write_text("{", encoding="UTF-8")
+
+        subcommands = manifest.get(fixtures.tmpdir)
+
+        self.assertIn("latest", [i.name for i in subcommands])
+
+    def test_search_path(self, fixtures: Fixtures) -> None:
+        search_path = fixtures.tmpdir / "site-packages"
+        search_path.mkdir()
+        subcommands = manifest.get(fixtures.tmpdir)
+        orig_path = sys.path.copy()
+        self.addCleanup(setattr, sys, "path", orig_path)
+
+        with mock.patch.object(manifest, "build", return_value=subcommands) as build:
+            self.assertEqual(manifest.get(fixtures.tmpdir), subcommands)
+            self.assertNotIn(str(search_path), sys.path)
+            build.assert_not_called()
+
+            self.assertEqual(
+                manifest.get(fixtures.tmpdir, [str(search_path)]), subcommands
+            )
+            build.assert_called_once_with()
+            self.assertEqual(sys.path[0], str(search_path))
+
+    def test_cannot_write_manifest(self, fixtures: Fixtures) -> None:
+        cache_dir = fixtures.tmpdir / "file"
+        cache_dir.write_text("", encoding="UTF-8")
+
+        subcommands = manifest.get(cache_dir)
+
+        self.assertIn("latest", [i.name for i in subcommands])
+        self.assertEqual(os.listdir(fixtures.tmpdir), ["file"])
+
+
+class SubcommandTests(TestCase):
+    def subcommand(self, value: str) -> manifest.Subcommand:
+        return manifest.Subcommand(
+            name="latest", value=value, doc=None, help=None, path=None, mtime=None
+        )
+
+    def test_load_module(self) -> None:
+        subcommand = self.subcommand("gbpcli.subcommands.latest")
+
+        self.assertIs(subcommand.load(), latest_subcommand)
+
+    def test_load_attribute(self) -> None:
+        subcommand = self.subcommand("gbpcli.subcommands:latest [extra]")
+
+        self.assertIs(subcommand.load(), latest_subcommand)
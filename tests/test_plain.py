@@ -0,0 +1,64 @@
+"""Tests for the plain module"""
+
+# pylint: disable=missing-docstring
+import io
+from unittest import TestCase, mock
+
+from rich.table import Table
+
+from gbpcli.plain import PlainConsole, strip_markup
+
+
+class StripMarkupTests(TestCase):
+    def test(self) -> None:
+        self.assertEqual(
+            strip_markup("[machine][mymachine]polaris[/mymachine][/machine]"), "polaris"
+        )
+
+    def test_without_markup(self) -> None:
+        self.assertEqual(strip_markup("polaris"), "polaris")
+
+    def test_closing_tag(self) -> None:
+        self.assertEqual(strip_markup("[bold]Build:[/] 12"), "Build: 12")
+
+    def test_brackets_that_are_not_tags(self) -> None:
+        self.assertEqual(strip_markup("[1, 2] [Build]"), "[1, 2] [Build]")
+
+    def test_escaped_tags(self) -> None:
+        self.assertEqual(strip_markup(r"\[bold]Build:\[/bold]"), "[bold]Build:[/bold]")
+        self.assertEqual(strip_markup(r"\\[bold]Build:"), "\\Build:")
+
+
+class PlainConsoleTests(TestCase):
+    def test_print(self) -> None:
+        out = io.StringIO()
+        console = PlainConsole(out)
+
+        console.print("[build_id]12[/build_id]", 3, end="!\n")
+
+        self.assertEqual(out.getvalue(), "12 3!\n")
+
+    def test_print_renderable(self) -> None:
+        out = io.StringIO()
+        console = PlainConsole(out, width=40)
+        table = Table(title="Machines", style="box")
+        table.add_column("Machine")
+        table.add_row("[machine]polaris[/machine]")
+
+        console.print(table)
+
+        output = out.getvalue()
+        self.assertIn("polaris", output)
+        self.assertNotIn("[machine]", output)
+        self.assertNotIn("\x1b[", output)
+
+    def test_file_defaults_to_stdout_and_stderr(self) -> None:
+        with (
+            mock.patch("sys.stdout", new_callable=io.StringIO) as stdout,
+            mock.patch("sys.stderr", new_callable=io.StringIO) as stderr,
+        ):
+            PlainConsole().print("out")
+            PlainConsole(stderr=True).print("err")
+
+        self.assertEqual(stdout.getvalue(), "out\n")
+        self.assertEqual(stderr.getvalue(), "err\n")
@@ -0,0 +1,88 @@
+"""Tests for the quick module"""
+
+# pylint: disable=missing-docstring,unused-argument
+import os
+from unittest import TestCase
+
+import gbp_testkit.fixtures as testkit
+from unittest_fixtures import Fixtures, fixture, given
+
+from gbpcli import quick, utils
+
+
+@fixture(testkit.environ, testkit.tmpdir)
+def cache_home(fixtures: Fixtures) -> None:
+    """Set the user's cache directory to tmpdir and the terminal's width"""
+    fixtures.environ["XDG_CACHE_HOME"] = str(fixtures.tmpdir)
+    fixtures.environ["COLUMNS"] = "100"
+
+
+@given(testkit.environ, testkit.tmpdir, cache_home)
+class GetTests(TestCase):
+    def test_saved(self, fixtures: Fixtures) -> None:
+        quick.save(["--version"], "gbpcli 1.2.3\n")
+
+        self.assertEqual(quick.get(["--version"]), "gbpcli 1.2.3\n")
+
+    def test_not_saved(self, fixtures: Fixtures) -> None:
+        self.assertIsNone(quick.get(["--version"]))
+
+    def test_other_arguments(self, fixtures: Fixtures) -> None:
+        quick.save(["--version", "list"], "gbpcli 1.2.3\n")
+
+        self.assertIsNone(quick.get(["--version", "list"]))
+        self.assertFalse((fixtures.tmpdir / "gbpcli").exists())
+
+    def test_manifest_changed(self, fixtures: Fixtures) -> None:
+        quick.save(["--help"], "usage: gbp\n")
+        (fixtures.tmpdir / "gbpcli" / "subcommands.json").write_text("{}")
+
+        self.assertIsNone(quick.get(["--help"]))
+
+    def test_help_is_saved_per_terminal_width(self, fixtures: Fixtures) -> None:
+        quick.save(["--help"], "usage: gbp\n")
+
+        self.assertEqual(quick.get(["-h"]), "usage: gbp\n")
+
+        fixtures.environ["COLUMNS"] = "120"
+        self.assertIsNone(quick.get(["--help"]))
+
+    def test_cannot_save(self, fixtures: Fixtures) -> None:
+        (fixtures.tmpdir / "gbpcli").write_text("")
+
+        quick.save(["--version"], "gbpcli 1.2.3\n")
+
+        self.assertIsNone(quick.get(["--version"]))
+        self.assertEqual(os.listdir(fixtures.tmpdir), ["gbpcli"])
+
+
+@given(testkit.environ)
+class UserCacheDirTests(TestCase):
+    def test_xdg_cache_home(self, fixtures: Fixtures) -> None:
+        fixtures.environ["XDG_CACHE_HOME"] = "/var/tmp/cache"
+
+        self.assertEqual(quick.user_cache_dir(), "/var/tmp/cache/gbpcli")
+
+    def test_home(self, fixtures: Fixtures) -> None:
+        fixtures.environ.pop("XDG_CACHE_HOME", None)
+        fixtures.environ["HOME"] = "/home/gbp"
+
+        self.assertEqual(quick.user_cache_dir(), "/home/gbp/.cache/gbpcli")
+
+
+@given(testkit.environ)
+class ColumnsTests(TestCase):
+    def test_columns(self, fixtures: Fixtures) -> None:
+        fixtures.environ["COLUMNS"] = "132"
+
+        self.assertEqual(quick.columns(), 132)
+
+    def test_invalid_columns(self, fixtures: Fixtures) -> None:
+        fixtures.environ["COLUMNS"] = "wide"
+
+        self.assertGreater(quick.columns(), 0)
+
+
+class WatchedTests(TestCase):
+    def test_server_conf(self) -> None:
+        self.assertEqual(quick.WATCHED[0], utils.DEFAULT_SERVER_CONF)
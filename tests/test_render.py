@@ -12,7 +12,9 @@ from gbpcli.render import (
     format_flags,
     format_machine,
     format_tags,
+    markup,
     pluralize,
+    style,
     timestr,
     yesno,
 )
@@ -71,6 +73,13 @@ This is a test
         with self.assertRaises(ValueError):
             build_to_str(build)
 
+    def test_without_markup(self, fixtures: Fixtures) -> None:
+        with markup(False):
+            result = build_to_str(lib.build)
+
+        self.assertTrue(result.startswith("Build: babette/12\nBuildDate: "))
+        self.assertNotIn("[", result)
+
 
 class FormatTagsTest(TestCase):
     """Tests for the format_tags method"""
@@ -117,6 +126,14 @@ class FormatMachineTest(TestCase):
         expected = "[machine]polaris[/machine]"
         self.assertEqual(formatted, expected)
 
+    def test_without_markup(self):
+        args = argparse.Namespace(my_machines="polaris")
+
+        with markup(False):
+            formatted = format_machine("polaris", args)
+
+        self.assertEqual(formatted, "polaris")
+
 
 class FormatFlagsTests(TestCase):
     """Tests for the format_flags method"""
@@ -159,6 +176,23 @@ class FormatFlagsTests(TestCase):
             format_flags(build)
 
 
+class MarkupTests(TestCase):
+    def test_enabled_by_default(self) -> None:
+        self.assertEqual(style("tag", "@foo"), "[tag]@foo[/tag]")
+
+    def test_disabled(self) -> None:
+        with markup(False):
+            self.assertEqual(style("tag", "@foo"), "@foo")
+            self.assertEqual(format_tags(["foo", "bar"]), "@foo @bar")
+
+            with markup(True):
+                self.assertEqual(style("tag", "@foo"), "[tag]@foo[/tag]")
+
+            self.assertEqual(style("tag", "@foo"), "@foo")
+
+        self.assertEqual(style("tag", "@foo"), "[tag]@foo[/tag]")
+
+
 class PluralizeTests(TestCase):
     def test_singular(self) -> None:
         self.assertEqual(pluralize("book", "books", 1), "book")
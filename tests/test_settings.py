@@ -90,6 +90,12 @@ class StringValueToFieldValue(TestCase):
         self.assertEqual(False, svtfv("False", "bool"))
         self.assertEqual(False, svtfv("No", "bool"))
 
+    def test_float(self) -> None:
+        self.assertEqual(0.5, svtfv("0.5", float))
+
+    def test_float_str(self) -> None:
+        self.assertEqual(0.5, svtfv("0.5", "float"))
+
     def test_path(self) -> None:
         self.assertEqual(Path("/dev/null"), svtfv("/dev/null", Path))
 
@@ -0,0 +1,137 @@
+"""Tests for the snapshot module"""
+
+# pylint: disable=missing-docstring,unused-argument
+import marshal
+import os
+from unittest import TestCase, mock
+
+import gbp_testkit.fixtures as testkit
+from unittest_fixtures import Fixtures, given
+
+from gbpcli import snapshot
+
+
+@given(testkit.tmpdir)
+class SnapshotTests(TestCase):
+    def test_get_makes_value(self, fixtures: Fixtures) -> None:
+        snap = snapshot.Snapshot(str(fixtures.tmpdir / snapshot.FILENAME))
+        make = mock.Mock(return_value={"url": "http://gbp.invalid/"})
+
+        self.assertEqual(snap.get("config", make), {"url": "http://gbp.invalid/"})
+        self.assertEqual(snap.get("config", make), {"url": "http://gbp.invalid/"})
+
+        make.assert_called_once_with()
+        self.assertTrue(snap.changed)
+
+    def test_remade_when_key_changes(self, fixtures: Fixtures) -> None:
+        snap = snapshot.Snapshot(str(fixtures.tmpdir / snapshot.FILENAME))
+        snap.get("config", lambda: 1, key="a")
+
+        self.assertEqual(snap.get("config", lambda: 2, key="b"), 2)
+
+    def test_remade_when_files_change(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "gbpcli.toml"
+        path.write_text("[gbpcli]\n")
+        snap = snapshot.Snapshot(str(fixtures.tmpdir / snapshot.FILENAME))
+        snap.get("config", lambda: 1, files=lambda _: [str(path)])
+
+        self.assertEqual(snap.get("config", lambda: 2, files=lambda _: [str(path)]), 1)
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        self.assertEqual(snap.get("config", lambda: 3), 3)
+
+    def test_remade_when_file_is_created(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "gbpcli.toml"
+        snap = snapshot.Snapshot(str(fixtures.tmpdir / snapshot.FILENAME))
+        snap.get("config", lambda: 1, files=lambda _: [str(path)])
+
+        path.write_text("[gbpcli]\n")
+
+        self.assertEqual(snap.get("config", lambda: 2), 2)
+
+    def test_does_not_keep_values_that_are_not_plain_data(
+        self, fixtures: Fixtures
+    ) -> None:
+        snap = snapshot.Snapshot(str(fixtures.tmpdir / snapshot.FILENAME))
+        value = object()
+
+        self.assertIs(snap.get("object", lambda: value), value)
+        self.assertEqual(snap.entries, {})
+        self.assertFalse(snap.changed)
+
+    def test_save_and_load(self, fixtures: Fixtures) -> None:
+        path = str(fixtures.tmpdir / "cache" / snapshot.FILENAME)
+        snap = snapshot.Snapshot(path)
+        snap.get("queries", lambda: {"logs": "query { logs }"})
+
+        snap.save()
+
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        self.assertFalse(snap.changed)
+        loaded = snapshot.Snapshot.load(path)
+        self.assertEqual(loaded.entries, snap.entries)
+
+    def test_save_when_unchanged(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / snapshot.FILENAME
+
+        snapshot.Snapshot(str(path)).save()
+
+        self.assertFalse(path.exists())
+
+    def test_cannot_save(self, fixtures: Fixtures) -> None:
+        (fixtures.tmpdir / "cache").write_text("")
+        snap = snapshot.Snapshot(str(fixtures.tmpdir / "cache" / snapshot.FILENAME))
+        snap.get("config", lambda: 1)
+
+        snap.save()
+
+        self.assertTrue(snap.changed)
+
+    def test_load_invalid(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / snapshot.FILENAME
+
+        for data in [
+            b"",
+            b"bogus",
+            marshal.dumps([]),
+            marshal.dumps({"format": "cpython-10:1", "entries": {"config": {}}}),
+        ]:
+            path.write_bytes(data)
+
+            self.assertEqual(snapshot.Snapshot.load(str(path)).entries, {})
+
+
+@given(testkit.tmpdir)
+class EnabledTests(TestCase):
+    def test_enabled(self, fixtures: Fixtures) -> None:
+        path = str(fixtures.tmpdir / snapshot.FILENAME)
+
+        with snapshot.enabled(path=path) as snap:
+            self.assertIs(snapshot.current_snapshot.get(), snap)
+            self.assertTrue(snapshot.is_enabled())
+            self.assertEqual(snapshot.cached("config", lambda: 1), 1)
+
+        self.assertFalse(snapshot.is_enabled())
+
+        with snapshot.enabled(path=path):
+            self.assertEqual(snapshot.cached("config", lambda: 2), 1)
+
+    def test_not_enabled(self, fixtures: Fixtures) -> None:
+        with snapshot.enabled(False) as snap:
+            self.assertIsNone(snap)
+            self.assertFalse(snapshot.is_enabled())
+            self.assertEqual(snapshot.cached("config", lambda: 1), 1)
+            self.assertEqual(snapshot.cached("config", lambda: 2), 2)
+
+    def test_default_path(self, fixtures: Fixtures) -> None:
+        with mock.patch(
+            "platformdirs.user_cache_dir", return_value=str(fixtures.tmpdir)
+        ):
+            with snapshot.enabled() as snap:
+                snapshot.cached("config", lambda: 1)
+
+        assert snap is not None
+        self.assertEqual(snap.path, str(fixtures.tmpdir / snapshot.FILENAME))
+        self.assertTrue((fixtures.tmpdir / snapshot.FILENAME).exists())
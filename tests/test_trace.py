@@ -0,0 +1,116 @@
+"""Tests for the trace module"""
+
+# pylint: disable=missing-docstring
+import io
+from unittest import TestCase
+
+import rich.console
+
+from gbpcli import trace
+from gbpcli.types import Console
+
+
+class SpanTests(TestCase):
+    def test_records_spans(self) -> None:
+        with trace.Tracer() as tracer:
+            with trace.span("query", "machines", variables={}) as outer:
+                with trace.span("request", "POST"):
+                    pass
+
+        self.assertEqual(
+            [(s.kind, s.name, s.depth) for s in tracer.spans],
+            [("query", "machines", 0), ("request", "POST", 1)],
+        )
+        self.assertEqual(outer.details, {"variables": {}})
+        self.assertGreater(outer.duration, 0)
+
+    def test_not_recorded_when_disabled(self) -> None:
+        with trace.Tracer(enabled=False) as tracer:
+            with trace.span("query", "machines") as span:
+                pass
+
+        self.assertEqual(tracer.spans, [])
+        self.assertGreater(span.duration, 0)
+
+    def test_no_tracer(self) -> None:
+        with trace.span("query", "machines") as span:
+            pass
+
+        self.assertIsNone(trace.current_tracer.get())
+        self.assertGreater(span.duration, 0)
+
+    def test_accumulate(self) -> None:
+        with trace.Tracer() as tracer:
+            with trace.span("query", "builds"):
+                for _ in range(3):
+                    with trace.accumulate("convert", "Build"):
+                        pass
+
+        self.assertEqual(len(tracer.spans), 2)
+        convert = tracer.spans[1]
+        self.assertEqual((convert.name, convert.count, convert.depth), ("Build", 3, 1))
+
+    def test_record(self) -> None:
+        with trace.Tracer() as tracer:
+            start = tracer.start
+            trace.record("query", "builds", start, received=100)
+
+        self.assertEqual(tracer.spans[0].start, start)
+        self.assertEqual(tracer.spans[0].details, {"received": 100})
+
+    def test_is_enabled(self) -> None:
+        self.assertFalse(trace.is_enabled())
+
+        with trace.Tracer() as tracer:
+            self.assertTrue(trace.is_enabled())
+            tracer.enabled = False
+            self.assertFalse(trace.is_enabled())
+
+
+class ReportTests(TestCase):
+    def test(self) -> None:
+        with trace.Tracer() as tracer:
+            with trace.span("query", "latest", variables={"machine": "lighthouse"}):
+                with trace.span("decode", "JSON"):
+                    pass
+        out = io.StringIO()
+
+        tracer.report(rich.console.Console(file=out, width=200))
+
+        report = out.getvalue()
+        self.assertIn("Trace (", report)
+        self.assertIn("query latest", report)
+        self.assertIn('variables={"machine":"lighthouse"}', report)
+        self.assertIn("    decode JSON", report)
+
+
+class FormatDetailsTests(TestCase):
+    def test(self) -> None:
+        span = trace.Span(
+            kind="read",
+            name="response",
+            start=0.0,
+            count=2,
+            details={"received": 10, "wait": 0.0015, "skip": None, "tags": ["[x]"]},
+        )
+
+        self.assertEqual(
+            trace.format_details(span), r'×2 received=10 wait=1.5ms tags=["\[x]"]'
+        )
+
+
+class InstrumentConsoleTests(TestCase):
+    def test(self) -> None:
+        console = Console(
+            out=rich.console.Console(file=io.StringIO()),
+            err=rich.console.Console(file=io.StringIO()),
+        )
+        trace.instrument_console(console)
+
+        with trace.Tracer() as tracer:
+            console.out.print("hello")
+            console.out.print("world")
+
+        self.assertEqual(
+            [(s.kind, s.name, s.count) for s in tracer.spans], [("render", "out", 2)]
+        )
@@ -0,0 +1,231 @@
+"""Tests for the types module"""
+
+# pylint: disable=missing-docstring
+import datetime as dt
+import pickle
+from typing import Any
+from unittest import TestCase
+
+from gbpcli.types import (
+    Build,
+    BuildCollection,
+    BuildFlag,
+    BuildInfo,
+    Package,
+    PackageList,
+)
+
+UTC = dt.UTC
+EDT = dt.timezone(dt.timedelta(hours=-4))
+
+
+def api_response(build_id: str, **kwargs: Any) -> dict[str, Any]:
+    response: dict[str, Any] = {
+        "id": build_id,
+        "keep": False,
+        "published": False,
+        "tags": [],
+        "notes": None,
+        "submitted": "2024-05-10T12:00:00.123456+00:00",
+        "completed": "2024-05-10T12:30:00+00:00",
+        "built": "2024-05-10T12:20:00-04:00",
+        "packagesBuilt": None,
+    }
+    response.update(kwargs)
+
+    return response
+
+
+RESPONSES = [
+    api_response("lighthouse.1", keep=True, tags=["first"]),
+    api_response("lighthouse.2", published=True, notes="This is a note\n"),
+    api_response(
+        "lighthouse.3",
+        completed=None,
+        built=None,
+        submitted="2024-05-11T09:00:00",
+        tags=["first", "last"],
+        packagesBuilt=[{"cpv": "sys-apps/less-643", "buildTime": 1715342400}],
+    ),
+]
+
+
+class BuildCollectionTests(TestCase):
+    def test_builds(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+
+        self.assertEqual(len(builds), 3)
+        self.assertEqual(
+            list(builds), [Build.from_api_response(item) for item in RESPONSES]
+        )
+
+    def test_timestamps(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+
+        first, last = builds.build(0), builds.build(2)
+        assert first.info and last.info
+        self.assertEqual(
+            first.info.submitted, dt.datetime(2024, 5, 10, 12, 0, 0, 123456, UTC)
+        )
+        self.assertEqual(first.info.built, dt.datetime(2024, 5, 10, 12, 20, 0, 0, EDT))
+        self.assertEqual(first.info.built.utcoffset(), dt.timedelta(hours=-4))
+        self.assertEqual(last.info.submitted, dt.datetime(2024, 5, 11, 9))
+        self.assertIsNone(last.info.submitted.tzinfo)
+        self.assertIsNone(last.info.completed)
+
+    def test_timestamps_are_parsed_when_read(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+
+        self.assertEqual(builds.submitted[0], "2024-05-10T12:00:00.123456+00:00")
+        self.assertIsNone(builds.completed[2])
+
+        info = builds.build(0).info
+        assert info
+        self.assertEqual(getattr(info, "_built"), "2024-05-10T12:20:00-04:00")
+        self.assertEqual(info.built, dt.datetime(2024, 5, 10, 12, 20, 0, 0, EDT))
+
+    def test_tags_and_notes_are_interned(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES * 100)
+
+        self.assertEqual(len(builds), 300)
+        self.assertEqual(builds.tag_table.values, [(), ("first",), ("first", "last")])
+        self.assertEqual(builds.note_table.values, ["", "This is a note\n"])
+
+    def test_negative_index(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+
+        self.assertEqual(builds.build(-1).id, "lighthouse.3")
+        self.assertEqual(builds[-1], builds.build(2))
+
+        with self.assertRaises(IndexError):
+            builds[3]  # pylint: disable=pointless-statement
+
+    def test_slice(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+
+        tail = builds[-2:]
+
+        self.assertIsInstance(tail, BuildCollection)
+        self.assertEqual(list(tail), list(builds)[-2:])
+        self.assertEqual(list(builds[-0:]), list(builds))
+
+    def test_reverse(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+
+        builds.reverse()
+
+        self.assertEqual(
+            list(builds),
+            [Build.from_api_response(item) for item in reversed(RESPONSES)],
+        )
+
+    def test_numbers_with(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+
+        self.assertEqual(builds.numbers_with(BuildFlag.PUBLISHED), [2])
+        self.assertEqual(builds.numbers_with(BuildFlag.KEEP | BuildFlag.NOTE), [1, 2])
+
+    def test_eq(self) -> None:
+        builds = BuildCollection.from_api_response(RESPONSES)
+        expected = [Build.from_api_response(item) for item in RESPONSES]
+
+        self.assertEqual(builds, expected)
+        self.assertNotEqual(builds, expected[:2])
+        self.assertEqual(BuildCollection(), [])
+
+
+class BuildInfoTests(TestCase):
+    def test_timestamps_are_parsed_when_read(self) -> None:
+        info = BuildInfo.from_api_response(RESPONSES[0])
+
+        self.assertEqual(
+            getattr(info, "_submitted"), "2024-05-10T12:00:00.123456+00:00"
+        )
+        submitted = info.submitted
+
+        self.assertEqual(submitted, dt.datetime(2024, 5, 10, 12, 0, 0, 123456, UTC))
+        self.assertIs(info.submitted, submitted)
+        self.assertIsNone(BuildInfo.from_api_response(RESPONSES[2]).built)
+
+    def test_init(self) -> None:
+        submitted = dt.datetime(2024, 5, 10, 12, tzinfo=UTC)
+
+        info = BuildInfo(
+            keep=True, note=None, published=False, tags=[], submitted=submitted
+        )
+
+        self.assertIs(info.submitted, submitted)
+        self.assertIsNone(info.completed)
+        self.assertIsNone(info.built)
+
+    def test_submitted_is_required(self) -> None:
+        with self.assertRaises(TypeError):
+            BuildInfo(  # type: ignore[call-arg]
+                keep=True, note=None, published=False, tags=[]
+            )
+
+    def test_eq_and_pickle(self) -> None:
+        info = BuildInfo.from_api_response(RESPONSES[1])
+
+        self.assertEqual(info, BuildInfo.from_api_response(RESPONSES[1]))
+        self.assertEqual(pickle.loads(pickle.dumps(info)), info)
+
+
+class PackageTests(TestCase):
+    def test_build_time_is_converted_when_read(self) -> None:
+        [package] = Package.from_api_response(RESPONSES[2]) or []
+
+        self.assertEqual(package.cpv, "sys-apps/less-643")
+        self.assertEqual(package.build_time, dt.datetime.fromtimestamp(1715342400))
+        self.assertEqual(
+            package, Package(cpv="sys-apps/less-643", build_time=package.build_time)
+        )
+
+
+class PackageListTests(TestCase):
+    raw = [
+        {"cpv": "app-arch/libarchive-3.7.9", "buildTime": 1744092600},
+        {"cpv": "sys-apps/acl-2.3.2-r2", "buildTime": 1744093200},
+    ]
+
+    def test_packages_are_made_when_accessed(self) -> None:
+        packages = PackageList(self.raw)
+
+        self.assertEqual(len(packages), 2)
+        self.assertTrue(packages)
+        self.assertEqual(list(packages)[1].cpv, "sys-apps/acl-2.3.2-r2")
+        self.assertEqual(packages[1], list(packages)[1])
+        self.assertEqual(
+            [package.build_time for package in packages],
+            [
+                dt.datetime.fromtimestamp(1744092600),
+                dt.datetime.fromtimestamp(1744093200),
+            ],
+        )
+
+    def test_empty(self) -> None:
+        self.assertFalse(PackageList([]))
+
+    def test_slice(self) -> None:
+        packages = PackageList(self.raw)[1:]
+
+        self.assertIsInstance(packages, PackageList)
+        self.assertEqual(
+            [package.cpv for package in packages], ["sys-apps/acl-2.3.2-r2"]
+        )
+
+    def test_eq(self) -> None:
+        packages = PackageList(self.raw)
+        expected = [
+            Package.from_raw(item["cpv"], item["buildTime"]) for item in self.raw
+        ]
+
+        self.assertEqual(packages, expected)
+        self.assertEqual(expected, packages)
+        self.assertNotEqual(packages, expected[:1])
+
+    def test_from_api_response(self) -> None:
+        packages = Package.from_api_response({"packagesBuilt": self.raw})
+
+        self.assertIsInstance(packages, PackageList)
+        self.assertIsNone(Package.from_api_response({"packagesBuilt": None}))
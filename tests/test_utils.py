@@ -2,6 +2,7 @@
 
 # pylint: disable=missing-docstring
 import argparse
+import os
 import sys
 from unittest import TestCase, mock
 
@@ -9,6 +10,7 @@ import gbp_testkit.fixtures as testkit
 from gentoo_build_publisher import types as gbp_types
 from unittest_fixtures import FixtureContext, Fixtures, fixture, given, where
 
+from gbpcli import utils
 from gbpcli.graphql import APIError, check
 from gbpcli.types import Build
 from gbpcli.utils import get_my_machines_from_args, load_env, re_path, resolve_build_id
@@ -136,7 +138,17 @@ class GetMyMachinesFromArgsTestCase(TestCase):
         self.assertEqual(machines, [])
 
 
-@given(testkit.environ, testkit.tmpdir)
+@fixture(testkit.tmpdir)
+def user_cache_dir(fixtures: Fixtures) -> FixtureContext[str]:
+    cache_dir = str(fixtures.tmpdir / "cache")
+
+    with mock.patch.object(
+        utils.platformdirs, "user_cache_dir", return_value=cache_dir
+    ):
+        yield cache_dir
+
+
+@given(testkit.environ, testkit.tmpdir, user_cache_dir)
 class LoadEnvTests(TestCase):
     def test_loads_config(self, fixtures: Fixtures) -> None:
         path = fixtures.tmpdir / "config.env"
@@ -173,6 +185,58 @@ class LoadEnvTests(TestCase):
         self.assertFalse(status)
         self.assertTrue("TEST" not in fixtures.environ)
 
+    def test_does_not_change_sys_path(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "config.env"
+        path.write_text("PYTHONPATH=/dev/null\n")
+
+        load_env(path)
+
+        self.assertEqual(fixtures.environ["PYTHONPATH"], "/dev/null")
+        self.assertNotIn("/dev/null", sys.path)
+
+
+@given(testkit.environ, testkit.tmpdir, user_cache_dir)
+class ReadEnvTests(TestCase):
+    def test_caches_parsed_file(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "config.env"
+        path.write_text("TEST=foobar\nEMPTY\n")
+
+        self.assertEqual(utils.read_env(path), {"TEST": "foobar"})
+
+        with mock.patch("dotenv.dotenv_values") as dotenv_values:
+            self.assertEqual(utils.read_env(path), {"TEST": "foobar"})
+
+        dotenv_values.assert_not_called()
+
+        cache_path = os.path.join(fixtures.user_cache_dir, utils.SERVER_ENV_CACHE)
+        self.assertEqual(os.stat(cache_path).st_mode & 0o777, 0o600)
+
+    def test_file_changed(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "config.env"
+        path.write_text("TEST=foobar\n")
+        utils.read_env(path)
+
+        path.write_text("TEST=foobarbaz\n")
+
+        self.assertEqual(utils.read_env(path), {"TEST": "foobarbaz"})
+
+    def test_variable_expansion_is_not_cached(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "config.env"
+        path.write_text("TEST=${HOME}/foobar\n")
+
+        fixtures.environ["HOME"] = "/home/foo"
+        self.assertEqual(utils.read_env(path), {"TEST": "/home/foo/foobar"})
+
+        fixtures.environ["HOME"] = "/home/bar"
+        self.assertEqual(utils.read_env(path), {"TEST": "/home/bar/foobar"})
+
+    def test_cannot_write_cache(self, fixtures: Fixtures) -> None:
+        path = fixtures.tmpdir / "config.env"
+        path.write_text("TEST=foobar\n")
+        (fixtures.tmpdir / "cache").write_text("")
+
+        self.assertEqual(utils.read_env(path), {"TEST": "foobar"})
+
 
 @fixture()
 def pythonpath(_: Fixtures) -> FixtureContext[list[str]]:
@@ -197,3 +261,11 @@ class RePath(TestCase):
         re_path()
         self.assertEqual(1, sys.path.count("/dev/null"))
         self.assertEqual(sys.path[-1], "/dev/null")
+
+
+@given(testkit.environ)
+class PythonPathTests(TestCase):
+    def test(self, fixtures: Fixtures) -> None:
+        fixtures.environ["PYTHONPATH"] = f"/dev/null{os.pathsep}{os.pathsep}/foo"
+
+        self.assertEqual(utils.python_path(), ["/dev/null", "/foo"])